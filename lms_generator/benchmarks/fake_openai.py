@@ -0,0 +1,299 @@
+"""
+로컬 OpenAI API 대역 서버 (벤치마크용)
+
+/v1/embeddings, /v1/chat/completions(stream 포함)를 흉내 내며
+응답 지연, 토큰 처리량, 429 응답 주입, 잘린 응답 주입을 설정할 수 있음
+"""
+
+import json
+import time
+import zlib
+import base64
+import random
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+
+import numpy as np
+
+# 생성 강의에 포함되는 섹션 (품질 기준 예시와 동일한 구조)
+LECTURE_SECTIONS = [
+    "학습 내용",
+    "실제 개발 문제 상황",
+    "단계별 해결 과정",
+    "실습 과제",
+    "자주 하는 실수",
+    "모범 사례",
+    "요약"
+]
+
+_FILLER_WORDS = (
+    "UniTask await async 취소 토큰 프레임 지연 씬 로딩 리소스 예외 처리 진행률 "
+    "병렬 스트림 이벤트 버튼 메모리 성능 게임 개발 실무 패턴 코드 예제"
+).split()
+
+
+class FakeOpenAIConfig:
+    """대역 서버 동작 설정"""
+
+    def __init__(self, embedding_latency_ms: float = 30.0, chat_latency_ms: float = 200.0,
+                 tokens_per_sec: float = 2000.0, output_tokens: int = 3000,
+                 rate_429: float = 0.0, truncate_rate: float = 0.0, mini_speedup: float = 3.0,
+                 seed: int = 0):
+        self.embedding_latency_ms = embedding_latency_ms
+        self.chat_latency_ms = chat_latency_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.output_tokens = output_tokens
+        self.rate_429 = rate_429
+        self.truncate_rate = truncate_rate
+        # 경량 모델(*-mini) 응답은 지연/처리량이 이 배수만큼 빠름
+        self.mini_speedup = mini_speedup
+        self.seed = seed
+
+    def to_dict(self) -> Dict:
+        return dict(self.__dict__)
+
+
+def estimate_tokens(text: str) -> int:
+    """대략적인 토큰 수 (문자 4개 ≈ 1토큰)"""
+    return max(1, len(text) // 4)
+
+
+def fake_embedding(text: str, dimension: int) -> np.ndarray:
+    """텍스트 해시 기반의 결정적 단위 벡터"""
+    rng = np.random.default_rng(zlib.crc32(text.encode("utf-8")))
+    vector = rng.standard_normal(dimension).astype(np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def fake_lecture(output_tokens: int, rng: random.Random, truncated: bool = False) -> str:
+    """섹션 구조와 코드 예제를 갖춘 가짜 강의 본문 (truncated면 중간 코드 블록에서 끊김)"""
+    words_per_section = max(20, output_tokens // len(LECTURE_SECTIONS))
+    parts = []
+    for index, section in enumerate(LECTURE_SECTIONS, 1):
+        if truncated and index == len(LECTURE_SECTIONS) - 1:
+            parts.append(f"## {index}. {section}\n\n```csharp\npublic async UniTask Truncated(")
+            break
+        body = " ".join(rng.choice(_FILLER_WORDS) for _ in range(words_per_section))
+        parts.append(f"## {index}. {section}\n\n{body}\n")
+        if section == "실습 과제":
+            parts.append("### 🎯 과제 1\n\n로딩 시스템 구현\n\n### 🎯 과제 2\n\n애니메이션 시퀀스 구현\n")
+        if section in ("단계별 해결 과정", "모범 사례", "자주 하는 실수"):
+            for example in range(2):
+                parts.append(
+                    "```csharp\n"
+                    f"public async UniTask Example{index}_{example}(CancellationToken token)\n"
+                    "{\n    await UniTask.Delay(100, cancellationToken: token);\n}\n"
+                    "```\n"
+                )
+    return "\n".join(parts)
+
+
+class FakeOpenAIServer:
+    """스레드 기반 로컬 OpenAI 대역 서버"""
+
+    def __init__(self, config: FakeOpenAIConfig = None, host: str = "127.0.0.1", port: int = 0):
+        self.config = config or FakeOpenAIConfig()
+        self._rng = random.Random(self.config.seed)
+        self._lock = threading.Lock()
+        self.stats = {"embeddings": 0, "chat": 0, "rate_limited": 0,
+                      "embedding_inputs": 0, "prompt_tokens": 0, "completion_tokens": 0}
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _count(self, **increments):
+        with self._lock:
+            for key, value in increments.items():
+                self.stats[key] += value
+
+    def _should_rate_limit(self) -> bool:
+        with self._lock:
+            return self._rng.random() < self.config.rate_429
+
+    def _embeddings(self, body: Dict) -> Dict:
+        inputs = body["input"]
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        dimension = body.get("dimensions") or 1536
+        use_base64 = body.get("encoding_format") == "base64"
+
+        time.sleep(self.config.embedding_latency_ms / 1000)
+
+        data: List[Dict] = []
+        prompt_tokens = 0
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(text, dimension)
+            embedding = base64.b64encode(vector.tobytes()).decode("ascii") if use_base64 else vector.tolist()
+            data.append({"object": "embedding", "index": index, "embedding": embedding})
+            prompt_tokens += estimate_tokens(text)
+
+        self._count(embeddings=1, embedding_inputs=len(inputs), prompt_tokens=prompt_tokens)
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": prompt_tokens, "total_tokens": prompt_tokens}
+        }
+
+    def _chat(self, body: Dict) -> Dict:
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in body["messages"])
+        completion_tokens = min(body.get("max_tokens") or self.config.output_tokens, self.config.output_tokens)
+
+        with self._lock:
+            truncated = self._rng.random() < self.config.truncate_rate
+            content = fake_lecture(completion_tokens, random.Random(self._rng.random()), truncated)
+        speedup = self.config.mini_speedup if "mini" in (body.get("model") or "") else 1.0
+        time.sleep((self.config.chat_latency_ms / 1000 + completion_tokens / self.config.tokens_per_sec) / speedup)
+
+        self._count(chat=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+        return {
+            "id": f"chatcmpl-fake-{self.stats['chat']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "length" if truncated else "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens
+            }
+        }
+
+    def _chat_stream(self, body: Dict, write):
+        """stream=True 응답: 첫 토큰 지연 후 토큰 처리량에 맞춰 chunk를 SSE로 전송"""
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in body["messages"])
+        completion_tokens = min(body.get("max_tokens") or self.config.output_tokens, self.config.output_tokens)
+        with self._lock:
+            words = [self._rng.choice(_FILLER_WORDS) for _ in range(completion_tokens)]
+        speedup = self.config.mini_speedup if "mini" in (body.get("model") or "") else 1.0
+        self._count(chat=1, prompt_tokens=prompt_tokens, completion_tokens=completion_tokens)
+
+        chunk = {"id": f"chatcmpl-fake-{self.stats['chat']}", "object": "chat.completion.chunk",
+                 "created": int(time.time()), "model": body.get("model")}
+
+        def send(choices: List[Dict], usage: Dict = None):
+            write(f"data: {json.dumps({**chunk, 'choices': choices, 'usage': usage})}\n\n".encode("utf-8"))
+
+        time.sleep(self.config.chat_latency_ms / 1000 / speedup)
+        # 약 20ms 간격으로 묶어서 전송 (토큰마다 sleep하면 처리량보다 느려짐)
+        batch = max(1, int(self.config.tokens_per_sec * speedup * 0.02))
+        for start in range(0, len(words), batch):
+            if start:
+                time.sleep(batch / self.config.tokens_per_sec / speedup)
+            content = " ".join(words[start:start + batch]) + " "
+            send([{"index": 0, "delta": {"content": content}, "finish_reason": None}])
+        send([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+        if (body.get("stream_options") or {}).get("include_usage"):
+            send([], {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+                      "total_tokens": prompt_tokens + completion_tokens})
+        write(b"data: [DONE]\n\n")
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send_json(self, status: int, payload: Dict, headers: Dict = None):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, dict(server.stats))
+                else:
+                    self._send_json(404, {"error": {"message": "not found"}})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+
+                if server._should_rate_limit():
+                    server._count(rate_limited=1)
+                    self._send_json(
+                        429,
+                        {"error": {"message": "Rate limit reached (fake)", "type": "requests", "code": "rate_limit_exceeded"}},
+                        headers={"retry-after-ms": "20"}
+                    )
+                    return
+
+                if self.path.endswith("/embeddings"):
+                    self._send_json(200, server._embeddings(body))
+                elif self.path.endswith("/chat/completions") and body.get("stream"):
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/event-stream")
+                    self.end_headers()
+
+                    def write(data: bytes):
+                        self.wfile.write(data)
+                        self.wfile.flush()
+
+                    server._chat_stream(body, write)
+                elif self.path.endswith("/chat/completions"):
+                    self._send_json(200, server._chat(body))
+                else:
+                    self._send_json(404, {"error": {"message": f"unknown path {self.path}"}})
+
+        return Handler
+
+
+def main():
+    """단독 실행: 로컬 대역 서버 기동"""
+    parser = argparse.ArgumentParser(description="로컬 OpenAI API 대역 서버")
+    parser.add_argument("--port", type=int, default=8787, help="포트 (기본: 8787)")
+    parser.add_argument("--embedding-latency-ms", type=float, default=30.0, help="임베딩 응답 지연(ms)")
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0, help="채팅 첫 토큰 지연(ms)")
+    parser.add_argument("--tokens-per-sec", type=float, default=2000.0, help="출력 토큰 처리량")
+    parser.add_argument("--output-tokens", type=int, default=3000, help="채팅 응답 토큰 수")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 주입 비율 (0~1)")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="잘린 채팅 응답 주입 비율 (0~1)")
+    parser.add_argument("--mini-speedup", type=float, default=3.0, help="경량(*-mini) 모델 응답 속도 배수")
+
+    args = parser.parse_args()
+
+    config = FakeOpenAIConfig(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        rate_429=args.rate_429,
+        truncate_rate=args.truncate_rate,
+        mini_speedup=args.mini_speedup
+    )
+    server = FakeOpenAIServer(config, port=args.port)
+    print(f"🧪 OpenAI 대역 서버 실행 중: {server.base_url} (Ctrl+C 종료)")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+CLI 시작 시간 벤치마크
+
+가벼운 명령(--help, --validate, --status)의 실행 시간을 인터프리터 기본 시작 시간과 비교하고
+무거운 SDK(openai, qdrant_client, langchain, numpy)가 로드되지 않는지 검사
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(BENCH_DIR, '..', 'src')
+
+HEAVY_MODULES = ["openai", "qdrant_client", "langchain", "langchain_text_splitters", "numpy"]
+
+# 가벼운 명령: 시간 예산 안에 끝나야 하는 명령들
+LIGHT_COMMANDS = {
+    "main --help": ["main.py", "--help"],
+    "main --validate": ["main.py", "--subject", "{subject}", "--validate"],
+    "main --status": ["main.py", "--subject", "{subject}", "--status"],
+    "vector_builder --help": ["vector_builder.py", "--help"],
+    "lecture_generator --help": ["lecture_generator.py", "--help"],
+    "lecture_validator --subject": ["lecture_validator.py", "--subject", "{subject}"],
+}
+
+# 실행 후 sys.modules에 무거운 모듈이 남아있는지 확인하는 래퍼
+_PROBE = """
+import runpy, sys, json
+sys.argv = {argv!r}
+sys.path.insert(0, {src!r})
+code = 0
+try:
+    runpy.run_path(sys.argv[0], run_name="__main__")
+except SystemExit as exc:
+    code = exc.code or 0
+heavy = sorted({{name.split(".")[0] for name in sys.modules}} & set({heavy!r}))
+sys.stderr.write("\\n__PROBE__" + json.dumps({{"heavy": heavy, "code": code}}) + "\\n")
+"""
+
+
+def _run(argv: List[str]) -> float:
+    started = time.perf_counter()
+    subprocess.run(argv, cwd=SRC_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - started
+
+
+def measure(argv: List[str], repeat: int) -> float:
+    """최솟값 기준 실행 시간 (초)"""
+    return min(_run(argv) for _ in range(repeat))
+
+
+def probe_heavy_modules(script_argv: List[str]) -> Dict:
+    """명령 실행 후 로드된 무거운 모듈 목록"""
+    code = _PROBE.format(argv=[os.path.join(SRC_DIR, script_argv[0])] + script_argv[1:],
+                         src=SRC_DIR, heavy=HEAVY_MODULES)
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    for line in result.stderr.splitlines():
+        if line.startswith("__PROBE__"):
+            return json.loads(line[len("__PROBE__"):])
+    return {"heavy": [], "code": result.returncode, "error": result.stderr[-500:]}
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="CLI 시작 시간 벤치마크")
+    parser.add_argument("--subject", default="unitask", help="검증 대상 주제 (기본: unitask)")
+    parser.add_argument("--repeat", type=int, default=5, help="명령별 반복 횟수 (기본: 5)")
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="인터프리터 기본 시작 시간을 뺀 허용 시간(ms) (기본: 100)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+
+    args = parser.parse_args()
+
+    baseline = measure([sys.executable, "-c", "pass"], args.repeat)
+    print(f"🐍 인터프리터 기본 시작: {baseline * 1000:.1f}ms")
+
+    results = {}
+    failed = []
+    for name, template in LIGHT_COMMANDS.items():
+        script_argv = [part.format(subject=args.subject) for part in template]
+        elapsed = measure([sys.executable] + script_argv, args.repeat)
+        overhead_ms = (elapsed - baseline) * 1000
+        probe = probe_heavy_modules(script_argv)
+
+        ok = overhead_ms <= args.budget_ms and not probe["heavy"]
+        if not ok:
+            failed.append(name)
+        results[name] = {
+            "total_ms": round(elapsed * 1000, 1),
+            "overhead_ms": round(overhead_ms, 1),
+            "heavy_modules": probe["heavy"],
+            "ok": ok
+        }
+        heavy = f" ⚠️ 로드됨: {', '.join(probe['heavy'])}" if probe["heavy"] else ""
+        print(f"{'✅' if ok else '❌'} {name:<26} 전체 {elapsed * 1000:>7.1f}ms  "
+              f"추가 {overhead_ms:>7.1f}ms{heavy}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump({"baseline_ms": round(baseline * 1000, 1), "budget_ms": args.budget_ms,
+                       "commands": results}, f, ensure_ascii=False, indent=2)
+
+    if failed:
+        print(f"💥 시작 시간 예산 초과: {', '.join(failed)}")
+        sys.exit(1)
+    print(f"🎉 모든 가벼운 명령이 예산({args.budget_ms:.0f}ms) 이내")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""
+강의 질의응답 지연 벤치마크
+
+로컬 OpenAI 대역 서버(스트리밍)와 인프로세스 Qdrant(:memory:)로 생성 서비스의 /qa/stream 엔드포인트를 실행하고
+질문 전송 → 첫 토큰 수신까지의 지연(p50/p95)을 목표치(기본 300ms)와 비교
+일부 질문은 반복(검색 캐시 적중), 일부는 동시에 전송(single-flight 공유)해 실제 채팅 사용 패턴을 흉내 냄
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+import contextlib
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, BENCH_DIR)
+from fake_openai import FakeOpenAIConfig, FakeOpenAIServer  # noqa: E402
+from run_benchmarks import BENCH_SUBJECT, SRC_DIR, _APIS, _VOCAB, build_synthetic_subject, percentile  # noqa: E402
+
+
+def make_questions(count: int, num_lectures: int, repeat_rate: float, seed: int = 11) -> List[Dict]:
+    """강의 번호가 붙은 합성 질문 목록 (repeat_rate 비율은 앞선 질문 반복)"""
+    rng = random.Random(seed)
+    questions: List[Dict] = []
+    for _ in range(count):
+        if questions and rng.random() < repeat_rate:
+            questions.append(dict(rng.choice(questions)))
+            continue
+        words = " ".join(rng.sample(_VOCAB, 3))
+        questions.append({
+            "question": f"{rng.choice(_APIS)}에서 {words} 처리는 어떻게 하나요?",
+            "lecture": rng.randint(1, num_lectures)
+        })
+    return questions
+
+
+def ask(base_url: str, payload: Dict) -> Dict:
+    """/qa/stream 호출 후 클라이언트 기준 첫 토큰/전체 지연과 done 이벤트 반환"""
+    request = urllib.request.Request(
+        base_url + "/qa/stream", method="POST",
+        data=json.dumps({"subject": BENCH_SUBJECT, **payload}, ensure_ascii=False).encode("utf-8"),
+        headers={"Content-Type": "application/json"}
+    )
+    started = time.perf_counter()
+    first_token = None
+    done: Dict = {}
+    with urllib.request.urlopen(request) as response:
+        for line in response:
+            if not line.startswith(b"data: "):
+                continue
+            event = json.loads(line[6:])
+            if event["type"] == "token" and first_token is None:
+                first_token = time.perf_counter() - started
+            elif event["type"] in ("done", "error"):
+                done = event
+    return {"first_token_s": first_token, "total_s": time.perf_counter() - started, "done": done}
+
+
+def summarize(samples: List[float]) -> Dict:
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 1),
+        "p95_ms": round(percentile(samples, 95) * 1000, 1),
+        "max_ms": round(max(samples) * 1000, 1) if samples else 0.0
+    }
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="강의 질의응답 첫 토큰 지연 벤치마크")
+    parser.add_argument("--files", type=int, default=200, help="합성 코퍼스 파일 수 (기본: 200)")
+    parser.add_argument("--lectures", type=int, default=6, help="합성 커리큘럼 강의 수 (기본: 6)")
+    parser.add_argument("--questions", type=int, default=60, help="질문 수 (기본: 60)")
+    parser.add_argument("--concurrency", type=int, default=4, help="동시 질문 수 (기본: 4)")
+    parser.add_argument("--repeat-rate", type=float, default=0.3, help="반복 질문 비율 (기본: 0.3)")
+    parser.add_argument("--target-ms", type=float, default=300.0, help="첫 토큰 p95 목표 (기본: 300ms)")
+    parser.add_argument("--embedding-latency-ms", type=float, default=30.0, help="임베딩 응답 지연(ms)")
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0, help="채팅 첫 토큰 지연(ms, 경량 모델은 배수만큼 빠름)")
+    parser.add_argument("--tokens-per-sec", type=float, default=2000.0, help="출력 토큰 처리량")
+    parser.add_argument("--mini-speedup", type=float, default=3.0, help="경량(*-mini) 모델 응답 속도 배수")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+
+    args = parser.parse_args()
+
+    fake_server = FakeOpenAIServer(FakeOpenAIConfig(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=300,
+        mini_speedup=args.mini_speedup
+    )).start()
+    workdir = tempfile.mkdtemp(prefix="lms_qa_bench_")
+    build_synthetic_subject(workdir, args.files, args.lectures)
+    os.environ.update({
+        "LMS_SUBJECTS_DIR": os.path.join(workdir, "subjects"),
+        "LMS_EXAMPLES_DIR": os.path.join(workdir, "examples"),
+        "OPENAI_BASE_URL": fake_server.base_url,
+        "OPENAI_API_KEY": "bench-key"
+    })
+    sys.path.insert(0, SRC_DIR)
+
+    from http.server import ThreadingHTTPServer
+    from qdrant_client import QdrantClient
+    from vector_builder import VectorBuilder
+    from generation_service import GenerationService, _make_handler
+    from job_queue import JobQueue
+
+    qdrant_client = QdrantClient(location=":memory:")
+    builder = VectorBuilder(BENCH_SUBJECT)
+    builder.qdrant_client = qdrant_client
+    print(f"📦 합성 코퍼스 {args.files}개 파일 수집 중...")
+    with contextlib.redirect_stdout(open(os.devnull, 'w')):
+        builder.build_vector_db()
+
+    service = GenerationService(JobQueue(os.path.join(workdir, "jobs.sqlite3")), workers=1)
+    service.get_generator(BENCH_SUBJECT).qdrant_client = qdrant_client
+    service.preload(BENCH_SUBJECT)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _make_handler(service))
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+
+    questions = make_questions(args.questions, args.lectures, args.repeat_rate)
+    print(f"💬 질문 {len(questions)}개 전송 (동시 {args.concurrency}개, 반복 {args.repeat_rate:.0%})")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        answers = list(executor.map(lambda payload: ask(base_url, payload), questions))
+    wall = time.perf_counter() - started
+    httpd.shutdown()
+    fake_server.stop()
+
+    errors = [answer for answer in answers if answer["done"].get("type") != "done"]
+    completed = [answer for answer in answers if answer["done"].get("type") == "done"]
+    report = {
+        "config": vars(args),
+        "wall_s": round(wall, 3),
+        "answered": len(completed),
+        "errors": len(errors),
+        "first_token": summarize([answer["first_token_s"] for answer in completed if answer["first_token_s"]]),
+        "retrieval": summarize([answer["done"]["retrieval_ms"] / 1000 for answer in completed]),
+        "total": summarize([answer["total_s"] for answer in completed]),
+        "context_tokens_mean": round(sum(answer["done"]["context_tokens"] for answer in completed)
+                                     / max(1, len(completed)), 1)
+    }
+    report["target_met"] = not errors and report["first_token"]["p95_ms"] <= args.target_ms
+
+    print("\n" + "=" * 60)
+    print(f"📊 질의응답 지연 ({report['answered']}개 응답, 오류 {report['errors']}개, {report['wall_s']:.2f}s)")
+    for name in ("retrieval", "first_token", "total"):
+        stats = report[name]
+        print(f"  {name:<12} p50={stats['p50_ms']:>7.1f}ms p95={stats['p95_ms']:>7.1f}ms max={stats['max_ms']:>7.1f}ms")
+    print(f"  평균 컨텍스트 {report['context_tokens_mean']:.0f}토큰")
+    print(f"{'✅' if report['target_met'] else '❌'} 첫 토큰 p95 {report['first_token']['p95_ms']:.1f}ms "
+          f"(목표 {args.target_ms:.0f}ms)")
+    print("=" * 60)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+    sys.exit(0 if report["target_met"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,424 @@
+"""
+LMS 생성기 종단간 벤치마크
+
+로컬 OpenAI 대역 서버와 인프로세스 Qdrant(:memory:)를 사용해
+합성 코퍼스 크기별로 VectorBuilder.build_vector_db와 generate_lecture_series를 실행하고
+처리량, 단계별 p50/p95 지연, 최대 RSS를 JSON으로 저장
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import random
+import argparse
+import resource
+import builtins
+import tempfile
+import functools
+import subprocess
+import contextlib
+import urllib.request
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.join(BENCH_DIR, '..')
+SRC_DIR = os.path.join(PROJECT_ROOT, 'src')
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+BENCH_SUBJECT = "bench"
+
+sys.path.insert(0, BENCH_DIR)
+from fake_openai import FakeOpenAIConfig, FakeOpenAIServer  # noqa: E402
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """최근접 순위 백분위수"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, int(round(pct / 100 * len(ordered) + 0.5 - 1e-9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class StageRecorder:
+    """메서드 래핑으로 단계별 지연 수집"""
+
+    def __init__(self):
+        self.samples = defaultdict(list)
+
+    def wrap(self, obj, method_name: str, stage: str):
+        original = getattr(obj, method_name)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self.samples[stage].append(time.perf_counter() - started)
+
+        setattr(obj, method_name, timed)
+
+    def summary(self, prefix: str) -> Dict[str, Dict]:
+        return {
+            stage: {
+                "count": len(samples),
+                "total_s": round(sum(samples), 4),
+                "p50_ms": round(percentile(samples, 50) * 1000, 2),
+                "p95_ms": round(percentile(samples, 95) * 1000, 2),
+                "max_ms": round(max(samples) * 1000, 2)
+            }
+            for stage, samples in sorted(self.samples.items())
+            if stage.startswith(prefix)
+        }
+
+
+def peak_rss_mb() -> float:
+    """현재 프로세스 최대 RSS (MB)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux는 KB, macOS는 바이트 단위
+    return round(peak / 1024 / (1024 if sys.platform == "darwin" else 1), 1)
+
+
+# ---------------------------------------------------------------------------
+# 합성 코퍼스
+# ---------------------------------------------------------------------------
+
+_APIS = ["UniTask.Delay", "UniTask.DelayFrame", "UniTask.WhenAll", "UniTask.WhenAny",
+         "UniTask.Yield", "UniTaskCompletionSource", "CancellationTokenSource",
+         "GetCancellationTokenOnDestroy", "IUniTaskAsyncEnumerable", "Progress.Create"]
+_VOCAB = ("async await cancellation token frame delay scene load resource exception "
+          "progress parallel stream event button memory performance player loop "
+          "timing coroutine operation handler callback result value state").split()
+
+
+def build_synthetic_subject(workdir: str, num_files: int, num_lectures: int, seed: int = 7):
+    """subjects/bench/{data,curriculum.json}와 품질 템플릿 생성"""
+    rng = random.Random(seed + num_files)
+    subject_dir = os.path.join(workdir, "subjects", BENCH_SUBJECT)
+    data_dir = os.path.join(subject_dir, "data", "Repo")
+    os.makedirs(os.path.join(data_dir, "src"), exist_ok=True)
+    os.makedirs(os.path.join(data_dir, "docs"), exist_ok=True)
+
+    readme = "\n".join(
+        f"# README {line}\n" + " ".join(rng.choice(_VOCAB) for _ in range(40))
+        for line in range(30)
+    )
+    for index in range(num_files):
+        if index % 10 == 9:
+            # 벤더링된 README 사본 (근중복 제거 대상)
+            path = os.path.join(data_dir, "docs", f"README_copy_{index}.md")
+            content = readme
+        elif index % 2 == 0:
+            path = os.path.join(data_dir, "src", f"Component{index}.cs")
+            methods = []
+            for method in range(rng.randint(8, 20)):
+                api = rng.choice(_APIS)
+                comment = " ".join(rng.choice(_VOCAB) for _ in range(12))
+                methods.append(
+                    f"    // {comment}\n"
+                    f"    public async UniTask Method{method}(CancellationToken token)\n"
+                    f"    {{\n        await {api}(token);\n    }}\n"
+                )
+            content = f"public class Component{index} : MonoBehaviour\n{{\n" + "\n".join(methods) + "}\n"
+        else:
+            path = os.path.join(data_dir, "docs", f"Guide{index}.md")
+            sections = []
+            for section in range(rng.randint(4, 10)):
+                body = " ".join(rng.choice(_VOCAB) for _ in range(rng.randint(80, 200)))
+                sections.append(f"## {rng.choice(_APIS)} {section}\n\n{body}\n")
+            content = "\n".join(sections)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+
+    lectures = []
+    for number in range(1, num_lectures + 1):
+        keywords = rng.sample(_VOCAB, 5)
+        lectures.append({
+            "number": number,
+            "title": f"벤치마크 강의 {number}",
+            "description": ", ".join(keywords),
+            "filename": f"lecture_{number:02d}_bench.md",
+            "focus_keywords": keywords,
+            "main_apis": rng.sample(_APIS, 3),
+            "avoid_topics": []
+        })
+    curriculum = {
+        "subject": {
+            "name": "Bench",
+            "description": "벤치마크용 합성 주제",
+            "quality_template": f"{BENCH_SUBJECT}_lecture_example.md",
+            "total_lectures": num_lectures
+        },
+        "lectures": lectures
+    }
+    with open(os.path.join(subject_dir, "curriculum.json"), 'w', encoding='utf-8') as f:
+        json.dump(curriculum, f, ensure_ascii=False, indent=2)
+
+    examples_dir = os.path.join(workdir, "examples")
+    os.makedirs(examples_dir, exist_ok=True)
+    shutil.copyfile(
+        os.path.join(PROJECT_ROOT, "examples", "unitask_lecture_example.md"),
+        os.path.join(examples_dir, f"{BENCH_SUBJECT}_lecture_example.md")
+    )
+
+
+# ---------------------------------------------------------------------------
+# 워커 (크기별 독립 프로세스: 최대 RSS를 분리 측정)
+# ---------------------------------------------------------------------------
+
+def run_worker(args) -> Dict:
+    workdir = args.workdir
+    build_synthetic_subject(workdir, args.size, args.lectures)
+
+    os.environ.update({
+        "LMS_SUBJECTS_DIR": os.path.join(workdir, "subjects"),
+        "LMS_EXAMPLES_DIR": os.path.join(workdir, "examples"),
+        "OPENAI_BASE_URL": args.base_url,
+        "OPENAI_API_KEY": "bench-key"
+    })
+    sys.path.insert(0, SRC_DIR)
+
+    from qdrant_client import QdrantClient
+    from vector_builder import VectorBuilder
+    from main import LMSBatchGenerator
+    from lecture_generator import apply_model_routes
+    from config import GENERATION_CONFIG
+
+    apply_model_routes(args.route)
+    GENERATION_CONFIG["query_expansion"] = args.expand_queries
+
+    # 연속 실패 확인 프롬프트가 벤치마크를 멈추지 않도록 함
+    builtins.input = lambda *_: "y"
+
+    recorder = StageRecorder()
+    qdrant_client = QdrantClient(location=":memory:")
+    log = sys.stdout if args.verbose else open(os.devnull, 'w')
+    result = {"size_files": args.size}
+
+    # 1. 수집/임베딩/저장
+    builder = VectorBuilder(BENCH_SUBJECT, jobs=args.jobs)
+    builder.qdrant_client = qdrant_client
+    recorder.wrap(builder, "load_chunks", "ingest.chunk")
+    recorder.wrap(builder, "remove_near_duplicates", "ingest.dedup")
+    recorder.wrap(builder, "generate_embeddings", "ingest.embed")
+    recorder.wrap(builder, "store_vectors", "ingest.upsert")
+    recorder.wrap(builder.openai_client.embeddings, "create", "ingest.embedding_call")
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        builder.build_vector_db()
+    ingest_wall = time.perf_counter() - started
+    points = qdrant_client.count(builder.collection_name).count
+    result["ingest"] = {
+        "wall_s": round(ingest_wall, 3),
+        "points": points,
+        "points_per_s": round(points / ingest_wall, 1),
+        "stages": recorder.summary("ingest.")
+    }
+    result["rss_after_ingest_mb"] = peak_rss_mb()
+
+    # 2. 강의 배치 생성
+    generator = LMSBatchGenerator(BENCH_SUBJECT, mode=args.mode)
+    generator.rate_limit_delay = 0
+    lecture_generator = generator.lecture_generator
+    lecture_generator.qdrant_client = qdrant_client
+    recorder.wrap(generator, "generate_single_lecture", "generate.lecture")
+    recorder.wrap(lecture_generator, "search_multiple_queries", "generate.rag_search")
+    recorder.wrap(lecture_generator, "_build_lecture_prompt", "generate.prompt_build")
+    recorder.wrap(lecture_generator, "repair_lecture", "generate.validate_repair")
+    recorder.wrap(lecture_generator, "save_lecture", "generate.save")
+    recorder.wrap(lecture_generator.openai_client.chat.completions, "create", "generate.completion")
+    recorder.wrap(lecture_generator.openai_client.embeddings, "create", "generate.embedding_call")
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(log):
+        outcome = generator.generate_lecture_series(skip_existing=False)
+    generation_wall = time.perf_counter() - started
+    result["generation"] = {
+        "wall_s": round(generation_wall, 3),
+        "lectures": args.lectures,
+        "success": len(outcome["success"]),
+        "failed": len(outcome["failed"]),
+        "lectures_per_min": round(len(outcome["success"]) / generation_wall * 60, 2),
+        "stages": recorder.summary("generate.")
+    }
+    result["peak_rss_mb"] = peak_rss_mb()
+
+    from tracing import get_tracer
+    from single_flight import single_flight_stats
+    result["tokens"] = get_tracer().usage_totals()
+    result["usage_by_stage"] = [
+        {"stage": stage, "model": model, **stats}
+        for (stage, model), stats in sorted(get_tracer().usage_stats.items())
+    ]
+    result["single_flight"] = single_flight_stats()
+    return result
+
+
+# ---------------------------------------------------------------------------
+# 오케스트레이터
+# ---------------------------------------------------------------------------
+
+def _fetch_stats(server: FakeOpenAIServer) -> Dict:
+    with urllib.request.urlopen(server.base_url + "/stats") as response:
+        return json.loads(response.read())
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, text=True, stderr=subprocess.DEVNULL
+        ).strip()
+    except Exception:
+        return "unknown"
+
+
+def print_results(report: Dict):
+    print("\n" + "=" * 78)
+    print("📊 벤치마크 결과")
+    print("=" * 78)
+    print(f"{'파일':>6} {'포인트':>7} {'수집(s)':>9} {'pts/s':>9} {'생성(s)':>9} {'강의/분':>8} {'RSS(MB)':>9}")
+    for entry in report["results"]:
+        ingest = entry["ingest"]
+        generation = entry["generation"]
+        print(f"{entry['size_files']:>6} {ingest['points']:>7} {ingest['wall_s']:>9.2f} "
+              f"{ingest['points_per_s']:>9.1f} {generation['wall_s']:>9.2f} "
+              f"{generation['lectures_per_min']:>8.2f} {entry['peak_rss_mb']:>9.1f}")
+
+    print("\n단계별 지연 (가장 큰 코퍼스 기준)")
+    largest = report["results"][-1]
+    stages = {**largest["ingest"]["stages"], **largest["generation"]["stages"]}
+    for stage, stats in stages.items():
+        print(f"  {stage:<28} n={stats['count']:<5} p50={stats['p50_ms']:>9.1f}ms p95={stats['p95_ms']:>9.1f}ms")
+    if largest.get("usage_by_stage"):
+        print("\n단계 / 모델별 토큰 (가장 큰 코퍼스 기준)")
+        for usage in largest["usage_by_stage"]:
+            print(f"  {usage['stage'] + ' / ' + usage['model']:<40} n={usage['calls']:<5} "
+                  f"출력={usage['completion_tokens']:>8,} ${usage['cost_usd']:.4f}")
+    print("=" * 78)
+
+
+def compare_results(report: Dict, baseline_path: str):
+    """이전 결과 파일과 크기별 소요 시간 비교"""
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    previous = {entry["size_files"]: entry for entry in baseline["results"]}
+
+    print(f"\n🔁 기준 결과와 비교: {baseline_path} ({baseline.get('git_commit')})")
+    for entry in report["results"]:
+        before = previous.get(entry["size_files"])
+        if before is None:
+            continue
+        for phase in ("ingest", "generation"):
+            old, new = before[phase]["wall_s"], entry[phase]["wall_s"]
+            change = (new - old) / old * 100 if old else 0.0
+            print(f"  {entry['size_files']:>6}파일 {phase:<10} {old:>8.2f}s → {new:>8.2f}s ({change:+.1f}%)")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="LMS 생성기 종단간 벤치마크")
+    parser.add_argument("--sizes", default="50,200,800", help="합성 코퍼스 파일 수 목록 (기본: 50,200,800)")
+    parser.add_argument("--lectures", type=int, default=4, help="크기별 생성 강의 수 (기본: 4)")
+    parser.add_argument("--jobs", type=int, default=1, help="VectorBuilder 청킹 프로세스 수")
+    parser.add_argument("--mode", choices=["single", "sections"], default="single",
+                        help="강의 생성 방식 (기본: single)")
+    parser.add_argument("--embedding-latency-ms", type=float, default=30.0, help="임베딩 응답 지연(ms)")
+    parser.add_argument("--chat-latency-ms", type=float, default=200.0, help="채팅 첫 토큰 지연(ms)")
+    parser.add_argument("--tokens-per-sec", type=float, default=2000.0, help="출력 토큰 처리량")
+    parser.add_argument("--output-tokens", type=int, default=3000, help="채팅 응답 토큰 수")
+    parser.add_argument("--rate-429", type=float, default=0.0, help="429 응답 주입 비율 (0~1)")
+    parser.add_argument("--truncate-rate", type=float, default=0.0,
+                        help="잘린 채팅 응답 주입 비율 (0~1, 섹션 보완 경로 측정)")
+    parser.add_argument("--route", action="append", metavar="STAGE=MODEL",
+                        help="단계별 모델 지정 (예: outline=gpt-4o, 반복 가능)")
+    parser.add_argument("--expand-queries", action="store_true", help="경량 모델로 RAG 검색 쿼리 확장")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/bench_<시각>.json)")
+    parser.add_argument("--compare", help="비교할 이전 결과 JSON")
+    parser.add_argument("--verbose", action="store_true", help="생성기 로그 출력")
+    # 내부용: 크기별 워커 프로세스
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--workdir", help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    parser.add_argument("--result-file", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.worker:
+        result = run_worker(args)
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(result, f)
+        return
+
+    config = FakeOpenAIConfig(
+        embedding_latency_ms=args.embedding_latency_ms,
+        chat_latency_ms=args.chat_latency_ms,
+        tokens_per_sec=args.tokens_per_sec,
+        output_tokens=args.output_tokens,
+        rate_429=args.rate_429,
+        truncate_rate=args.truncate_rate
+    )
+    server = FakeOpenAIServer(config).start()
+    print(f"🧪 OpenAI 대역 서버: {server.base_url}")
+
+    sizes = [int(size) for size in args.sizes.split(",") if size.strip()]
+    report = {
+        "run_at": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": sys.version.split()[0],
+        "settings": {"sizes": sizes, "lectures": args.lectures, "jobs": args.jobs,
+                     "mode": args.mode, "routes": args.route or [], "expand_queries": args.expand_queries,
+                     "fake_openai": config.to_dict()},
+        "results": []
+    }
+
+    try:
+        for size in sizes:
+            print(f"🚀 코퍼스 {size}개 파일 벤치마크 실행 중...")
+            before = _fetch_stats(server)
+            with tempfile.TemporaryDirectory(prefix="lms_bench_") as workdir:
+                result_file = os.path.join(workdir, "result.json")
+                command = [
+                    sys.executable, os.path.abspath(__file__), "--worker",
+                    "--size", str(size), "--lectures", str(args.lectures), "--jobs", str(args.jobs),
+                    "--mode", args.mode,
+                    "--workdir", workdir, "--base-url", server.base_url, "--result-file", result_file
+                ]
+                for route in args.route or []:
+                    command += ["--route", route]
+                if args.expand_queries:
+                    command.append("--expand-queries")
+                if args.verbose:
+                    command.append("--verbose")
+                subprocess.run(command, check=True)
+                with open(result_file, 'r', encoding='utf-8') as f:
+                    result = json.load(f)
+            after = _fetch_stats(server)
+            result["api_calls"] = {key: after[key] - before[key] for key in after}
+            report["results"].append(result)
+            print(f"✅ {size}개 파일: 수집 {result['ingest']['wall_s']:.2f}s, "
+                  f"생성 {result['generation']['wall_s']:.2f}s")
+    finally:
+        server.stop()
+
+    output_path = args.output or os.path.join(
+        RESULTS_DIR, f"bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print_results(report)
+    print(f"💾 결과 저장: {output_path}")
+
+    if args.compare:
+        compare_results(report, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,26 @@
+"""
+원자적 파일 쓰기 모듈
+
+강의 파일, 강의 목록, 검색 캐시, 컬렉션 버전, 색인 상태, 커리큘럼 색인 등
+여러 스레드/프로세스/노드가 동시에 읽고 쓰는 파일을 임시 파일 + 교체 방식으로 저장
+"""
+
+import os
+
+
+def write_atomic(path: str, data: bytes):
+    """같은 디렉터리의 임시 파일에 쓴 뒤 교체 (읽는 쪽이 쓰다 만 파일을 보지 않도록)
+
+    임시 파일명에 난수를 붙여 공유 볼륨의 여러 노드/프로세스가 같은 파일을 동시에 써도 충돌하지 않음
+    """
+    tmp_path = f"{path}.{os.urandom(4).hex()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
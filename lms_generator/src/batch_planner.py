@@ -0,0 +1,315 @@
+"""
+배치 실행 계획 모듈
+
+API 호출 없이 강의별 프롬프트를 로컬에서 구성하고 토크나이저로 토큰 수를 계산
+모델별 RPM/TPM 한도, 섹션 동시성, 강의 간 대기시간을 적용해 강의별/전체 예상 소요 시간과 비용 산출
+(검증 보완 호출은 실패한 강의에서만 발생하므로 계획에 포함하지 않음)
+"""
+
+import os
+import glob
+import heapq
+import statistics
+from typing import Dict, List, Optional
+
+from config import GENERATION_CONFIG, RAG_CONFIG, LECTURE_SECTIONS, get_model_limits, get_stage_model
+from lecture_generator import LectureGenerator, SYSTEM_PROMPT
+from lecture_validator import parse_sections
+from tracing import estimate_cost
+from token_counter import TokenCounter
+
+# 로컬 검색 캐시에 없는 쿼리의 컨텍스트 대신 사용할 원본 데이터 표본 파일 수
+SAMPLE_FILE_LIMIT = 20
+
+
+class BatchPlanner:
+    """강의 배치 실행 계획 (토큰/비용/소요 시간 예측) 클래스"""
+
+    def __init__(self, lecture_generator: LectureGenerator, rate_limit_delay: float = 10):
+        self.generator = lecture_generator
+        self.rate_limit_delay = rate_limit_delay
+        self.counter = TokenCounter()
+        self._sample_contexts = None
+        self._reference_outputs = None
+
+    # ------------------------------------------------------------------
+    # 로컬 입력 (검색 캐시, 원본 데이터 표본, 기존 강의 분량)
+    # ------------------------------------------------------------------
+
+    def _get_sample_contexts(self) -> List[Dict]:
+        """검색 결과 대용 컨텍스트: 원본 데이터 파일에서 청크 크기만큼 잘라낸 표본"""
+        if self._sample_contexts is not None:
+            return self._sample_contexts
+
+        chunk_size = RAG_CONFIG["chunk_size"]
+        data_dir = self.generator.paths["data_dir"]
+        file_paths = []
+        for pattern in ("**/*.cs", "**/*.md"):
+            file_paths += sorted(glob.glob(os.path.join(data_dir, pattern), recursive=True))
+
+        samples = []
+        for file_path in file_paths[:SAMPLE_FILE_LIMIT]:
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    text = f.read(chunk_size)
+            except OSError:
+                continue
+            if text.strip():
+                samples.append({"file_path": os.path.relpath(file_path, data_dir), "score": 0.5, "text": text})
+
+        if not samples:
+            # 원본 데이터가 없으면 품질 기준 예시를 청크 크기로 잘라 사용
+            template = self.generator.quality_template
+            samples = [{"file_path": "(표본)", "score": 0.5, "text": template[i:i + chunk_size]}
+                       for i in range(0, len(template), chunk_size)]
+
+        self._sample_contexts = samples
+        return samples
+
+    def _plan_contexts(self, queries: List[str]) -> Dict:
+        """검색 컨텍스트 구성: 로컬 캐시 결과 우선, 부족분은 표본으로 채움"""
+        cache = self.generator.query_cache
+        results = []
+        uncached = []
+        for query in queries:
+            cached = cache.get_exact(query, RAG_CONFIG["query_top_k"]) if cache is not None else None
+            if cached is None:
+                uncached.append(query)
+                continue
+            results.append(cached)
+        contexts = self.generator.merge_contexts(results)
+
+        samples = self._get_sample_contexts()
+        for i in range(RAG_CONFIG["top_k_results"] - len(contexts)):
+            contexts.append(samples[i % len(samples)])
+        return {"contexts": contexts, "uncached": uncached}
+
+    def _get_reference_outputs(self, model: str) -> Dict[str, int]:
+        """섹션별 예상 출력 토큰: 이미 생성된 강의의 섹션 분량 평균 (없으면 품질 기준 예시)"""
+        if self._reference_outputs is not None:
+            return self._reference_outputs
+
+        documents = []
+        for file_path in sorted(glob.glob(os.path.join(self.generator.paths["generated_dir"], "*.md"))):
+            with open(file_path, 'r', encoding='utf-8') as f:
+                documents.append(f.read())
+        if not documents:
+            documents = [self.generator.quality_template]
+
+        per_section = {spec["key"]: [] for spec in LECTURE_SECTIONS}
+        totals = []
+        for document in documents:
+            sizes = {key: 0 for key in per_section}
+            for block in parse_sections(document):
+                if block["key"] == "preamble":
+                    continue
+                sizes[block["key"] or "solution"] += self.counter.count(block["text"], model)
+            for key, size in sizes.items():
+                per_section[key].append(size)
+            totals.append(self.counter.count(document, model))
+
+        self._reference_outputs = {key: int(statistics.mean(sizes)) for key, sizes in per_section.items()}
+        self._reference_outputs["lecture"] = int(statistics.median(totals))
+        return self._reference_outputs
+
+    # ------------------------------------------------------------------
+    # 호출별 계획
+    # ------------------------------------------------------------------
+
+    def _call(self, stage: str, prompt: str, max_tokens: int, expected_output: Optional[int] = None,
+              **attrs) -> Dict:
+        model = get_stage_model(stage)
+        limits = get_model_limits(model)
+        output_tokens = min(max_tokens, expected_output if expected_output is not None else max_tokens)
+        call = {
+            "stage": stage,
+            "model": model,
+            "input_tokens": self.counter.count_messages([SYSTEM_PROMPT, prompt], model),
+            "output_tokens": output_tokens,
+            "max_tokens": max_tokens,
+            "seconds": limits["first_token_s"] + output_tokens / limits["tokens_per_sec"]
+        }
+        call["cost_usd"] = estimate_cost(model, call["input_tokens"], output_tokens)
+        call.update(attrs)
+        return call
+
+    def plan_lecture(self, lecture_info: Dict) -> Dict:
+        """강의 하나의 API 호출 목록 (프롬프트는 실제 생성과 같은 코드로 구성)"""
+        generator = self.generator
+        keywords = generator.get_focus_keywords(lecture_info)
+        queries = generator.build_search_queries(lecture_info, keywords)
+        calls = []
+
+        if GENERATION_CONFIG["query_expansion"]:
+            calls.append(self._call("query", generator._build_query_expansion_prompt(lecture_info, queries),
+                                    GENERATION_CONFIG["query_expansion_max_tokens"], phase="prepare"))
+
+        plan = self._plan_contexts(queries)
+        embedding_model = RAG_CONFIG["embedding_model"]
+        embedding_limits = get_model_limits(embedding_model)
+        uncached = plan["uncached"]
+        if GENERATION_CONFIG["query_expansion"]:
+            # 확장 쿼리는 실행 전에는 알 수 없으므로 기본 쿼리 길이로 대신 계산
+            uncached = uncached + queries[:GENERATION_CONFIG["query_expansion_count"]]
+        for query in uncached:
+            tokens = self.counter.count(query, embedding_model)
+            calls.append({"stage": "embedding", "model": embedding_model, "input_tokens": tokens,
+                          "output_tokens": 0, "max_tokens": 0, "seconds": embedding_limits["first_token_s"],
+                          "cost_usd": estimate_cost(embedding_model, tokens, 0), "phase": "prepare"})
+
+        contexts = plan["contexts"]
+        if generator.mode == "sections":
+            context_text = generator._format_rag_contexts(contexts)
+            outline_tokens = GENERATION_CONFIG["outline_max_tokens"]
+            calls.append(self._call("outline", generator._build_outline_prompt(lecture_info, context_text, keywords),
+                                    outline_tokens, phase="outline"))
+            # 섹션 프롬프트에는 개요가 포함되므로 개요 최대 분량만큼 입력 토큰 추가
+            references = self._get_reference_outputs(get_stage_model("section"))
+            for spec, part in generator.section_jobs():
+                call = self._call(
+                    "section",
+                    generator._build_section_prompt(spec, lecture_info, context_text, "", keywords, part),
+                    spec.get("max_tokens", GENERATION_CONFIG["section_max_tokens"]),
+                    references[spec["key"]] // spec.get("parts", 1) or None,
+                    phase="sections", section=spec["key"], part=part
+                )
+                call["input_tokens"] += outline_tokens
+                calls.append(call)
+        else:
+            prompt = generator._build_lecture_prompt(lecture_info, contexts, keywords)
+            references = self._get_reference_outputs(get_stage_model("lecture"))
+            calls.append(self._call("lecture", prompt, GENERATION_CONFIG["max_tokens"], references["lecture"] or None,
+                                    phase="lecture"))
+
+        return {
+            "number": lecture_info["number"],
+            "title": lecture_info["title"],
+            "queries": len(queries),
+            "cached_queries": len(queries) - len(plan["uncached"]),
+            "calls": calls
+        }
+
+    # ------------------------------------------------------------------
+    # 소요 시간 / 한도 적용
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _makespan(durations: List[float], concurrency: int) -> float:
+        """동시 실행 수 제한에서 제출 순서대로 처리할 때 전체 소요 시간"""
+        workers = [0.0] * max(1, min(concurrency, len(durations)))
+        for duration in durations:
+            heapq.heappush(workers, heapq.heappop(workers) + duration)
+        return max(workers) if durations else 0.0
+
+    def lecture_seconds(self, lecture_plan: Dict, concurrency: Optional[int] = None) -> Dict:
+        """강의 예상 소요 시간 (응답 지연과 RPM/TPM 한도 중 큰 값)"""
+        concurrency = concurrency or GENERATION_CONFIG["section_concurrency"]
+        calls = lecture_plan["calls"]
+        latency = sum(call["seconds"] for call in calls if call["phase"] != "sections")
+        latency += self._makespan([call["seconds"] for call in calls if call["phase"] == "sections"], concurrency)
+
+        # OpenAI는 요청 시점에 입력 + max_tokens를 TPM 한도에서 차감
+        limit_floor = 0.0
+        for model in {call["model"] for call in calls}:
+            limits = get_model_limits(model)
+            model_calls = [call for call in calls if call["model"] == model]
+            tokens = sum(call["input_tokens"] + call["max_tokens"] for call in model_calls)
+            limit_floor = max(limit_floor, tokens / limits["tpm"] * 60, len(model_calls) / limits["rpm"] * 60)
+
+        return {"seconds": max(latency, limit_floor), "latency_s": latency, "limit_s": limit_floor,
+                "throttled": limit_floor > latency}
+
+    def plan(self, lectures: List[Dict]) -> Dict:
+        """배치 전체 계획"""
+        lecture_plans = [self.plan_lecture(lecture_info) for lecture_info in lectures]
+        for lecture_plan in lecture_plans:
+            lecture_plan.update(self.lecture_seconds(lecture_plan))
+            lecture_plan["input_tokens"] = sum(call["input_tokens"] for call in lecture_plan["calls"])
+            lecture_plan["output_tokens"] = sum(call["output_tokens"] for call in lecture_plan["calls"])
+            lecture_plan["cost_usd"] = sum(call["cost_usd"] for call in lecture_plan["calls"])
+
+        delays = self.rate_limit_delay * max(0, len(lecture_plans) - 1)
+        totals = {
+            "lectures": len(lecture_plans),
+            "calls": sum(len(lecture_plan["calls"]) for lecture_plan in lecture_plans),
+            "input_tokens": sum(lecture_plan["input_tokens"] for lecture_plan in lecture_plans),
+            "output_tokens": sum(lecture_plan["output_tokens"] for lecture_plan in lecture_plans),
+            "cost_usd": sum(lecture_plan["cost_usd"] for lecture_plan in lecture_plans),
+            "delay_s": delays,
+            "seconds": sum(lecture_plan["seconds"] for lecture_plan in lecture_plans) + delays
+        }
+
+        by_model = {}
+        for lecture_plan in lecture_plans:
+            for call in lecture_plan["calls"]:
+                stats = by_model.setdefault((call["stage"], call["model"]), {
+                    "calls": 0, "input_tokens": 0, "output_tokens": 0, "cost_usd": 0.0
+                })
+                stats["calls"] += 1
+                stats["input_tokens"] += call["input_tokens"]
+                stats["output_tokens"] += call["output_tokens"]
+                stats["cost_usd"] += call["cost_usd"]
+
+        return {
+            "mode": self.generator.mode,
+            "lectures": lecture_plans,
+            "by_stage": by_model,
+            "totals": totals,
+            "estimated_tokens": sorted(self.counter.estimated_models)
+        }
+
+    def concurrency_options(self, plan: Dict) -> List[Dict]:
+        """섹션 동시성별 전체 예상 시간 (sections 모드)"""
+        jobs = len(self.generator.section_jobs())
+        options = []
+        for concurrency in sorted({1, 2, 4, 8, jobs, GENERATION_CONFIG["section_concurrency"]}):
+            if concurrency > jobs:
+                continue
+            seconds = sum(self.lecture_seconds(lecture_plan, concurrency)["seconds"]
+                          for lecture_plan in plan["lectures"]) + plan["totals"]["delay_s"]
+            options.append({"concurrency": concurrency, "seconds": seconds})
+        return options
+
+
+def _format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(round(seconds)), 60)
+    hours, minutes = divmod(minutes, 60)
+    if hours:
+        return f"{hours}시간 {minutes}분"
+    return f"{minutes}분 {seconds}초" if minutes else f"{seconds}초"
+
+
+def print_plan(planner: BatchPlanner, plan: Dict):
+    """배치 실행 계획 출력"""
+    totals = plan["totals"]
+    print("=" * 78)
+    print(f"🧮 배치 실행 계획 (API 호출 없음, 생성 방식: {plan['mode']})")
+    print("=" * 78)
+    print(f"{'강의':>4} {'호출':>4} {'입력 토큰':>10} {'출력 토큰':>10} {'비용($)':>9} {'예상 시간':>10}  제목")
+    for lecture_plan in plan["lectures"]:
+        mark = " ⏳" if lecture_plan["throttled"] else ""
+        print(f"{lecture_plan['number']:>4} {len(lecture_plan['calls']):>4} {lecture_plan['input_tokens']:>10,} "
+              f"{lecture_plan['output_tokens']:>10,} {lecture_plan['cost_usd']:>9.4f} "
+              f"{_format_duration(lecture_plan['seconds']):>10}  {lecture_plan['title']}{mark}")
+
+    print(f"\n{'단계 / 모델':<40} {'호출':>6} {'입력 토큰':>12} {'출력 토큰':>12} {'비용($)':>10}")
+    for (stage, model), stats in sorted(plan["by_stage"].items()):
+        print(f"{stage + ' / ' + model:<40} {stats['calls']:>6} {stats['input_tokens']:>12,} "
+              f"{stats['output_tokens']:>12,} {stats['cost_usd']:>10.4f}")
+
+    print(f"\n📊 합계: {totals['lectures']}개 강의, API 호출 {totals['calls']}회, "
+          f"입력 {totals['input_tokens']:,} / 출력 {totals['output_tokens']:,} 토큰")
+    print(f"💰 예상 비용: ${totals['cost_usd']:.2f}")
+    print(f"⏱️  예상 소요 시간: {_format_duration(totals['seconds'])} "
+          f"(강의 간 대기 {_format_duration(totals['delay_s'])} 포함)")
+
+    if plan["mode"] == "sections" and plan["lectures"]:
+        options = ", ".join(f"{option['concurrency']}개 {_format_duration(option['seconds'])}"
+                            for option in planner.concurrency_options(plan))
+        print(f"🔀 섹션 동시성별 예상 시간: {options}")
+    if any(lecture_plan["throttled"] for lecture_plan in plan["lectures"]):
+        print("⏳ 표시된 강의는 응답 속도보다 RPM/TPM 한도가 소요 시간을 결정합니다 (OPENAI_RATE_LIMITS로 한도 조정)")
+    if plan["estimated_tokens"]:
+        print(f"⚠️  tiktoken 인코딩을 불러올 수 없어 문자 수로 추정: {', '.join(plan['estimated_tokens'])}")
+    print("ℹ️  검증 보완 호출(실패 섹션 재생성)은 포함되지 않은 최소 추정치입니다")
+    print("=" * 78)
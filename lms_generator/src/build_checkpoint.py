@@ -0,0 +1,117 @@
+"""
+벡터 DB 구축 체크포인트 모듈
+
+임베딩/업서트 배치 완료 내역을 저널(JSONL)로 기록하고
+임베딩 결과를 배치 단위 .npy 파일로 보존하여 실패한 빌드를 이어서 진행
+"""
+
+import os
+import json
+import shutil
+import hashlib
+from typing import TYPE_CHECKING, Dict, List, Optional, Set
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class BuildCheckpoint:
+    """벡터 DB 구축 체크포인트 관리 클래스"""
+
+    JOURNAL_FILE = "journal.jsonl"
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, checkpoint_dir: str):
+        self.checkpoint_dir = checkpoint_dir
+        self.journal_path = os.path.join(checkpoint_dir, self.JOURNAL_FILE)
+        self.manifest_path = os.path.join(checkpoint_dir, self.MANIFEST_FILE)
+        self.embedded_batches: Set[int] = set()
+        self.upserted_batches: Set[int] = set()
+
+    @staticmethod
+    def fingerprint(chunks: List[Dict], settings: Dict) -> str:
+        """청크 구성과 빌드 설정으로 체크포인트 식별값 생성"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps(settings, sort_keys=True).encode("utf-8"))
+        for chunk in chunks:
+            digest.update(chunk["id"].encode("utf-8"))
+            digest.update(hashlib.sha1(chunk["text"].encode("utf-8")).digest())
+        return digest.hexdigest()
+
+    def _batch_path(self, batch_index: int) -> str:
+        return os.path.join(self.checkpoint_dir, f"embed_{batch_index:05d}.npy")
+
+    def exists(self) -> bool:
+        """체크포인트 존재 여부"""
+        return os.path.exists(self.manifest_path)
+
+    def start(self, fingerprint: str, settings: Dict):
+        """새 체크포인트 시작 (기존 체크포인트 삭제)"""
+        self.clear()
+        os.makedirs(self.checkpoint_dir, exist_ok=True)
+        manifest = {"fingerprint": fingerprint, "settings": settings}
+        with open(self.manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+
+    def load(self, fingerprint: str) -> bool:
+        """기존 체크포인트 로드 (식별값이 다르면 False)"""
+        if not self.exists():
+            return False
+
+        with open(self.manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get("fingerprint") != fingerprint:
+            return False
+
+        self.embedded_batches.clear()
+        self.upserted_batches.clear()
+        if os.path.exists(self.journal_path):
+            with open(self.journal_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue  # 중단 시점에 잘린 마지막 줄
+                    batch_index = entry["batch"]
+                    if entry["stage"] == "embed" and os.path.exists(self._batch_path(batch_index)):
+                        self.embedded_batches.add(batch_index)
+                    elif entry["stage"] == "upsert":
+                        self.upserted_batches.add(batch_index)
+        return True
+
+    def _append(self, stage: str, batch_index: int):
+        with open(self.journal_path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({"stage": stage, "batch": batch_index}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save_embeddings(self, batch_index: int, vectors: "np.ndarray"):
+        """임베딩 배치 저장 후 저널 기록"""
+        import numpy as np
+
+        path = self._batch_path(batch_index)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, vectors)
+        os.replace(tmp_path, path)
+        self._append("embed", batch_index)
+        self.embedded_batches.add(batch_index)
+
+    def load_embeddings(self, batch_index: int) -> Optional["np.ndarray"]:
+        """저장된 임베딩 배치 로드"""
+        if batch_index not in self.embedded_batches:
+            return None
+        import numpy as np
+        return np.load(self._batch_path(batch_index))
+
+    def mark_upserted(self, batch_index: int):
+        """업서트 완료 배치 기록"""
+        self._append("upsert", batch_index)
+        self.upserted_batches.add(batch_index)
+
+    def clear(self):
+        """체크포인트 삭제"""
+        if os.path.exists(self.checkpoint_dir):
+            shutil.rmtree(self.checkpoint_dir)
+        self.embedded_batches.clear()
+        self.upserted_batches.clear()
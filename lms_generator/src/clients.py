@@ -0,0 +1,127 @@
+"""
+공유 API 클라이언트 모듈
+
+프로세스당 하나의 OpenAI / Qdrant 클라이언트를 만들어 재사용
+연결 풀 크기, keep-alive, 타임아웃, Qdrant gRPC 사용 여부를 CLIENT_CONFIG로 제어
+"""
+
+import os
+import threading
+from typing import Dict, Optional, Tuple
+
+from config import CLIENT_CONFIG, OPENAI_API_KEY, QDRANT_URL, QDRANT_API_KEY
+
+_lock = threading.Lock()
+_clients: Dict[Tuple, object] = {}
+_owner_pid = os.getpid()
+
+
+def _reset_after_fork():
+    """fork된 자식 프로세스는 부모의 연결을 공유하지 않도록 레지스트리 초기화"""
+    global _owner_pid
+    if os.getpid() != _owner_pid:
+        _clients.clear()
+        _owner_pid = os.getpid()
+
+
+def _get_or_create(key: Tuple, factory):
+    with _lock:
+        _reset_after_fork()
+        client = _clients.get(key)
+        if client is None:
+            client = factory()
+            _clients[key] = client
+        return client
+
+
+def _openai_limits(openai):
+    """SDK가 사용하는 httpx 구현의 Limits 타입으로 연결 풀 설정 생성"""
+    limits_class = type(openai.DEFAULT_CONNECTION_LIMITS)
+    return limits_class(
+        max_connections=CLIENT_CONFIG["openai_max_connections"],
+        max_keepalive_connections=CLIENT_CONFIG["openai_max_keepalive"],
+        keepalive_expiry=CLIENT_CONFIG["keepalive_expiry"]
+    )
+
+
+def _openai_timeout(openai):
+    return openai.Timeout(CLIENT_CONFIG["openai_timeout"], connect=CLIENT_CONFIG["openai_connect_timeout"])
+
+
+def get_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """공유 OpenAI 클라이언트 (keep-alive 연결 풀)"""
+    api_key = api_key or OPENAI_API_KEY
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+
+    def factory():
+        import openai
+
+        return openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=CLIENT_CONFIG["openai_max_retries"],
+            timeout=_openai_timeout(openai),
+            http_client=openai.DefaultHttpxClient(limits=_openai_limits(openai))
+        )
+
+    return _get_or_create(("openai", api_key, base_url), factory)
+
+
+def get_async_openai_client(api_key: Optional[str] = None, base_url: Optional[str] = None):
+    """공유 비동기 OpenAI 클라이언트 (asyncio 호출자용)"""
+    api_key = api_key or OPENAI_API_KEY
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+
+    def factory():
+        import openai
+
+        return openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=CLIENT_CONFIG["openai_max_retries"],
+            timeout=_openai_timeout(openai),
+            http_client=openai.DefaultAsyncHttpxClient(limits=_openai_limits(openai))
+        )
+
+    return _get_or_create(("async_openai", api_key, base_url), factory)
+
+
+def get_qdrant_client(url: Optional[str] = None, prefer_grpc: Optional[bool] = None):
+    """공유 Qdrant 클라이언트 (REST keep-alive 또는 gRPC)"""
+    url = url or QDRANT_URL
+    if prefer_grpc is None:
+        prefer_grpc = CLIENT_CONFIG["qdrant_prefer_grpc"]
+
+    def factory():
+        import httpx
+        from qdrant_client import QdrantClient
+
+        return QdrantClient(
+            url=url,
+            api_key=QDRANT_API_KEY or None,
+            prefer_grpc=prefer_grpc,
+            grpc_port=CLIENT_CONFIG["qdrant_grpc_port"],
+            timeout=CLIENT_CONFIG["qdrant_timeout"],
+            limits=httpx.Limits(
+                max_connections=CLIENT_CONFIG["qdrant_max_connections"],
+                max_keepalive_connections=CLIENT_CONFIG["qdrant_max_keepalive"],
+                keepalive_expiry=CLIENT_CONFIG["keepalive_expiry"]
+            )
+        )
+
+    return _get_or_create(("qdrant", url, prefer_grpc), factory)
+
+
+def close_clients():
+    """공유 클라이언트 연결 정리"""
+    with _lock:
+        for key, client in list(_clients.items()):
+            if key[0] == "async_openai":
+                continue  # 이벤트 루프에서 aclose() 필요
+            close = getattr(client, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+        _clients.clear()
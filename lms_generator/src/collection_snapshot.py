@@ -0,0 +1,208 @@
+"""
+임베딩 컬렉션 스냅샷 모듈
+
+주제별 Qdrant 컬렉션의 포인트(id, float32 벡터, payload)를 단일 .npz 파일로 내보내고
+임베딩 API 호출 없이 병렬 업서트로 복원
+"""
+
+import os
+import json
+import time
+import zipfile
+import argparse
+from datetime import datetime
+from typing import Dict, Optional
+
+import numpy as np
+from qdrant_client import QdrantClient
+from qdrant_client.models import Distance, VectorParams
+
+from config import get_subject_paths, get_qdrant_collection_name, RAG_CONFIG
+from clients import get_qdrant_client
+from query_cache import write_collection_version
+
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def get_default_snapshot_path(subject: str) -> str:
+    """주제별 기본 스냅샷 파일 경로"""
+    paths = get_subject_paths(subject)
+    return os.path.join(paths["subject_dir"], "snapshots", f"{get_qdrant_collection_name(subject)}.npz")
+
+
+def _memmap_npz_member(path: str, name: str) -> np.ndarray:
+    """비압축 .npz 내부 배열을 메모리 맵으로 열기 (벡터 블록 복사 없이 접근)"""
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo(f"{name}.npy")
+        if info.compress_type != zipfile.ZIP_STORED:
+            # 압축된 경우 메모리 맵 불가 → 일반 로드
+            with archive.open(info) as member:
+                return np.load(member)
+
+    with open(path, 'rb') as f:
+        # 로컬 파일 헤더(30바이트 + 파일명 + extra) 다음이 .npy 데이터
+        f.seek(info.header_offset)
+        local_header = f.read(30)
+        name_length = int.from_bytes(local_header[26:28], "little")
+        extra_length = int.from_bytes(local_header[28:30], "little")
+        f.seek(info.header_offset + 30 + name_length + extra_length)
+
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        data_offset = f.tell()
+
+    return np.memmap(path, dtype=dtype, mode='r', shape=shape,
+                     order='F' if fortran_order else 'C', offset=data_offset)
+
+
+class CollectionSnapshot:
+    """컬렉션 스냅샷 내보내기/가져오기 클래스"""
+
+    def __init__(self, subject: str, qdrant_client: Optional[QdrantClient] = None):
+        self.subject = subject
+        self.collection_name = get_qdrant_collection_name(subject)
+        self.qdrant_client = qdrant_client or get_qdrant_client()
+
+    def export(self, output_path: Optional[str] = None, page_size: int = 1000) -> str:
+        """컬렉션 전체를 스냅샷 파일로 내보내기"""
+        output_path = output_path or get_default_snapshot_path(self.subject)
+        print(f"📦 스냅샷 내보내기 시작: {self.collection_name} → {output_path}")
+        started = time.perf_counter()
+
+        collection = self.qdrant_client.get_collection(self.collection_name)
+        params = collection.config.params.vectors
+        dimension = params.size
+
+        ids = []
+        vector_pages = []
+        payload_lines = []
+        offset = None
+        while True:
+            records, offset = self.qdrant_client.scroll(
+                collection_name=self.collection_name,
+                limit=page_size,
+                offset=offset,
+                with_payload=True,
+                with_vectors=True
+            )
+            if records:
+                ids.extend(record.id for record in records)
+                vector_pages.append(np.asarray([record.vector for record in records], dtype=np.float32))
+                payload_lines.extend(json.dumps(record.payload, ensure_ascii=False) for record in records)
+            if offset is None:
+                break
+
+        vectors = np.vstack(vector_pages) if vector_pages else np.empty((0, dimension), dtype=np.float32)
+        if all(isinstance(point_id, int) for point_id in ids):
+            id_array = np.asarray(ids, dtype=np.int64)
+        else:
+            id_array = np.asarray([str(point_id) for point_id in ids])
+
+        meta = {
+            "format_version": SNAPSHOT_FORMAT_VERSION,
+            "subject": self.subject,
+            "collection": self.collection_name,
+            "embedding_model": RAG_CONFIG["embedding_model"],
+            "dimension": int(dimension),
+            "distance": str(params.distance.value if hasattr(params.distance, "value") else params.distance),
+            "count": len(ids),
+            "exported_at": datetime.now().isoformat(timespec="seconds")
+        }
+
+        os.makedirs(os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+        tmp_path = output_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            # 비압축 저장: 벡터 블록을 가져오기 시 메모리 맵으로 읽기 위함
+            np.savez(
+                f,
+                vectors=vectors,
+                ids=id_array,
+                payloads=np.frombuffer("\n".join(payload_lines).encode("utf-8"), dtype=np.uint8),
+                meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8)
+            )
+        os.replace(tmp_path, output_path)
+
+        size_mb = os.path.getsize(output_path) / 1024 / 1024
+        print(f"✅ {len(ids)}개 포인트 내보내기 완료 ({size_mb:.1f} MB, {time.perf_counter() - started:.1f}초)")
+        return output_path
+
+    @staticmethod
+    def read_meta(snapshot_path: str) -> Dict:
+        """스냅샷 메타데이터 읽기"""
+        with np.load(snapshot_path) as data:
+            return json.loads(data["meta"].tobytes().decode("utf-8"))
+
+    def import_(self, snapshot_path: Optional[str] = None, batch_size: int = 512,
+                parallel: int = 4) -> int:
+        """스냅샷 파일을 컬렉션으로 복원 (임베딩 API 호출 없음)"""
+        snapshot_path = snapshot_path or get_default_snapshot_path(self.subject)
+        if not os.path.exists(snapshot_path):
+            raise FileNotFoundError(f"스냅샷 파일이 존재하지 않습니다: {snapshot_path}")
+
+        print(f"📦 스냅샷 가져오기 시작: {snapshot_path} → {self.collection_name}")
+        started = time.perf_counter()
+
+        meta = self.read_meta(snapshot_path)
+        if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"지원하지 않는 스냅샷 형식입니다: {meta.get('format_version')}")
+        if meta.get("embedding_model") != RAG_CONFIG["embedding_model"]:
+            print(f"⚠️  임베딩 모델이 다릅니다: 스냅샷 {meta.get('embedding_model')}, "
+                  f"현재 설정 {RAG_CONFIG['embedding_model']}")
+
+        vectors = _memmap_npz_member(snapshot_path, "vectors")
+        with np.load(snapshot_path) as data:
+            ids = data["ids"].tolist()
+            payload_blob = data["payloads"].tobytes().decode("utf-8")
+        payloads = [json.loads(line) for line in payload_blob.split("\n")] if payload_blob else []
+
+        # 컬렉션 재생성
+        try:
+            self.qdrant_client.delete_collection(self.collection_name)
+        except Exception:
+            pass
+        self.qdrant_client.create_collection(
+            collection_name=self.collection_name,
+            vectors_config=VectorParams(
+                size=int(meta["dimension"]),
+                distance=Distance(meta.get("distance", "Cosine"))
+            )
+        )
+
+        # 대용량 배치 병렬 업서트
+        self.qdrant_client.upload_collection(
+            collection_name=self.collection_name,
+            vectors=vectors,
+            payload=payloads,
+            ids=ids,
+            batch_size=batch_size,
+            parallel=parallel
+        )
+
+        write_collection_version(self.subject, len(ids), int(meta["dimension"]))
+        print(f"✅ {len(ids)}개 포인트 복원 완료 ({time.perf_counter() - started:.1f}초)")
+        return len(ids)
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="임베딩 컬렉션 스냅샷 내보내기/가져오기")
+    parser.add_argument("command", choices=["export", "import"], help="실행할 작업")
+    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    parser.add_argument("--file", help="스냅샷 파일 경로 (기본: subjects/<주제>/snapshots/<컬렉션>.npz)")
+    parser.add_argument("--batch-size", type=int, default=512, help="가져오기 업서트 배치 크기 (기본: 512)")
+    parser.add_argument("--parallel", type=int, default=4, help="가져오기 병렬 업서트 수 (기본: 4)")
+
+    args = parser.parse_args()
+
+    snapshot = CollectionSnapshot(args.subject)
+    if args.command == "export":
+        snapshot.export(args.file)
+    else:
+        snapshot.import_(args.file, batch_size=args.batch_size, parallel=args.parallel)
+
+
+if __name__ == "__main__":
+    main()
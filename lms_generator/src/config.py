@@ -1,14 +1,15 @@
 import os
 from dotenv import load_dotenv
 
-# .env 파일 로드
-load_dotenv()
-
 # 기본 디렉토리 설정
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.join(BASE_DIR, '..')
-SUBJECTS_DIR = os.path.join(PROJECT_ROOT, 'subjects')
-EXAMPLES_DIR = os.path.join(PROJECT_ROOT, 'examples')
+
+# .env 파일 로드 (프로세스당 한 번, 다른 모듈은 이 모듈의 값을 사용)
+load_dotenv(os.path.join(PROJECT_ROOT, '.env'))
+# 벤치마크 등에서 별도 작업 트리를 쓸 수 있도록 환경 변수로 재정의 가능
+SUBJECTS_DIR = os.getenv("LMS_SUBJECTS_DIR", os.path.join(PROJECT_ROOT, 'subjects'))
+EXAMPLES_DIR = os.getenv("LMS_EXAMPLES_DIR", os.path.join(PROJECT_ROOT, 'examples'))
 
 # 환경 변수
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
@@ -21,16 +22,159 @@ RAG_CONFIG = {
     "chunk_overlap": 200,
     "embedding_model": "text-embedding-3-small",
     "vector_dimension": 1536,
-    "top_k_results": 5
+    # text-embedding-3 계열은 더 작은 차원을 요청할 수 있음 (None이면 모델 기본값)
+    "embedding_dimensions": int(os.getenv("EMBEDDING_DIMENSIONS")) if os.getenv("EMBEDDING_DIMENSIONS") else None,
+    "top_k_results": 5,
+    # 강의 생성 시 쿼리별 검색 수 (병합 후 top_k_results개 사용)
+    "query_top_k": 3,
+    # 근중복 청크 제거 기준 (MinHash 추정 Jaccard 유사도)
+    "dedup_threshold": 0.85,
+    # 검색 결과 캐시: 쿼리 임베딩 코사인 유사도가 기준 이상이면 이전 검색 결과 재사용
+    "query_cache": os.getenv("RAG_QUERY_CACHE", "true").lower() in ("1", "true", "yes"),
+    "query_cache_threshold": float(os.getenv("RAG_QUERY_CACHE_THRESHOLD", "0.97")),
+    "query_cache_size": int(os.getenv("RAG_QUERY_CACHE_SIZE", "512"))
 }
 
 # OpenAI 생성 설정
 GENERATION_CONFIG = {
     "model": "gpt-4o",
     "temperature": 0.7,
-    "max_tokens": 4000
+    "max_tokens": 4000,
+    # 생성 방식: single(단일 호출) | sections(개요 생성 후 섹션별 병렬 호출)
+    "mode": os.getenv("LECTURE_GENERATION_MODE", "single"),
+    "outline_max_tokens": 600,
+    "section_max_tokens": 1500,
+    "section_concurrency": int(os.getenv("SECTION_CONCURRENCY", "8")),
+    # 저렴한 모델로 검색 쿼리를 추가 생성해 RAG 검색 범위 확장
+    "query_expansion": os.getenv("QUERY_EXPANSION", "false").lower() in ("1", "true", "yes"),
+    "query_expansion_count": 3,
+    "query_expansion_max_tokens": 200
+}
+
+# 단계별 모델 라우팅: 계획성 작업(개요, 검색 쿼리 확장, 검증 보완)은 빠르고 저렴한 모델,
+# 최종 본문(단일 강의, 섹션)만 플래그십 모델 사용
+MODEL_ROUTING = {
+    "lecture": os.getenv("MODEL_LECTURE", GENERATION_CONFIG["model"]),
+    "section": os.getenv("MODEL_SECTION", GENERATION_CONFIG["model"]),
+    "outline": os.getenv("MODEL_OUTLINE", "gpt-4o-mini"),
+    "query": os.getenv("MODEL_QUERY", "gpt-4o-mini"),
+    "repair": os.getenv("MODEL_REPAIR", "gpt-4o-mini"),
+    # 강의 질의응답은 첫 토큰 지연이 중요하므로 경량 모델
+    "qa": os.getenv("MODEL_QA", "gpt-4o-mini")
+}
+
+def get_stage_model(stage):
+    """단계별 사용 모델 (라우팅에 없는 단계는 기본 생성 모델)"""
+    return MODEL_ROUTING.get(stage) or GENERATION_CONFIG["model"]
+
+# 강의 질의응답 검색 설정
+# candidates: 재정렬 전 검색 후보 수, lecture_boost: 현재 강의의 API/키워드를 언급하는 청크에 더할 유사도
+# context_token_budget: 프롬프트에 넣을 컨텍스트 최대 토큰, history_turns: 포함할 이전 대화 수
+QA_CONFIG = {
+    "candidates": int(os.getenv("QA_CANDIDATES", "12")),
+    "lecture_boost": float(os.getenv("QA_LECTURE_BOOST", "0.05")),
+    "context_token_budget": int(os.getenv("QA_CONTEXT_TOKENS", "1500")),
+    "history_turns": 4,
+    "max_tokens": int(os.getenv("QA_MAX_TOKENS", "700")),
+    "temperature": 0.3
 }
 
+# 강의 섹션 구조 (품질 기준 예시의 섹션 구성과 동일)
+# match: 섹션 제목 판별 키워드, exclude: 함께 있으면 제외할 키워드 (매칭되지 않는 본문 섹션은 solution)
+# parts: 섹션 병렬 생성 시 긴 섹션을 나눠 동시에 생성 (강의 지연 = 가장 긴 호출)
+LECTURE_SECTIONS = [
+    {"key": "overview", "title": "학습 내용", "words": 150, "max_tokens": 600, "match": ["학습 내용", "학습 목표"]},
+    {"key": "problem", "title": "실제 개발 문제 상황", "words": 500, "max_tokens": 1500, "match": ["문제"], "exclude": ["해결"]},
+    {"key": "solution", "title": "단계별 해결 과정", "words": 1500, "max_tokens": 1800, "match": ["해결"], "parts": 2},
+    {"key": "practice", "title": "실습 과제", "words": 500, "max_tokens": 1500, "match": ["실습"]},
+    {"key": "mistakes", "title": "자주 하는 실수", "words": 400, "max_tokens": 1200, "match": ["실수"]},
+    {"key": "best_practices", "title": "모범 사례", "words": 400, "max_tokens": 1200, "match": ["모범"]},
+    {"key": "summary", "title": "요약", "words": 200, "max_tokens": 600, "match": ["요약", "다음 단계"]},
+]
+
+# 생성된 강의 검증 기준 (errors는 섹션 단위 재생성 대상, warnings는 보고만)
+# 단어 수는 공백 기준 (코드 포함), 품질 기준 예시(약 1,100단어)가 여유 있게 통과하는 수준
+VALIDATION_CONFIG = {
+    "min_words": int(os.getenv("LECTURE_MIN_WORDS", "600")),
+    "min_code_blocks": 5,
+    "min_practice_tasks": 2,
+    "min_section_words": 10,
+    "max_repair_rounds": int(os.getenv("LECTURE_MAX_REPAIR_ROUNDS", "2"))
+}
+
+# API 클라이언트 연결 설정 (프로세스 내 공유 클라이언트에 적용)
+CLIENT_CONFIG = {
+    "openai_timeout": float(os.getenv("OPENAI_TIMEOUT", "600")),
+    "openai_connect_timeout": float(os.getenv("OPENAI_CONNECT_TIMEOUT", "5")),
+    "openai_max_retries": int(os.getenv("OPENAI_MAX_RETRIES", "2")),
+    "openai_max_connections": int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+    "openai_max_keepalive": int(os.getenv("OPENAI_MAX_KEEPALIVE", "20")),
+    "keepalive_expiry": float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30")),
+    "qdrant_timeout": int(os.getenv("QDRANT_TIMEOUT", "30")),
+    "qdrant_max_connections": int(os.getenv("QDRANT_MAX_CONNECTIONS", "50")),
+    "qdrant_max_keepalive": int(os.getenv("QDRANT_MAX_KEEPALIVE", "20")),
+    "qdrant_prefer_grpc": os.getenv("QDRANT_PREFER_GRPC", "false").lower() in ("1", "true", "yes"),
+    "qdrant_grpc_port": int(os.getenv("QDRANT_GRPC_PORT", "6334"))
+}
+
+# 강의 생성 서비스 (데몬) 설정: 작업 큐는 여러 주제가 공유하므로 subjects/ 아래 단일 파일
+SERVICE_CONFIG = {
+    "host": os.getenv("LMS_SERVICE_HOST", "127.0.0.1"),
+    "port": int(os.getenv("LMS_SERVICE_PORT", "8700")),
+    "workers": int(os.getenv("LMS_SERVICE_WORKERS", "2")),
+    "max_attempts": int(os.getenv("LMS_JOB_MAX_ATTEMPTS", "3")),
+    "job_db": os.getenv("LMS_JOB_DB", os.path.join(SUBJECTS_DIR, ".jobs.sqlite3")),
+    # 작업 임대 시간: 워커가 이 시간 안에 heartbeat하지 않으면 다른 워커가 작업을 가져감
+    "lease_seconds": float(os.getenv("LMS_JOB_LEASE_SECONDS", "120")),
+    # 다른 프로세스/노드가 넣은 작업 확인 주기
+    "poll_seconds": float(os.getenv("LMS_JOB_POLL_SECONDS", "2")),
+    # 네트워크 공유 볼륨(NFS 등)에서는 WAL이 동작하지 않으므로 DELETE 사용
+    "journal_mode": os.getenv("LMS_JOB_DB_JOURNAL", "WAL")
+}
+
+# 모델별 단가 (USD / 1M 토큰) - 토큰·비용 집계용
+MODEL_PRICING = {
+    "gpt-4o": {"input": 2.50, "output": 10.00},
+    "gpt-4o-mini": {"input": 0.15, "output": 0.60},
+    "text-embedding-3-small": {"input": 0.02, "output": 0.0},
+    "text-embedding-3-large": {"input": 0.13, "output": 0.0},
+    "text-embedding-ada-002": {"input": 0.10, "output": 0.0}
+}
+
+# 모델별 API 한도와 응답 속도 - 배치 실행 계획(--plan)의 예상 시간 계산용
+# rpm/tpm은 계정 등급 한도 (OPENAI_RATE_LIMITS="gpt-4o=500:30000,gpt-4o-mini=500:200000"로 재정의)
+# first_token_s: 첫 토큰까지 지연, tokens_per_sec: 출력 토큰 생성 속도
+MODEL_LIMITS = {
+    "gpt-4o": {"rpm": 500, "tpm": 30000, "first_token_s": 0.8, "tokens_per_sec": 60},
+    "gpt-4o-mini": {"rpm": 500, "tpm": 200000, "first_token_s": 0.5, "tokens_per_sec": 100},
+    "text-embedding-3-small": {"rpm": 3000, "tpm": 1000000, "first_token_s": 0.2, "tokens_per_sec": 0},
+    "text-embedding-3-large": {"rpm": 3000, "tpm": 1000000, "first_token_s": 0.3, "tokens_per_sec": 0}
+}
+
+def apply_rate_limit_overrides(spec):
+    """'모델=RPM:TPM' 목록(쉼표 구분)으로 MODEL_LIMITS 한도 재정의"""
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        model, separator, limits = item.partition("=")
+        rpm, colon, tpm = limits.partition(":")
+        if not separator or not colon:
+            raise ValueError(f"잘못된 한도 지정입니다: {item} (형식: 모델=RPM:TPM)")
+        MODEL_LIMITS.setdefault(model, dict(MODEL_LIMITS["gpt-4o"])).update(rpm=int(rpm), tpm=int(tpm))
+
+apply_rate_limit_overrides(os.getenv("OPENAI_RATE_LIMITS"))
+
+def get_model_limits(model):
+    """모델별 한도/속도 (날짜 접미사 모델명 허용, 미등록 모델은 gpt-4o 기준)"""
+    limits = MODEL_LIMITS.get(model)
+    if limits is None:
+        limits = next((value for name, value in MODEL_LIMITS.items() if model.startswith(name + "-")), None)
+    return limits or MODEL_LIMITS["gpt-4o"]
+
+def get_vector_dimension(dimensions=None):
+    """실제 저장될 벡터 차원 반환 (축소 차원 지정 시 해당 값)"""
+    if dimensions is None:
+        dimensions = RAG_CONFIG["embedding_dimensions"]
+    return dimensions or RAG_CONFIG["vector_dimension"]
+
 def get_subject_paths(subject_name):
     """주제별 경로 반환"""
     subject_dir = os.path.join(SUBJECTS_DIR, subject_name)
@@ -38,9 +182,35 @@ def get_subject_paths(subject_name):
         "subject_dir": subject_dir,
         "data_dir": os.path.join(subject_dir, "data"),
         "generated_dir": os.path.join(subject_dir, "generated", "courses"),
-        "curriculum_file": os.path.join(subject_dir, "curriculum.json")
+        "bundle_dir": os.path.join(subject_dir, "generated", "bundle"),
+        "sources_dir": os.path.join(subject_dir, "generated", "sources"),
+        "indexed_files": os.path.join(subject_dir, "indexed_files.json"),
+        "curriculum_file": os.path.join(subject_dir, "curriculum.json"),
+        # 대형 커리큘럼용 강의별 JSONL 형식 (있으면 curriculum.json보다 우선) + 강의 번호 → 오프셋 색인
+        "curriculum_jsonl_file": os.path.join(subject_dir, "curriculum.jsonl"),
+        "curriculum_index_file": os.path.join(subject_dir, ".curriculum_index.json"),
+        "build_checkpoint_dir": os.path.join(subject_dir, ".build_checkpoint"),
+        "trace_dir": os.path.join(subject_dir, "traces"),
+        "query_cache_dir": os.path.join(subject_dir, ".rag_cache"),
+        "collection_version_file": os.path.join(subject_dir, "collection_version.json")
     }
 
+def get_curriculum_file(subject_name):
+    """사용할 커리큘럼 파일 경로 (curriculum.jsonl이 있으면 우선, 없으면 curriculum.json)"""
+    paths = get_subject_paths(subject_name)
+    if os.path.exists(paths["curriculum_jsonl_file"]):
+        return paths["curriculum_jsonl_file"]
+    return paths["curriculum_file"]
+
+def discover_subjects():
+    """SUBJECTS_DIR 아래 data/ 폴더가 있는 주제 목록 (이름순)"""
+    if not os.path.isdir(SUBJECTS_DIR):
+        return []
+    return sorted(
+        name for name in os.listdir(SUBJECTS_DIR)
+        if os.path.isdir(os.path.join(SUBJECTS_DIR, name, "data"))
+    )
+
 def get_qdrant_collection_name(subject_name):
     """주제별 Qdrant 컬렉션명 반환"""
     return f"{subject_name}_lms"
@@ -81,5 +251,5 @@ def validate_config(subject_name=None):
         if not os.path.exists(paths["subject_dir"]):
             print(f"⚠️  경고: {subject_name} 폴더가 존재하지 않습니다.")
             
-        if not os.path.exists(paths["curriculum_file"]):
-            print(f"⚠️  경고: {subject_name} curriculum.json이 존재하지 않습니다.")
\ No newline at end of file
+        if not os.path.exists(get_curriculum_file(subject_name)):
+            print(f"⚠️  경고: {subject_name} curriculum.json(.jsonl)이 존재하지 않습니다.")
\ No newline at end of file
@@ -0,0 +1,269 @@
+"""
+강의 목록(manifest) / 프런트엔드 번들 모듈
+
+생성된 강의 파일로 courses.json(번호, 제목, 설명, 파일, 크기, 단어 수, 목차, 내용 해시)을 만들어
+프런트엔드가 강의 목록을 하드코딩하지 않고 작은 JSON 하나로 불러오도록 함
+
+선택 단계(--export)에서는 강의를 코드 하이라이팅된 HTML로 미리 렌더링하고
+해시 파일명의 .gz/.br 사본을 함께 저장해 브라우저가 매번 마크다운을 파싱하지 않고 캐시된 본문을 받도록 함
+(markdown, pygments 필요 / brotli가 없으면 .br 생략)
+"""
+
+import os
+import re
+import sys
+import glob
+import gzip
+import json
+import hashlib
+import argparse
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 내 잠금만 사용
+    fcntl = None
+
+from atomic_write import write_atomic
+from config import get_subject_paths, get_curriculum_file
+from curriculum_manager import CurriculumManager
+from lecture_validator import parse_sections, unwrap_markdown_fence
+
+MANIFEST_FILENAME = "courses.json"
+TOC_LEVELS = (2, 3)
+_HASHED_FILE = re.compile(r"\.[0-9a-f]{10}\.(html|css)$")
+_manifest_lock = threading.Lock()
+
+
+def slugify_heading(value: str, separator: str = "-") -> str:
+    """목차 앵커 id (한글 유지, 공백은 구분자로) - HTML 렌더링의 제목 id와 동일"""
+    value = re.sub(r"[^\w\s-]", "", value.strip().lower())
+    return re.sub(r"[\s_-]+", separator, value).strip(separator)
+
+
+def _plain_heading(title: str) -> str:
+    """제목의 인라인 마크다운 제거 (코드 span 밖의 <태그>는 HTML로 렌더링되어 사라짐)"""
+    parts = title.split("`")
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"<[^>]*>|\*\*|__|\*", "", parts[i])
+    return "".join(parts).strip()
+
+
+def extract_toc(markdown: str) -> List[Dict]:
+    """##/### 제목 목차 (코드 블록 내부 제외, 중복 id는 _1, _2... 접미사)"""
+    toc = []
+    ids = set()
+    in_code = False
+    for line in markdown.splitlines():
+        if line.lstrip().startswith("```"):
+            in_code = not in_code
+            continue
+        if in_code:
+            continue
+        match = re.match(r"(#{2,3}) (.+)", line)
+        if match and len(match.group(1)) in TOC_LEVELS:
+            title = _plain_heading(match.group(2))
+            anchor = base = slugify_heading(title)
+            suffix = 0
+            while anchor in ids or not anchor:
+                suffix += 1
+                anchor = f"{base}_{suffix}"
+            ids.add(anchor)
+            toc.append({"level": len(match.group(1)), "title": title, "id": anchor})
+    return toc
+
+
+def find_lecture_file(generated_dir: str, lecture_info: Dict) -> Optional[str]:
+    """강의 파일 경로 (커리큘럼 filename과 저장 파일명 lecture_NN_*.md 중 가장 최근 파일)"""
+    candidates = set(glob.glob(os.path.join(generated_dir, f"lecture_{lecture_info['number']:02d}_*.md")))
+    filename = lecture_info.get("filename")
+    if filename and os.path.exists(os.path.join(generated_dir, filename)):
+        candidates.add(os.path.join(generated_dir, filename))
+    return max(candidates, key=os.path.getmtime) if candidates else None
+
+
+def manifest_entry(generated_dir: str, lecture_info: Dict) -> Dict:
+    """강의 하나의 목록 항목 (아직 생성되지 않았으면 file이 None)"""
+    entry = {
+        "number": lecture_info["number"],
+        "title": lecture_info["title"],
+        "description": lecture_info.get("description", ""),
+        "file": None
+    }
+    filepath = find_lecture_file(generated_dir, lecture_info)
+    if filepath is not None:
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        markdown = unwrap_markdown_fence(raw.decode("utf-8"))
+        entry.update({
+            "file": os.path.basename(filepath),
+            "size": len(raw),
+            "words": sum(block["words"] for block in parse_sections(markdown)),
+            "toc": extract_toc(markdown),
+            "hash": hashlib.sha256(raw).hexdigest()[:16]
+        })
+    return entry
+
+
+def build_manifest(subject: str, curriculum_manager: Optional[CurriculumManager] = None) -> Dict:
+    """커리큘럼 순서의 강의 목록 (아직 생성되지 않은 강의는 file이 None)"""
+    curriculum_manager = curriculum_manager or CurriculumManager(subject)
+    generated_dir = get_subject_paths(subject)["generated_dir"]
+    subject_info = curriculum_manager.get_subject_info()
+
+    return {
+        "subject": subject,
+        "name": subject_info.get("name", subject),
+        "description": subject_info.get("description", ""),
+        "lectures": [manifest_entry(generated_dir, lecture_info) for lecture_info in curriculum_manager.iter_lectures()]
+    }
+
+
+@contextmanager
+def _locked_manifest(generated_dir: str) -> Iterator[str]:
+    """courses.json 읽기-수정-쓰기 직렬화 (프로세스 내 스레드 + 같은 호스트의 워커 프로세스), 경로 반환"""
+    os.makedirs(generated_dir, exist_ok=True)
+    path = os.path.join(generated_dir, MANIFEST_FILENAME)
+    with _manifest_lock, open(f"{path}.lock", 'a') as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        yield path
+
+
+def _save_manifest(path: str, manifest: Dict):
+    write_atomic(path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    available = sum(1 for lecture in manifest["lectures"] if lecture["file"])
+    print(f"🗂️  강의 목록 갱신: {MANIFEST_FILENAME} ({available}/{len(manifest['lectures'])}개 강의)")
+
+
+def write_manifest(subject: str, curriculum_manager: Optional[CurriculumManager] = None) -> str:
+    """generated/courses/courses.json 전체 갱신 (모든 강의 파일을 다시 읽음)"""
+    with _locked_manifest(get_subject_paths(subject)["generated_dir"]) as path:
+        _save_manifest(path, build_manifest(subject, curriculum_manager))
+    return path
+
+
+def update_manifest(subject: str, lecture_number: int, curriculum_manager: Optional[CurriculumManager] = None) -> str:
+    """강의 하나의 항목만 갱신 (강의 저장 직후 사용, 목록이 없거나 그 강의가 없으면 전체 갱신)"""
+    curriculum_manager = curriculum_manager or CurriculumManager(subject)
+    generated_dir = get_subject_paths(subject)["generated_dir"]
+    with _locked_manifest(generated_dir) as path:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+            position = next(i for i, lecture in enumerate(manifest["lectures"]) if lecture["number"] == lecture_number)
+        except (OSError, ValueError, KeyError, StopIteration):
+            _save_manifest(path, build_manifest(subject, curriculum_manager))
+            return path
+
+        lecture_info = curriculum_manager.get_lecture_info(lecture_number)
+        manifest["lectures"][position] = manifest_entry(generated_dir, lecture_info)
+        _save_manifest(path, manifest)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# 미리 렌더링 + 사전 압축 번들
+# ---------------------------------------------------------------------------
+
+def _hashed_name(stem: str, data: bytes, extension: str) -> str:
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:10]}{extension}"
+
+
+def _write_variants(output_dir: str, filename: str, data: bytes, brotli) -> Dict:
+    """원본 + .gz(+ .br) 저장 (해시 파일명이라 이미 있으면 건너뜀)"""
+    variants = {"file": filename, "size": len(data)}
+    encoded = [("gz", lambda: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoded.append(("br", lambda: brotli.compress(data, quality=11)))
+
+    path = os.path.join(output_dir, filename)
+    if not os.path.exists(path):
+        write_atomic(path, data)
+    for suffix, compress in encoded:
+        compressed_path = f"{path}.{suffix}"
+        if not os.path.exists(compressed_path):
+            write_atomic(compressed_path, compress())
+        variants[suffix] = f"{filename}.{suffix}"
+        variants[f"{suffix}_size"] = os.path.getsize(compressed_path)
+    return variants
+
+
+def export_bundle(subject: str, output_dir: Optional[str] = None) -> str:
+    """강의별 HTML(코드 하이라이팅) + .gz/.br를 해시 파일명으로 저장하고 번들용 courses.json 작성"""
+    try:
+        import markdown as markdown_lib
+        from pygments.formatters import HtmlFormatter
+    except ImportError as e:
+        raise RuntimeError(f"HTML 번들 내보내기에는 markdown, pygments 패키지가 필요합니다: {e}") from e
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        print("⚠️  brotli 패키지가 없어 .br 파일을 생략합니다 (.gz만 생성)")
+
+    paths = get_subject_paths(subject)
+    output_dir = output_dir or paths["bundle_dir"]
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = build_manifest(subject)
+
+    renderer = markdown_lib.Markdown(
+        extensions=["fenced_code", "tables", "sane_lists", "codehilite", "toc"],
+        extension_configs={
+            "codehilite": {"css_class": "highlight", "guess_lang": False},
+            "toc": {"slugify": slugify_heading, "toc_depth": "2-3"}
+        }
+    )
+    css = HtmlFormatter(style="default").get_style_defs(".highlight").encode("utf-8")
+    manifest["stylesheet"] = _write_variants(output_dir, _hashed_name("highlight", css, ".css"), css, brotli)
+
+    keep = {manifest["stylesheet"]["file"]}
+    for lecture in manifest["lectures"]:
+        if not lecture["file"]:
+            continue
+        with open(os.path.join(paths["generated_dir"], lecture["file"]), 'r', encoding='utf-8') as f:
+            html = renderer.reset().convert(unwrap_markdown_fence(f.read())).encode("utf-8")
+        stem = os.path.splitext(lecture["file"])[0]
+        lecture["html"] = _write_variants(output_dir, _hashed_name(stem, html, ".html"), html, brotli)
+        keep.add(lecture["html"]["file"])
+        print(f"📦 {lecture['number']}강: {lecture['html']['file']} ({lecture['html']['size']:,} bytes → "
+              f"gz {lecture['html']['gz_size']:,}" + (f" / br {lecture['html']['br_size']:,}" if brotli else "") + ")")
+
+    # 이전 내보내기의 해시 파일 정리
+    for name in os.listdir(output_dir):
+        base = re.sub(r"\.(gz|br)$", "", name)
+        if _HASHED_FILE.search(base) and base not in keep:
+            os.remove(os.path.join(output_dir, name))
+
+    path = os.path.join(output_dir, MANIFEST_FILENAME)
+    write_atomic(path, json.dumps(manifest, ensure_ascii=False, indent=2).encode("utf-8"))
+    print(f"✅ 번들 내보내기 완료: {output_dir}")
+    return path
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="강의 목록(courses.json) 갱신 및 프런트엔드 번들 내보내기")
+    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    parser.add_argument("--export", action="store_true",
+                        help="HTML 미리 렌더링 + .gz/.br 사전 압축 번들 내보내기")
+    parser.add_argument("--output", help="번들 출력 디렉터리 (기본: subjects/<주제>/generated/bundle)")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(get_curriculum_file(args.subject)):
+        print(f"❌ 커리큘럼이 없는 주제입니다: {args.subject}")
+        sys.exit(1)
+    write_manifest(args.subject)
+    if args.export:
+        try:
+            export_bundle(args.subject, args.output)
+        except RuntimeError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
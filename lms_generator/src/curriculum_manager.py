@@ -1,26 +1,50 @@
 import json
 import os
-from typing import Dict, List, Optional
-from config import get_subject_paths, EXAMPLES_DIR
+import sys
+import argparse
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from atomic_write import write_atomic
+from config import get_subject_paths, get_curriculum_file, EXAMPLES_DIR
+
+# 강의별 JSONL 커리큘럼에서 메모리에 유지하는 최근 강의 정보 수
+LECTURE_CACHE_SIZE = 128
 
 class CurriculumManager:
-    """커리큘럼 로딩 및 관리 클래스"""
+    """커리큘럼 로딩 및 관리 클래스
+    
+    curriculum.jsonl(1행 {"subject": {...}}, 이후 강의 1개당 1행)이 있으면 강의 번호 → 바이트 오프셋 색인으로
+    필요한 강의만 읽고 (강의 수와 무관하게 메모리 일정), 없으면 curriculum.json 전체를 로드
+    """
     
     def __init__(self, subject_name: str):
         self.subject_name = subject_name
         self.paths = get_subject_paths(subject_name)
+        self.curriculum_path = get_curriculum_file(subject_name)
+        self.is_indexed = self.curriculum_path.endswith(".jsonl")
         self._curriculum_data = None
+        self._subject_info = None
+        self._index = None
+        self._positions = None
+        self._lecture_cache: "OrderedDict[int, Dict]" = OrderedDict()
+        # 생성 서비스의 워커 스레드들이 매니저 하나를 공유하므로 LRU 갱신은 잠금 안에서
+        self._cache_lock = threading.Lock()
     
     def load_curriculum(self) -> Dict:
-        """커리큘럼 JSON 파일 로드"""
+        """커리큘럼 JSON 파일 로드 (JSONL 형식이면 전체 강의를 읽으므로 대형 커리큘럼에서는 iter_lectures 사용)"""
         if self._curriculum_data is not None:
             return self._curriculum_data
-            
-        curriculum_file = self.paths["curriculum_file"]
+        
+        curriculum_file = self.curriculum_path
         
         if not os.path.exists(curriculum_file):
             raise FileNotFoundError(f"커리큘럼 파일이 존재하지 않습니다: {curriculum_file}")
         
+        if self.is_indexed:
+            self._curriculum_data = {"subject": self.get_subject_info(), "lectures": list(self.iter_lectures())}
+            return self._curriculum_data
+        
         try:
             with open(curriculum_file, 'r', encoding='utf-8') as f:
                 self._curriculum_data = json.load(f)
@@ -28,27 +52,167 @@ class CurriculumManager:
         except json.JSONDecodeError as e:
             raise ValueError(f"커리큘럼 JSON 파일 파싱 오류: {e}")
     
+    def _iter_records(self) -> Iterator[Tuple[int, Dict]]:
+        """JSONL 레코드 스트리밍 (바이트 오프셋, 레코드) - 빈 줄은 건너뜀"""
+        if not os.path.exists(self.curriculum_path):
+            raise FileNotFoundError(f"커리큘럼 파일이 존재하지 않습니다: {self.curriculum_path}")
+        
+        with open(self.curriculum_path, 'rb') as f:
+            offset = 0
+            for line_number, line in enumerate(f, 1):
+                if line.strip():
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError as e:
+                        raise ValueError(f"커리큘럼 JSONL 파싱 오류 ({line_number}행): {e}")
+                    yield offset, record
+                offset += len(line)
+    
+    @staticmethod
+    def _is_subject_record(record: Dict) -> bool:
+        return "subject" in record and "number" not in record
+    
+    def _build_index(self, visit: Optional[Callable[[Dict], None]] = None) -> Dict:
+        """한 번의 스트리밍으로 강의 번호/오프셋 색인 생성 (visit: 강의 레코드마다 호출)"""
+        stat = os.stat(self.curriculum_path)
+        index = {"signature": [stat.st_size, stat.st_mtime_ns], "subject_offset": None, "numbers": [], "offsets": []}
+        for offset, record in self._iter_records():
+            if self._is_subject_record(record):
+                index["subject_offset"] = offset
+                continue
+            index["numbers"].append(record.get("number"))
+            index["offsets"].append(offset)
+            if visit is not None:
+                visit(record)
+        return index
+    
+    def _store_index(self, index: Dict):
+        """색인을 메모리에 두고 파일로 저장 (읽기 전용 볼륨이면 메모리 색인만 사용)"""
+        self._index = index
+        self._positions = None
+        self._subject_info = None
+        with self._cache_lock:
+            self._lecture_cache.clear()
+        try:
+            write_atomic(self.paths["curriculum_index_file"], json.dumps(index).encode("utf-8"))
+        except OSError:
+            pass
+    
+    def _load_index(self) -> Dict:
+        """저장된 색인 사용 (커리큘럼 파일 크기/수정 시각이 다르면 다시 생성)"""
+        if self._index is not None:
+            return self._index
+        
+        stat = os.stat(self.curriculum_path)
+        try:
+            with open(self.paths["curriculum_index_file"], 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get("signature") == [stat.st_size, stat.st_mtime_ns]:
+                self._index = index
+                return index
+        except (OSError, ValueError):
+            pass
+        
+        self._store_index(self._build_index())
+        return self._index
+    
+    def _read_record(self, offset: int) -> Dict:
+        with open(self.curriculum_path, 'rb') as f:
+            f.seek(offset)
+            return json.loads(f.readline())
+    
+    @staticmethod
+    def _in_range(number, start: Optional[int], end: Optional[int]) -> bool:
+        if start is None and end is None:
+            return True
+        return isinstance(number, int) and (start is None or number >= start) and (end is None or number <= end)
+    
+    def iter_lectures(self, start: Optional[int] = None, end: Optional[int] = None) -> Iterator[Dict]:
+        """커리큘럼 순서로 강의 정보 스트리밍 (start~end 번호만, JSONL이면 해당 줄만 읽음)"""
+        if not self.is_indexed:
+            for lecture in self.load_curriculum().get("lectures", []):
+                if self._in_range(lecture.get("number"), start, end):
+                    yield lecture
+            return
+        
+        if start is None and end is None:
+            for _, record in self._iter_records():
+                if not self._is_subject_record(record):
+                    yield record
+            return
+        
+        index = self._load_index()
+        with open(self.curriculum_path, 'rb') as f:
+            for number, offset in zip(index["numbers"], index["offsets"]):
+                if self._in_range(number, start, end):
+                    f.seek(offset)
+                    yield json.loads(f.readline())
+    
     def get_lecture_series(self) -> List[Dict]:
-        """강의 시리즈 목록 반환"""
-        curriculum = self.load_curriculum()
-        return curriculum.get("lectures", [])
+        """강의 시리즈 목록 반환 (전체 목록이 필요할 때만 사용, 순회는 iter_lectures)"""
+        if not self.is_indexed:
+            curriculum = self.load_curriculum()
+            return curriculum.get("lectures", [])
+        return list(self.iter_lectures())
+    
+    def get_lecture_numbers(self) -> List[int]:
+        """커리큘럼 순서의 강의 번호 목록"""
+        if not self.is_indexed:
+            return [lecture.get("number") for lecture in self.get_lecture_series()]
+        return self._load_index()["numbers"]
     
     def get_lecture_info(self, lecture_number: int) -> Optional[Dict]:
-        """특정 강의 정보 반환"""
-        lectures = self.get_lecture_series()
-        for lecture in lectures:
-            if lecture.get("number") == lecture_number:
+        """특정 강의 정보 반환 (JSONL이면 색인으로 해당 줄만 읽고 최근 강의는 캐시)"""
+        if not self.is_indexed:
+            lectures = self.get_lecture_series()
+            for lecture in lectures:
+                if lecture.get("number") == lecture_number:
+                    return lecture
+            return None
+        
+        with self._cache_lock:
+            lecture = self._lecture_cache.get(lecture_number)
+            if lecture is not None:
+                self._lecture_cache.move_to_end(lecture_number)
                 return lecture
-        return None
+        
+        index = self._load_index()
+        if self._positions is None:
+            self._positions = {number: i for i, number in reversed(list(enumerate(index["numbers"])))}
+        position = self._positions.get(lecture_number)
+        if position is None:
+            return None
+        
+        lecture = self._read_record(index["offsets"][position])
+        with self._cache_lock:
+            self._lecture_cache[lecture_number] = lecture
+            if len(self._lecture_cache) > LECTURE_CACHE_SIZE:
+                self._lecture_cache.popitem(last=False)
+        return lecture
+    
+    def get_neighbor_lectures(self, lecture_number: int, before: int = 2, after: int = 2) -> Tuple[List[Dict], List[Dict]]:
+        """이전/다음 강의 정보 (번호 기준 직전 before개, 직후 after개)"""
+        numbers = [number for number in self.get_lecture_numbers() if isinstance(number, int)]
+        previous_numbers = [number for number in numbers if number < lecture_number]
+        next_numbers = [number for number in numbers if number > lecture_number]
+        previous_lectures = [self.get_lecture_info(number) for number in previous_numbers[-before:]] if before else []
+        next_lectures = [self.get_lecture_info(number) for number in next_numbers[:after]] if after else []
+        return previous_lectures, next_lectures
     
     def get_total_lectures(self) -> int:
         """전체 강의 수 반환"""
-        return len(self.get_lecture_series())
+        return len(self.get_lecture_numbers())
     
     def get_subject_info(self) -> Dict:
         """주제 정보 반환"""
-        curriculum = self.load_curriculum()
-        return curriculum.get("subject", {})
+        if not self.is_indexed:
+            curriculum = self.load_curriculum()
+            return curriculum.get("subject", {})
+        
+        if self._subject_info is None:
+            subject_offset = self._load_index()["subject_offset"]
+            self._subject_info = self._read_record(subject_offset)["subject"] if subject_offset is not None else {}
+        return self._subject_info
     
     def get_quality_template_path(self) -> str:
         """품질 기준 템플릿 파일 경로 반환"""
@@ -57,40 +221,52 @@ class CurriculumManager:
         return os.path.join(EXAMPLES_DIR, template_filename)
     
     def validate_curriculum(self) -> List[str]:
-        """커리큘럼 유효성 검사 및 문제점 반환"""
+        """커리큘럼 유효성 검사 및 문제점 반환 (강의 목록을 한 번만 순회, 번호 불연속은 첫 위치만 보고)"""
         issues = []
+        lecture_issues = []
+        state = {"count": 0, "gap": None}
+        required_fields = ["number", "title", "description", "filename"]
+        
+        def check(lecture: Dict):
+            state["count"] += 1
+            position = state["count"]
+            if state["gap"] is None and lecture.get("number") != position:
+                state["gap"] = (position, lecture.get("number"))
+            for field in required_fields:
+                if field not in lecture:
+                    lecture_issues.append(f"강의 {position}에 '{field}' 필드가 없습니다.")
         
         try:
-            curriculum = self.load_curriculum()
+            if self.is_indexed:
+                # 검사하면서 색인도 갱신 (이후 강의 조회에 추가 순회 없음)
+                index = self._build_index(visit=check)
+                self._store_index(index)
+                if index["subject_offset"] is None:
+                    issues.append("'subject' 필드가 없습니다.")
+            else:
+                curriculum = self.load_curriculum()
+                # 필수 필드 확인
+                if "subject" not in curriculum:
+                    issues.append("'subject' 필드가 없습니다.")
+                if "lectures" not in curriculum:
+                    issues.append("'lectures' 필드가 없습니다.")
+                    return issues
+                for lecture in curriculum["lectures"]:
+                    check(lecture)
         except Exception as e:
             return [f"커리큘럼 로드 실패: {e}"]
         
-        # 필수 필드 확인
-        if "subject" not in curriculum:
-            issues.append("'subject' 필드가 없습니다.")
-        
-        if "lectures" not in curriculum:
-            issues.append("'lectures' 필드가 없습니다.")
-            return issues
-        
-        lectures = curriculum["lectures"]
-        if not lectures:
+        if not state["count"]:
             issues.append("강의 목록이 비어있습니다.")
             return issues
         
         # 강의 번호 연속성 확인
-        lecture_numbers = [lecture.get("number") for lecture in lectures]
-        expected_numbers = list(range(1, len(lectures) + 1))
-        
-        if lecture_numbers != expected_numbers:
-            issues.append(f"강의 번호가 연속적이지 않습니다. 예상: {expected_numbers}, 실제: {lecture_numbers}")
+        if state["gap"] is not None:
+            position, number = state["gap"]
+            issues.append(f"강의 번호가 연속적이지 않습니다. {position}번째 강의 - 예상: {position}, 실제: {number}")
         
         # 각 강의 필수 필드 확인
-        required_fields = ["number", "title", "description", "filename"]
-        for i, lecture in enumerate(lectures):
-            for field in required_fields:
-                if field not in lecture:
-                    issues.append(f"강의 {i+1}에 '{field}' 필드가 없습니다.")
+        issues.extend(lecture_issues)
         
         # 품질 템플릿 파일 존재 확인
         template_path = self.get_quality_template_path()
@@ -212,7 +388,12 @@ class CurriculumManager:
         }
     
     def save_curriculum(self, curriculum_data: Dict) -> None:
-        """커리큘럼을 JSON 파일로 저장"""
+        """커리큘럼을 JSON 파일로 저장 (JSONL 형식을 사용 중이면 JSONL + 색인으로 저장)"""
+        if self.is_indexed:
+            # curriculum.jsonl이 우선하므로 curriculum.json에 쓰면 로더가 무시함
+            self.export_jsonl(curriculum_data)
+            return
+        
         curriculum_file = self.paths["curriculum_file"]
         
         # 디렉토리 생성
@@ -221,17 +402,68 @@ class CurriculumManager:
         try:
             with open(curriculum_file, 'w', encoding='utf-8') as f:
                 json.dump(curriculum_data, f, ensure_ascii=False, indent=2)
+            self._curriculum_data = None
             print(f"✅ 커리큘럼 저장 완료: {curriculum_file}")
         except Exception as e:
             raise ValueError(f"커리큘럼 저장 실패: {e}")
+    
+    def export_jsonl(self, curriculum_data: Optional[Dict] = None) -> str:
+        """커리큘럼을 강의별 JSONL(curriculum.jsonl)로 저장 - 이후 이 주제는 JSONL을 우선 사용"""
+        curriculum_data = curriculum_data or self.load_curriculum()
+        jsonl_file = self.paths["curriculum_jsonl_file"]
+        lines = [json.dumps({"subject": curriculum_data.get("subject", {})}, ensure_ascii=False)]
+        lines.extend(json.dumps(lecture, ensure_ascii=False) for lecture in curriculum_data.get("lectures", []))
+        
+        os.makedirs(os.path.dirname(jsonl_file), exist_ok=True)
+        write_atomic(jsonl_file, ("\n".join(lines) + "\n").encode("utf-8"))
+        print(f"✅ JSONL 커리큘럼 저장 완료: {jsonl_file} ({len(lines) - 1}개 강의)")
+        
+        if self.is_indexed:
+            # 사용 중인 커리큘럼이 바뀌었으므로 오프셋 색인도 다시 생성
+            self._curriculum_data = None
+            self._store_index(self._build_index())
+        return jsonl_file
 
 def create_curriculum_if_not_exists(subject_name: str) -> CurriculumManager:
     """커리큘럼이 없으면 기본 커리큘럼 생성"""
     manager = CurriculumManager(subject_name)
     
-    if not os.path.exists(manager.paths["curriculum_file"]):
+    if not os.path.exists(manager.curriculum_path):
         print(f"📝 {subject_name} 커리큘럼이 없습니다. 기본 커리큘럼을 생성합니다.")
         default_curriculum = manager.create_default_curriculum()
         manager.save_curriculum(default_curriculum)
     
-    return manager
\ No newline at end of file
+    return manager
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="커리큘럼 검사/색인 및 대형 커리큘럼용 강의별 JSONL 변환")
+    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    parser.add_argument("--to-jsonl", action="store_true",
+                        help="curriculum.json → curriculum.jsonl 변환 (강의를 필요할 때만 읽음)")
+
+    args = parser.parse_args()
+
+    manager = CurriculumManager(args.subject)
+    if args.to_jsonl:
+        if manager.is_indexed:
+            print(f"ℹ️  이미 JSONL 커리큘럼을 사용 중입니다: {manager.curriculum_path}")
+        else:
+            manager.export_jsonl()
+            print(f"ℹ️  이제 {os.path.basename(manager.paths['curriculum_file'])}은 사용되지 않습니다 (보관 후 삭제 가능)")
+            manager = CurriculumManager(args.subject)
+
+    # 한 번의 순회로 검사 + (JSONL이면) 색인 갱신
+    issues = manager.validate_curriculum()
+    print(f"📚 {os.path.basename(manager.curriculum_path)}: {manager.get_total_lectures()}개 강의"
+          + (f" (색인: {os.path.basename(manager.paths['curriculum_index_file'])})" if manager.is_indexed else ""))
+    for issue in issues:
+        print(f"   ⚠️  {issue}")
+    if issues:
+        sys.exit(1)
+    print("✅ 커리큘럼 검사 통과")
+
+
+if __name__ == "__main__":
+    main()
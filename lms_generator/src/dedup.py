@@ -0,0 +1,109 @@
+"""
+근중복 청크 제거 모듈
+
+MinHash LSH로 README 사본, 벤더링된 소스, 거의 같은 예제 스크립트 등
+근중복 청크를 임베딩 전에 하나로 합치고, 대표 청크에 원본 파일 목록을 기록
+"""
+
+import re
+import zlib
+import hashlib
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+# MinHash 해시 함수용 소수 (2^31 - 1, 32비트 입력과 곱해도 uint64 범위 내)
+_PRIME = np.uint64((1 << 31) - 1)
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+class NearDuplicateFilter:
+    """MinHash LSH 기반 근중복 청크 필터"""
+
+    def __init__(self, threshold: float = 0.85, num_perm: int = 64, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 42):
+        if num_perm % bands != 0:
+            raise ValueError("num_perm은 bands의 배수여야 합니다.")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_PRIME), num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_PRIME), num_perm, dtype=np.uint64)
+
+    def _shingles(self, text: str) -> np.ndarray:
+        """단어 n-gram 슁글의 32비트 해시 배열"""
+        tokens = _TOKEN_PATTERN.findall(text.lower())
+        size = min(self.shingle_size, len(tokens)) or 1
+        shingles = {
+            " ".join(tokens[i:i + size])
+            for i in range(max(len(tokens) - size + 1, 1))
+        }
+        return np.fromiter(
+            (zlib.crc32(shingle.encode("utf-8")) & 0x7FFFFFFF for shingle in shingles),
+            dtype=np.uint64,
+            count=len(shingles)
+        )
+
+    def signature(self, text: str) -> np.ndarray:
+        """MinHash 시그니처 계산"""
+        hashes = self._shingles(text)
+        permuted = (np.outer(hashes, self._a) + self._b) % _PRIME
+        return permuted.min(axis=0)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [
+            (band, signature[band * self.rows:(band + 1) * self.rows].tobytes())
+            for band in range(self.bands)
+        ]
+
+    def filter(self, chunks: List[Dict]) -> List[Dict]:
+        """근중복 청크를 제거하고 대표 청크에 source_files 기록
+
+        입력 순서대로 처음 등장한 청크를 대표로 유지하므로 결과가 결정적입니다.
+        """
+        kept: List[Dict] = []
+        signatures: List[np.ndarray] = []
+        buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        exact: Dict[str, int] = {}
+
+        for chunk in chunks:
+            file_path = chunk["metadata"]["file_path"]
+
+            # 1. 완전 중복 (공백 정규화 후 해시 비교)
+            normalized = " ".join(chunk["text"].split())
+            digest = hashlib.sha1(normalized.encode("utf-8")).hexdigest()
+            match = exact.get(digest)
+
+            # 2. 근중복 (LSH 후보 → 추정 Jaccard 유사도 확인)
+            signature = None
+            keys = None
+            if match is None:
+                signature = self.signature(chunk["text"])
+                keys = self._band_keys(signature)
+                candidates = {idx for key in keys for idx in buckets.get(key, [])}
+                for idx in sorted(candidates):
+                    similarity = float(np.mean(signatures[idx] == signature))
+                    if similarity >= self.threshold:
+                        match = idx
+                        break
+
+            if match is not None:
+                source_files = kept[match]["metadata"]["source_files"]
+                if file_path not in source_files:
+                    source_files.append(file_path)
+                continue
+
+            chunk["metadata"]["source_files"] = [file_path]
+            index = len(kept)
+            kept.append(chunk)
+            signatures.append(signature)
+            exact[digest] = index
+            for key in keys:
+                buckets.setdefault(key, []).append(index)
+
+        return kept
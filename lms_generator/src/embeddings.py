@@ -0,0 +1,96 @@
+"""
+임베딩 유틸리티
+
+OpenAI Embedding API 응답을 base64로 받아 float32 NumPy 배열로 변환
+Python float 리스트 대신 연속 메모리 배열을 사용해 빌드 메모리를 절약
+"""
+
+import base64
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config import RAG_CONFIG
+from single_flight import get_single_flight
+from tracing import get_tracer
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def supports_dimensions(model: str) -> bool:
+    """dimensions 파라미터 지원 모델 여부 (text-embedding-3 계열만 지원)"""
+    return model.startswith("text-embedding-3")
+
+
+def decode_embedding(data) -> "np.ndarray":
+    """base64 또는 리스트 형태의 임베딩을 float32 배열로 변환"""
+    import numpy as np
+
+    if isinstance(data, str):
+        return np.frombuffer(base64.b64decode(data), dtype=np.float32)
+    return np.asarray(data, dtype=np.float32)
+
+
+def _resolve(model: Optional[str], dimensions: Optional[int]):
+    if model is None:
+        model = RAG_CONFIG["embedding_model"]
+    if dimensions is None:
+        dimensions = RAG_CONFIG["embedding_dimensions"]
+    return model, dimensions
+
+
+def _build_request(texts: List[str], model: str, dimensions: Optional[int]) -> Dict:
+    request = {
+        "model": model,
+        "input": texts,
+        "encoding_format": "base64"
+    }
+    if dimensions:
+        if not supports_dimensions(model):
+            raise ValueError(f"{model} 모델은 dimensions 옵션을 지원하지 않습니다.")
+        request["dimensions"] = dimensions
+    return request
+
+
+def _decode_response(response, dimensions: Optional[int]) -> "np.ndarray":
+    import numpy as np
+
+    # 응답 순서 보장을 위해 index 기준 정렬
+    items = sorted(response.data, key=lambda item: item.index)
+    if not items:
+        return np.empty((0, dimensions or RAG_CONFIG["vector_dimension"]), dtype=np.float32)
+    return np.vstack([decode_embedding(item.embedding) for item in items])
+
+
+def embed_texts(openai_client, texts: List[str], model: Optional[str] = None,
+                dimensions: Optional[int] = None) -> "np.ndarray":
+    """텍스트 목록을 (len(texts), dim) float32 배열로 임베딩"""
+    model, dimensions = _resolve(model, dimensions)
+    response = openai_client.embeddings.create(**_build_request(texts, model, dimensions))
+    get_tracer().record_response_usage(model, getattr(response, "usage", None))
+    return _decode_response(response, dimensions)
+
+
+def embed_query(openai_client, query: str, model: Optional[str] = None,
+                dimensions: Optional[int] = None) -> List[float]:
+    """단일 쿼리 임베딩 (Qdrant 검색용 리스트 반환)
+
+    동시에 들어온 동일 쿼리는 하나의 API 호출 결과를 공유
+    """
+    model, dimensions = _resolve(model, dimensions)
+    return get_single_flight("embedding").do(
+        (model, dimensions, query),
+        lambda: embed_texts(openai_client, [query], model, dimensions)[0].tolist()
+    )
+
+
+async def embed_query_async(async_openai_client, query: str, model: Optional[str] = None,
+                            dimensions: Optional[int] = None) -> List[float]:
+    """비동기 단일 쿼리 임베딩 (같은 이벤트 루프의 동일 쿼리는 결과 공유)"""
+    model, dimensions = _resolve(model, dimensions)
+
+    async def fetch():
+        response = await async_openai_client.embeddings.create(**_build_request([query], model, dimensions))
+        get_tracer().record_response_usage(model, getattr(response, "usage", None))
+        return _decode_response(response, dimensions)[0].tolist()
+
+    return await get_single_flight("embedding").do_async((model, dimensions, query), fetch)
@@ -0,0 +1,378 @@
+"""
+강의 생성 서비스 (데몬) 모듈
+
+로컬 HTTP 서비스로 강의 생성 작업을 받아 영속 작업 큐(SQLite)에 저장하고 워커 스레드가 순서대로 처리
+주제/생성 방식별 LectureGenerator(커리큘럼, 품질 기준 템플릿, 검색 캐시)와 공유 API 클라이언트를
+작업 사이에 유지하므로 강의 하나의 재생성 지연이 API 호출 시간 수준으로 줄어듦
+작업 큐 DB를 공유 볼륨에 두면 다른 노드에서 --no-http 워커를 띄워 같은 작업을 나눠 처리 (임대 기반, 중복/유실 없음)
+
+엔드포인트:
+    GET  /health          상태, 작업 수, 준비된 생성기
+    POST /jobs            {"subject", "lecture" 또는 "lectures", "mode"} 작업 제출 (기존 파일은 덮어씀)
+    GET  /jobs            최근 작업 목록 (?status=&subject=&limit=)
+    GET  /jobs/<id>       작업 조회
+    POST /qa/stream       {"subject", "question", "lecture", "history"} 강의 질의응답 (SSE 스트리밍)
+    POST /qa/retrieve     {"subject", "question", "lecture"} 질의응답 검색 결과만 반환
+    GET  /metrics         Prometheus 메트릭
+"""
+
+import os
+import json
+import time
+import signal
+import socket
+import argparse
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse, parse_qs
+
+from config import SERVICE_CONFIG, GENERATION_CONFIG, EXAMPLES_DIR, get_curriculum_file, get_stage_model
+from job_queue import JobQueue, JOB_STATUSES
+from lecture_generator import LectureGenerator, add_model_route_arguments, apply_model_route_arguments
+from lecture_validator import validate_lecture_file
+from lesson_qa import LessonQA
+from token_counter import get_token_counter
+from tracing import get_tracer
+
+
+class GenerationService:
+    """작업 큐 + 워커 스레드 + 준비된 생성기 관리 클래스"""
+
+    def __init__(self, queue: Optional[JobQueue] = None, workers: Optional[int] = None,
+                 exit_when_idle: bool = False):
+        self.queue = queue or JobQueue()
+        self.workers = workers or SERVICE_CONFIG["workers"]
+        self.max_attempts = SERVICE_CONFIG["max_attempts"]
+        # 공유 작업 큐에서 워커를 구분하는 이름 (노드:프로세스)
+        self.node = f"{socket.gethostname()}:{os.getpid()}"
+        # 대기/실행 중인 작업이 모두 끝나면 워커 종료 (배치용 워커 노드)
+        self.exit_when_idle = exit_when_idle
+        self.tracer = get_tracer()
+
+        self._generators: Dict[Tuple[str, str], Tuple[Tuple, LectureGenerator]] = {}
+        self._generators_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+    # ------------------------------------------------------------------
+    # 준비된 생성기
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def _source_signature(subject: str) -> Tuple:
+        """커리큘럼/품질 기준 템플릿 수정 시각 (바뀌면 생성기 재구성)"""
+        paths = [get_curriculum_file(subject),
+                 os.path.join(EXAMPLES_DIR, f"{subject}_lecture_example.md")]
+        return tuple(os.path.getmtime(path) if os.path.exists(path) else None for path in paths)
+
+    def get_generator(self, subject: str, mode: Optional[str] = None) -> LectureGenerator:
+        """주제/생성 방식별 LectureGenerator (작업 사이에 재사용)"""
+        key = (subject, mode or GENERATION_CONFIG["mode"])
+        signature = self._source_signature(subject)
+        with self._generators_lock:
+            cached = self._generators.get(key)
+            if cached is not None and cached[0] == signature:
+                return cached[1]
+            generator = LectureGenerator(subject, mode=key[1])
+            self._generators[key] = (signature, generator)
+            return generator
+
+    def preload(self, subject: str, mode: Optional[str] = None):
+        """SDK import, 클라이언트 생성, 컬렉션 차원 조회, 질의응답 토큰 인코딩 로드를 미리 수행"""
+        started = time.perf_counter()
+        generator = self.get_generator(subject, mode)
+        generator.openai_client  # SDK import + 연결 풀 생성
+        get_token_counter().count("", get_stage_model("qa"))
+        try:
+            generator._get_query_dimensions()
+        except Exception as e:
+            print(f"⚠️  {subject} 컬렉션 조회 실패 (첫 작업에서 다시 시도): {e}")
+        print(f"🔥 {subject} 생성기 준비 완료 ({(time.perf_counter() - started) * 1000:.0f}ms)")
+
+    # ------------------------------------------------------------------
+    # 작업 제출 / 실행
+    # ------------------------------------------------------------------
+
+    def submit(self, request: Dict) -> List[Dict]:
+        """HTTP 요청 본문을 강의별 작업으로 제출"""
+        subject = request.get("subject")
+        if not subject or not os.path.exists(get_curriculum_file(subject)):
+            raise ValueError(f"커리큘럼이 없는 주제입니다: {subject}")
+        mode = request.get("mode")
+        if mode not in (None, "single", "sections"):
+            raise ValueError(f"지원하지 않는 생성 방식입니다: {mode}")
+
+        lectures = request.get("lectures") or [request.get("lecture")]
+        if not all(isinstance(number, int) for number in lectures):
+            raise ValueError("lecture(강의 번호) 또는 lectures(번호 목록)를 지정하세요")
+
+        jobs = []
+        for lecture_number in lectures:
+            params = {"lecture": lecture_number, "mode": mode}
+            # 같은 강의가 이미 대기/실행 중이면 중복 작업을 만들지 않음
+            jobs.append(self.queue.submit("lecture", subject, params,
+                                          dedupe_key=f"lecture:{subject}:{lecture_number}"))
+        return jobs
+
+    def _run_lecture_job(self, job: Dict) -> Dict:
+        params = job["params"]
+        generator = self.get_generator(job["subject"], params.get("mode"))
+        lecture_info = generator.curriculum_manager.get_lecture_info(params["lecture"])
+        if lecture_info is None:
+            raise LookupError(f"{params['lecture']}강 정보를 찾을 수 없습니다.")
+
+        started = time.perf_counter()
+        filepath = generator.generate_and_save_lecture(params["lecture"])
+        # 섹션 보완 후에도 남은 오류는 전체 재생성(작업 재시도) 대신 결과에 기록
+        validation = validate_lecture_file(filepath)
+        return {
+            "filepath": filepath,
+            "seconds": round(time.perf_counter() - started, 3),
+            "validation": {"errors": validation["errors"], "warnings": validation["warnings"],
+                           "stats": validation["stats"]}
+        }
+
+    def _worker(self, index: int):
+        worker = f"{self.node}:{index}"
+        while not self._stop.is_set():
+            job = self.queue.claim(timeout=1.0, worker=worker)
+            if job is None:
+                if self.exit_when_idle and not any(self.queue.counts()[status] for status in ("queued", "running")):
+                    return
+                continue
+            print(f"⏳ [워커 {index}] 작업 {job['id']} 시작: {job['subject']} {job['params'].get('lecture')}강 "
+                  f"(시도 {job['attempts']}/{self.max_attempts})")
+            with self.queue.keep_alive(job["id"], worker) as lease_lost:
+                try:
+                    with self.tracer.span("service.job", kind=job["kind"], subject=job["subject"]):
+                        result = self._run_lecture_job(job)
+                    error, retry = None, False
+                except LookupError as e:
+                    error, retry = str(e), False
+                except Exception as e:
+                    error, retry = str(e), job["attempts"] < self.max_attempts
+
+            # 임대를 잃었으면 다른 워커가 작업을 이어받았으므로 결과를 기록하지 않음 (강의 파일은 원자적으로 교체됨)
+            if lease_lost.is_set():
+                print(f"⚠️  [워커 {index}] 작업 {job['id']} 임대 만료: 다른 워커가 처리하므로 결과를 버림")
+            elif error is None:
+                self.queue.complete(job["id"], result, worker=worker)
+                print(f"✅ [워커 {index}] 작업 {job['id']} 완료")
+            else:
+                self.queue.fail(job["id"], error, retry=retry, worker=worker)
+                print(f"❌ [워커 {index}] 작업 {job['id']} 실패{' (재시도 예정)' if retry else ''}: {error}")
+
+    def start(self):
+        """중단된 작업 복구 후 워커 스레드 시작"""
+        recovered = self.queue.recover()
+        if recovered:
+            print(f"♻️  중단된 작업 {recovered}개를 대기열로 복귀")
+        for index in range(1, self.workers + 1):
+            thread = threading.Thread(target=self._worker, args=(index,), name=f"job-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def wait(self):
+        """워커 스레드가 모두 끝날 때까지 대기 (exit_when_idle 워커 노드용)"""
+        for thread in self._threads:
+            while thread.is_alive():
+                thread.join(1.0)
+
+    def stop(self, timeout: Optional[float] = None):
+        """새 작업 수락 중단, 실행 중인 작업이 끝날 때까지 대기"""
+        self._stop.set()
+        for thread in self._threads:
+            thread.join(timeout)
+
+    # ------------------------------------------------------------------
+    # 강의 질의응답
+    # ------------------------------------------------------------------
+
+    def get_lesson_qa(self, request: Dict) -> LessonQA:
+        """질의응답 요청 검증 후 준비된 생성기를 공유하는 LessonQA 반환"""
+        subject = request.get("subject")
+        if not subject or not os.path.exists(get_curriculum_file(subject)):
+            raise ValueError(f"커리큘럼이 없는 주제입니다: {subject}")
+        if not isinstance(request.get("question"), str) or not request["question"].strip():
+            raise ValueError("question(질문)을 지정하세요")
+        if request.get("lecture") is not None and not isinstance(request["lecture"], int):
+            raise ValueError("lecture는 강의 번호여야 합니다")
+        return LessonQA(self.get_generator(subject))
+
+    def health(self) -> Dict:
+        with self._generators_lock:
+            warm = [f"{subject}/{mode}" for subject, mode in self._generators]
+        return {"status": "ok", "workers": self.workers, "jobs": self.queue.counts(), "warm_generators": warm}
+
+
+def _make_handler(service: GenerationService):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def _send(self, status: int, body: bytes, content_type: str = "application/json; charset=utf-8"):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _send_json(self, status: int, payload):
+            self._send(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"))
+
+        def do_GET(self):
+            url = urlparse(self.path)
+            query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+            if url.path == "/health":
+                self._send_json(200, service.health())
+            elif url.path == "/metrics":
+                self._send(200, service.tracer.format_prometheus().encode("utf-8"),
+                           "text/plain; version=0.0.4; charset=utf-8")
+            elif url.path == "/jobs":
+                status = query.get("status")
+                if status and status not in JOB_STATUSES:
+                    self._send_json(400, {"error": f"알 수 없는 상태입니다: {status}"})
+                    return
+                try:
+                    limit = int(query.get("limit", 50))
+                except ValueError:
+                    self._send_json(400, {"error": f"limit은 정수여야 합니다: {query['limit']}"})
+                    return
+                self._send_json(200, {"jobs": service.queue.list(status, query.get("subject"), limit)})
+            elif url.path.startswith("/jobs/"):
+                job = service.queue.get(url.path[len("/jobs/"):])
+                if job is None:
+                    self._send_json(404, {"error": "작업을 찾을 수 없습니다"})
+                else:
+                    self._send_json(200, job)
+            else:
+                self._send_json(404, {"error": "not found"})
+
+        def _send_events(self, events):
+            """SSE 응답 (이벤트마다 data: {json} 한 줄을 바로 전송)"""
+            self.send_response(200)
+            self.send_header("Content-Type", "text/event-stream; charset=utf-8")
+            self.send_header("Cache-Control", "no-cache")
+            self.send_header("Connection", "close")
+            self.end_headers()
+            self.close_connection = True
+            try:
+                for event in events:
+                    self.wfile.write(f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+            except (BrokenPipeError, ConnectionResetError):
+                pass  # 클라이언트가 연결을 끊으면 답변 생성 중단
+            finally:
+                events.close()
+
+        def do_POST(self):
+            path = urlparse(self.path).path
+            if path not in ("/jobs", "/qa/stream", "/qa/retrieve"):
+                self._send_json(404, {"error": "not found"})
+                return
+            try:
+                length = int(self.headers.get("Content-Length", 0))
+                request = json.loads(self.rfile.read(length) or b"{}")
+                if not isinstance(request, dict):
+                    raise ValueError("요청 본문은 JSON 객체여야 합니다")
+                if path == "/jobs":
+                    jobs = service.submit(request)
+                else:
+                    qa = service.get_lesson_qa(request)
+            except (ValueError, TypeError, AttributeError) as e:
+                self._send_json(400, {"error": str(e)})
+                return
+            except Exception as e:
+                # 템플릿 누락(FileNotFoundError), 작업 큐 DB 오류 등 서버 쪽 문제
+                self._send_json(500, {"error": f"요청 처리 실패: {e}"})
+                return
+
+            if path == "/jobs":
+                self._send_json(202, {"jobs": jobs})
+            elif path == "/qa/stream":
+                self._send_events(qa.stream_answer(request["question"], request.get("lecture"),
+                                                   request.get("history")))
+            else:
+                try:
+                    retrieval = qa.retrieve(request["question"], request.get("lecture"))
+                except Exception as e:
+                    self._send_json(502, {"error": f"검색 실패: {e}"})
+                    return
+                retrieval.pop("lecture")
+                self._send_json(200, retrieval)
+
+    return Handler
+
+
+def serve(host: str, port: int, service: GenerationService):
+    """HTTP 서비스 실행 (SIGTERM/Ctrl+C 시 실행 중인 작업 완료 후 종료)"""
+    server = ThreadingHTTPServer((host, port), _make_handler(service))
+    server.daemon_threads = True
+    service.start()
+
+    def shutdown(*_):
+        threading.Thread(target=server.shutdown, daemon=True).start()
+
+    signal.signal(signal.SIGTERM, shutdown)
+    print(f"🚀 강의 생성 서비스 실행 중: http://{host}:{server.server_address[1]} (워커 {service.workers}개)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("🛑 서비스 종료 중 (실행 중인 작업 완료 대기)...")
+        server.server_close()
+        service.stop()
+        service.queue.close()
+
+
+def run_workers(service: GenerationService):
+    """HTTP 없이 공유 작업 큐 처리 (SIGTERM/Ctrl+C 시 실행 중인 작업 완료 후 종료)"""
+    signal.signal(signal.SIGTERM, lambda *_: service._stop.set())
+    service.start()
+    print(f"🚀 작업 워커 실행 중: {service.node} (워커 {service.workers}개, 큐 {service.queue.db_path})")
+    try:
+        service.wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        print("🛑 워커 종료 중 (실행 중인 작업 완료 대기)...")
+        service.stop()
+        print(f"📊 작업 현황: {service.queue.counts()}")
+        service.queue.close()
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="강의 생성 서비스 (작업 큐 + 준비된 생성기)")
+    parser.add_argument("--host", default=SERVICE_CONFIG["host"], help=f"바인드 주소 (기본: {SERVICE_CONFIG['host']})")
+    parser.add_argument("--port", type=int, default=SERVICE_CONFIG["port"], help=f"포트 (기본: {SERVICE_CONFIG['port']})")
+    parser.add_argument("--workers", type=int, default=SERVICE_CONFIG["workers"],
+                        help=f"동시에 처리할 작업 수 (기본: {SERVICE_CONFIG['workers']})")
+    parser.add_argument("--job-db", default=SERVICE_CONFIG["job_db"], help="작업 큐 SQLite 파일 경로")
+    parser.add_argument("--preload", action="append", default=[], metavar="SUBJECT",
+                        help="시작 시 미리 준비할 주제 (반복 가능)")
+    parser.add_argument("--mode", choices=["single", "sections"], help="미리 준비할 생성 방식 (기본: 설정값)")
+    parser.add_argument("--no-http", action="store_true",
+                        help="HTTP 없이 워커만 실행 (공유 작업 큐를 처리하는 추가 워커 노드)")
+    parser.add_argument("--exit-when-idle", action="store_true",
+                        help="대기/실행 중인 작업이 모두 끝나면 종료 (--no-http와 함께 사용)")
+    add_model_route_arguments(parser)
+
+    args = parser.parse_args()
+    apply_model_route_arguments(args)
+
+    service = GenerationService(JobQueue(args.job_db), workers=args.workers, exit_when_idle=args.exit_when_idle)
+    for subject in args.preload:
+        service.preload(subject, args.mode)
+    if args.no_http:
+        run_workers(service)
+    else:
+        serve(args.host, args.port, service)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,265 @@
+"""
+영속 작업 큐 모듈
+
+강의 생성 서비스의 작업(제출/실행/완료/실패)을 SQLite 파일에 저장
+서비스가 재시작되어도 대기 중인 작업이 유지되고, 실행 중에 중단된 작업은 다시 대기열로 복귀
+
+작업은 만료되는 임대(lease)로 가져가므로 같은 DB 파일(공유 볼륨)을 여러 프로세스/노드의 워커가 함께 사용할 수 있음
+- 실행 중인 워커는 heartbeat로 임대를 연장하고, 임대가 만료된 작업(워커 종료/장애)은 다른 워커가 다시 가져감
+- 완료/실패 기록은 임대를 가진 워커만 가능 (임대를 잃은 워커의 결과는 버림)
+"""
+
+import os
+import json
+import time
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from config import SERVICE_CONFIG
+
+JOB_STATUSES = ("queued", "running", "done", "failed")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    params TEXT NOT NULL,
+    dedupe_key TEXT,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    result TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    worker TEXT,
+    lease_until REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status, created_at);
+CREATE INDEX IF NOT EXISTS jobs_dedupe ON jobs (dedupe_key, status);
+"""
+
+
+class JobQueue:
+    """SQLite 기반 작업 큐 클래스 (워커 스레드 및 같은 DB 파일을 쓰는 다른 프로세스가 공유)"""
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or SERVICE_CONFIG["job_db"]
+        self.lease_seconds = SERVICE_CONFIG["lease_seconds"]
+        self.max_attempts = SERVICE_CONFIG["max_attempts"]
+        os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+        # 다른 프로세스가 쓰기 잠금을 잡고 있으면 최대 30초 대기
+        self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute(f"PRAGMA journal_mode={SERVICE_CONFIG['journal_mode']}")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+
+    def _migrate(self):
+        """임대 컬럼이 없는 이전 DB 파일에 컬럼 추가"""
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column, kind in (("worker", "TEXT"), ("lease_until", "REAL")):
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column} {kind}")
+
+    @contextmanager
+    def _transaction(self):
+        """쓰기 잠금을 먼저 잡는 트랜잭션 (여러 프로세스가 같은 작업을 가져가지 않도록)"""
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._conn.execute("COMMIT")
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> Dict:
+        job = dict(row)
+        job["params"] = json.loads(job["params"])
+        job["result"] = json.loads(job["result"]) if job["result"] else None
+        job.pop("dedupe_key", None)
+        return job
+
+    def recover(self) -> int:
+        """임대 없이(이전 버전) 또는 임대가 만료된 채로 running인 작업을 대기열로 복귀 (서비스 시작 시 호출)
+
+        다른 노드의 워커가 임대를 유지 중인 작업은 그대로 둠
+        """
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, worker = NULL, lease_until = NULL "
+                "WHERE status = 'running' AND (lease_until IS NULL OR lease_until < ?)",
+                (time.time(),)
+            )
+            return cursor.rowcount
+
+    def submit(self, kind: str, subject: str, params: Dict, dedupe_key: Optional[str] = None) -> Dict:
+        """작업 제출 (같은 dedupe_key의 작업이 대기/실행 중이면 그 작업 반환)"""
+        with self._available:
+            job_id = os.urandom(8).hex()
+            with self._transaction():
+                if dedupe_key is not None:
+                    row = self._conn.execute(
+                        "SELECT * FROM jobs WHERE dedupe_key = ? AND status IN ('queued', 'running')",
+                        (dedupe_key,)
+                    ).fetchone()
+                    if row is not None:
+                        return self._to_dict(row)
+                self._conn.execute(
+                    "INSERT INTO jobs (id, kind, subject, params, dedupe_key, status, created_at) "
+                    "VALUES (?, ?, ?, ?, ?, 'queued', ?)",
+                    (job_id, kind, subject, json.dumps(params, ensure_ascii=False), dedupe_key, time.time())
+                )
+            self._available.notify()
+            return self._to_dict(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def _claim_once(self, worker: str, lease_seconds: float) -> Optional[Dict]:
+        now = time.time()
+        with self._transaction():
+            # 임대가 만료된 작업 중 재시도 횟수를 다 쓴 작업은 실패 처리
+            self._conn.execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, worker = NULL, lease_until = NULL "
+                "WHERE status = 'running' AND lease_until < ? AND attempts >= ?",
+                ("작업 임대 만료 (워커 응답 없음, 최대 시도 횟수 초과)", now, now, self.max_attempts)
+            )
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' OR (status = 'running' AND lease_until < ?) "
+                "ORDER BY created_at LIMIT 1",
+                (now,)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute(
+                "UPDATE jobs SET status = 'running', attempts = attempts + 1, started_at = ?, "
+                "worker = ?, lease_until = ? WHERE id = ?",
+                (now, worker, now + lease_seconds, row["id"])
+            )
+            return self._to_dict(self._conn.execute("SELECT * FROM jobs WHERE id = ?", (row["id"],)).fetchone())
+
+    def claim(self, timeout: Optional[float] = None, worker: Optional[str] = None,
+              lease_seconds: Optional[float] = None) -> Optional[Dict]:
+        """가장 오래된 대기 작업(또는 임대 만료 작업)을 임대하여 반환 (없으면 timeout까지 대기)
+
+        같은 프로세스의 제출은 즉시 깨우고, 다른 프로세스의 제출은 poll_seconds 간격으로 확인
+        """
+        worker = worker or f"{os.getpid()}:{threading.current_thread().name}"
+        lease_seconds = lease_seconds or self.lease_seconds
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._available:
+            while True:
+                job = self._claim_once(worker, lease_seconds)
+                if job is not None:
+                    return job
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return None
+                poll = SERVICE_CONFIG["poll_seconds"]
+                self._available.wait(poll if remaining is None else min(remaining, poll))
+
+    def heartbeat(self, job_id: str, worker: str, lease_seconds: Optional[float] = None) -> bool:
+        """임대 연장 (False면 임대를 잃음: 만료되어 다른 워커가 가져갔거나 작업이 종료됨)"""
+        with self._lock:
+            cursor = self._conn.execute(
+                "UPDATE jobs SET lease_until = ? WHERE id = ? AND worker = ? AND status = 'running'",
+                (time.time() + (lease_seconds or self.lease_seconds), job_id, worker)
+            )
+            return cursor.rowcount == 1
+
+    @contextmanager
+    def keep_alive(self, job_id: str, worker: str, lease_seconds: Optional[float] = None) -> Iterator[threading.Event]:
+        """작업 실행 동안 임대 시간의 1/3 간격으로 heartbeat (임대를 잃으면 반환된 Event가 set됨)"""
+        lease_seconds = lease_seconds or self.lease_seconds
+        lost = threading.Event()
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(lease_seconds / 3):
+                try:
+                    if not self.heartbeat(job_id, worker, lease_seconds):
+                        lost.set()
+                        return
+                except sqlite3.Error as e:
+                    # 일시적인 잠금/공유 볼륨 오류는 다음 주기에 재시도 (임대 시간 안에 회복되면 유지)
+                    print(f"⚠️  작업 {job_id} heartbeat 실패: {e}")
+
+        thread = threading.Thread(target=beat, name=f"lease-{job_id}", daemon=True)
+        thread.start()
+        try:
+            yield lost
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job_id: str, result: Dict, worker: Optional[str] = None) -> bool:
+        """작업 완료 기록 (worker를 지정하면 임대를 가진 경우에만 기록)"""
+        query = ("UPDATE jobs SET status = 'done', result = ?, error = NULL, finished_at = ?, "
+                 "worker = NULL, lease_until = NULL WHERE id = ?")
+        values = [json.dumps(result, ensure_ascii=False), time.time(), job_id]
+        if worker is not None:
+            query += " AND worker = ? AND status = 'running'"
+            values.append(worker)
+        with self._lock:
+            return self._conn.execute(query, values).rowcount == 1
+
+    def fail(self, job_id: str, error: str, retry: bool = False, worker: Optional[str] = None) -> bool:
+        """작업 실패 기록 (retry이면 대기열 맨 뒤로 다시 넣음, worker 지정 시 임대를 가진 경우에만)"""
+        if retry:
+            query = ("UPDATE jobs SET status = 'queued', error = ?, started_at = NULL, created_at = ?, "
+                     "worker = NULL, lease_until = NULL WHERE id = ?")
+        else:
+            query = ("UPDATE jobs SET status = 'failed', error = ?, finished_at = ?, "
+                     "worker = NULL, lease_until = NULL WHERE id = ?")
+        values = [error, time.time(), job_id]
+        if worker is not None:
+            query += " AND worker = ? AND status = 'running'"
+            values.append(worker)
+        with self._available:
+            updated = self._conn.execute(query, values).rowcount == 1
+            if retry and updated:
+                self._available.notify()
+            return updated
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        """작업 조회"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._to_dict(row) if row is not None else None
+
+    def list(self, status: Optional[str] = None, subject: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """최근 작업 목록"""
+        query = "SELECT * FROM jobs"
+        conditions, values = [], []
+        if status:
+            conditions.append("status = ?")
+            values.append(status)
+        if subject:
+            conditions.append("subject = ?")
+            values.append(subject)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC LIMIT ?"
+        values.append(limit)
+        with self._lock:
+            rows = self._conn.execute(query, values).fetchall()
+        return [self._to_dict(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        """상태별 작업 수"""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        counts = {status: 0 for status in JOB_STATUSES}
+        counts.update({status: count for status, count in rows})
+        return counts
+
+    def close(self):
+        with self._available:
+            self._available.notify_all()
+            self._conn.close()
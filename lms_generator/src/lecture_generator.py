@@ -8,90 +8,217 @@ unitask_lecture_example.md와 동일한 수준의 강의 제작
 import os
 import json
 import time
-from typing import Dict, List, Any
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple, Union
 from datetime import datetime
 
-import openai
-from qdrant_client import QdrantClient
-from dotenv import load_dotenv
-
 from config import (
     get_subject_paths,
     get_qdrant_collection_name, 
     RAG_CONFIG,
     GENERATION_CONFIG,
+    VALIDATION_CONFIG,
+    LECTURE_SECTIONS,
+    MODEL_ROUTING,
     EXAMPLES_DIR,
-    BASE_DIR
+    get_stage_model
 )
+from atomic_write import write_atomic
+from course_bundle import update_manifest
+from clients import get_openai_client, get_async_openai_client, get_qdrant_client
 from curriculum_manager import CurriculumManager
+from lecture_sources import SourceIndex, collect_sources, record_contexts
+from lecture_validator import validate_lecture, replace_section, append_to_section, unwrap_markdown_fence
+from embeddings import embed_query, embed_query_async
+from query_cache import QueryCache
+from single_flight import get_single_flight
+from tracing import get_tracer, add_tracing_arguments, configure_tracing, finish_tracing
+
+SYSTEM_PROMPT = "당신은 UniTask 전문가이자 고품질 기술 강의 작성자입니다. 주어진 품질 기준을 정확히 따라 깊이 있는 강의를 작성합니다."
+
+# 품질 기준 템플릿 캐시 (경로 → 수정 시각/본문/섹션 분할), 같은 프로세스의 생성기들이 공유
+_template_cache: Dict[str, Dict] = {}
+_template_lock = threading.Lock()
+
+
+def load_template(template_path: str) -> Dict:
+    """품질 기준 템플릿 로드 (파일이 바뀌지 않았으면 공유 캐시 사용)"""
+    mtime_ns = os.stat(template_path).st_mtime_ns
+    with _template_lock:
+        entry = _template_cache.get(template_path)
+        if entry is None or entry["mtime_ns"] != mtime_ns:
+            with open(template_path, 'r', encoding='utf-8') as f:
+                entry = {"mtime_ns": mtime_ns, "text": f.read(), "sections": None}
+            _template_cache[template_path] = entry
+        return entry
 
-# 환경 변수 로드
-load_dotenv(os.path.join(BASE_DIR, '..', '.env'))
 
 class LectureGenerator:
     """강의 생성 클래스"""
     
-    def __init__(self, subject: str):
+    def __init__(self, subject: str, curriculum_manager: Optional[CurriculumManager] = None,
+                 mode: Optional[str] = None):
         self.subject = subject
         self.paths = get_subject_paths(subject)
         self.collection_name = get_qdrant_collection_name(subject)
         
-        # OpenAI 클라이언트 초기화
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # API 클라이언트 (SDK import 비용을 피하기 위해 최초 사용 시 생성)
+        self._openai_client = None
+        self._qdrant_client = None
+        
+        # 커리큘럼 매니저 초기화 (배치 생성기와 공유 가능)
+        self.curriculum_manager = curriculum_manager or CurriculumManager(subject)
+        
+        # 품질 기준 템플릿 경로 (본문은 최초 사용 시 로드, 생성기끼리 공유)
+        self.template_path = self._get_quality_template_path()
         
-        # Qdrant 클라이언트 초기화
-        qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.qdrant_client = QdrantClient(url=qdrant_url)
+        # 생성 방식 (single | sections)
+        self.mode = mode or GENERATION_CONFIG["mode"]
+        if self.mode not in ("single", "sections"):
+            raise ValueError(f"지원하지 않는 생성 방식입니다: {self.mode}")
         
-        # 커리큘럼 매니저 초기화
-        self.curriculum_manager = CurriculumManager(subject)
+        # 단계별 추적
+        self.tracer = get_tracer()
         
-        # 품질 기준 템플릿 로드
-        self.quality_template = self._load_quality_template()
+        # 검색 결과 캐시 (컬렉션 버전이 바뀌면 자동 무효화)
+        self.query_cache = QueryCache(subject) if RAG_CONFIG["query_cache"] else None
         
-    def _load_quality_template(self) -> str:
-        """품질 기준 템플릿 로드"""
+        # 쿼리 임베딩 차원 (컬렉션 차원에 맞춰 최초 검색 시 결정)
+        self._query_dimensions = None
+        self._query_dimensions_resolved = False
+        
+    @property
+    def openai_client(self):
+        """OpenAI 클라이언트 (최초 접근 시 프로세스 공유 클라이언트 사용)"""
+        if self._openai_client is None:
+            self._openai_client = get_openai_client()
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    @property
+    def qdrant_client(self):
+        """Qdrant 클라이언트 (최초 접근 시 프로세스 공유 클라이언트 사용)"""
+        if self._qdrant_client is None:
+            self._qdrant_client = get_qdrant_client()
+        return self._qdrant_client
+    
+    @qdrant_client.setter
+    def qdrant_client(self, client):
+        self._qdrant_client = client
+    
+    def _get_quality_template_path(self) -> str:
+        """품질 기준 템플릿 경로 확인"""
         template_path = os.path.join(EXAMPLES_DIR, f"{self.subject}_lecture_example.md")
         
         if not os.path.exists(template_path):
             raise FileNotFoundError(f"품질 기준 템플릿이 없습니다: {template_path}")
-            
-        with open(template_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        
+        return template_path
     
-    def search_rag_context(self, query: str, top_k: int = None) -> List[str]:
-        """RAG에서 관련 컨텍스트 검색"""
-        if top_k is None:
-            top_k = RAG_CONFIG["top_k_results"]
-            
-        print(f"🔍 RAG 검색 중: '{query[:50]}...'")
+    @property
+    def quality_template(self) -> str:
+        """품질 기준 템플릿 본문 (공유 캐시)"""
+        return load_template(self.template_path)["text"]
+    
+    def _get_query_dimensions(self) -> Optional[int]:
+        """컬렉션 벡터 차원에 맞는 쿼리 임베딩 차원 반환"""
+        if self._query_dimensions_resolved:
+            return self._query_dimensions
         
+        dimensions = RAG_CONFIG["embedding_dimensions"]
         try:
-            # 쿼리를 임베딩으로 변환
-            response = self.openai_client.embeddings.create(
-                model=RAG_CONFIG["embedding_model"],
-                input=query
+            collection = self.qdrant_client.get_collection(self.collection_name)
+            size = collection.config.params.vectors.size
+            # 모델 기본 차원과 다르면 축소 차원으로 구축된 컬렉션
+            dimensions = size if size != RAG_CONFIG["vector_dimension"] else None
+        except Exception:
+            pass
+        
+        self._query_dimensions = dimensions
+        self._query_dimensions_resolved = True
+        return dimensions
+    
+    def _subject_filter(self):
+        """payload의 subject가 현재 주제인 청크만 검색하는 Qdrant 필터"""
+        from qdrant_client.models import FieldCondition, Filter, MatchValue
+        
+        return Filter(must=[FieldCondition(key="subject", match=MatchValue(value=self.subject))])
+    
+    def _search_contexts(self, query: str, top_k: int, subject_only: bool = False) -> List[Dict]:
+        """쿼리 임베딩 → (캐시 조회) → Qdrant 검색 → 컨텍스트 목록
+        
+        subject_only: 주제 필터 적용 (주제별 컬렉션과 범위가 같으므로 캐시 결과 공유)
+        """
+        if self.query_cache is not None:
+            cached = self.query_cache.get_exact(query, top_k)
+            if cached is not None:
+                return cached
+        
+        # 쿼리를 임베딩으로 변환
+        with self.tracer.span("rag.embed"):
+            query_vector = embed_query(
+                self.openai_client,
+                query,
+                dimensions=self._get_query_dimensions()
             )
-            query_vector = response.data[0].embedding
-            
-            # Qdrant에서 유사한 벡터 검색
+        
+        # 의미가 거의 같은 이전 쿼리의 검색 결과 재사용
+        if self.query_cache is not None:
+            cached = self.query_cache.lookup(query_vector, top_k)
+            if cached is not None:
+                return cached
+        
+        # Qdrant에서 유사한 벡터 검색
+        with self.tracer.span("rag.search", top_k=top_k):
             search_result = self.qdrant_client.search(
                 collection_name=self.collection_name,
                 query_vector=query_vector,
+                query_filter=self._subject_filter() if subject_only else None,
                 limit=top_k,
                 with_payload=True
             )
+        
+        contexts = self._to_contexts(search_result)
+        if self.query_cache is not None:
+            self.query_cache.put(query, query_vector, top_k, contexts)
+        return contexts
+    
+    @staticmethod
+    def _to_contexts(search_result) -> List[Dict]:
+        """검색 결과를 컨텍스트 딕셔너리 목록으로 변환"""
+        contexts = []
+        for hit in search_result:
+            context_info = {
+                "text": hit.payload["text"],
+                "file_path": hit.payload["file_path"],
+                "source_files": hit.payload.get("source_files", [hit.payload["file_path"]]),
+                "chunk_id": f"{hit.payload['file_path']}_{hit.payload.get('chunk_index', 0)}",
+                "score": hit.score
+            }
+            contexts.append(context_info)
+        return contexts
+    
+    def _coalesced_search(self, query: str, top_k: int) -> List[Dict]:
+        """동시에 실행 중인 동일 검색(같은 컬렉션/쿼리/top_k)은 결과를 공유"""
+        return get_single_flight("rag.search").do(
+            (self.collection_name, query, top_k),
+            lambda: self._search_contexts(query, top_k)
+        )
+    
+    def search_rag_context(self, query: str, top_k: int = None) -> List[str]:
+        """RAG에서 관련 컨텍스트 검색"""
+        if top_k is None:
+            top_k = RAG_CONFIG["top_k_results"]
             
-            # 결과 추출
-            contexts = []
-            for hit in search_result:
-                context_info = {
-                    "text": hit.payload["text"],
-                    "file_path": hit.payload["file_path"],
-                    "score": hit.score
-                }
-                contexts.append(context_info)
-            
+        print(f"🔍 RAG 검색 중: '{query[:50]}...'")
+        
+        try:
+            contexts = self._coalesced_search(query, top_k)
             print(f"✅ {len(contexts)}개 컨텍스트 검색 완료")
             return contexts
             
@@ -102,65 +229,149 @@ class LectureGenerator:
     def _direct_search_rag(self, query: str, top_k: int = 5) -> List[Dict]:
         """로그 출력 없이 직접 RAG 검색 (내부용)"""
         try:
-            # 쿼리를 임베딩으로 변환
-            response = self.openai_client.embeddings.create(
-                model=RAG_CONFIG["embedding_model"],
-                input=query
-            )
-            query_vector = response.data[0].embedding
-            
-            # Qdrant에서 유사한 벡터 검색
-            search_result = self.qdrant_client.search(
-                collection_name=self.collection_name,
-                query_vector=query_vector,
-                limit=top_k,
-                with_payload=True
-            )
-            
-            # 결과 추출
-            contexts = []
-            for hit in search_result:
-                context_info = {
-                    "text": hit.payload["text"],
-                    "file_path": hit.payload["file_path"],
-                    "score": hit.score
-                }
-                contexts.append(context_info)
-            
-            return contexts
+            return self._coalesced_search(query, top_k)
             
         except Exception as e:
             print(f"⚠️ 쿼리 '{query[:30]}...' 검색 실패: {e}")
             return []
     
-    def search_multiple_queries(self, queries: List[str]) -> List[Dict]:
-        """여러 쿼리로 RAG 검색 후 중복 제거하여 병합"""
+    async def search_rag_context_async(self, query: str, top_k: int = None) -> List[Dict]:
+        """asyncio 호출자용 RAG 검색 (같은 이벤트 루프의 동일 검색은 결과 공유)"""
+        import asyncio
+        
+        if top_k is None:
+            top_k = RAG_CONFIG["top_k_results"]
+        
+        async def fetch():
+            if self.query_cache is not None:
+                cached = self.query_cache.get_exact(query, top_k)
+                if cached is not None:
+                    return cached
+            # 차원 확인(최초 1회 Qdrant 조회)이 이벤트 루프를 막지 않도록 스레드에서 실행
+            dimensions = (self._query_dimensions if self._query_dimensions_resolved
+                          else await asyncio.to_thread(self._get_query_dimensions))
+            with self.tracer.span("rag.embed"):
+                query_vector = await embed_query_async(
+                    get_async_openai_client(),
+                    query,
+                    dimensions=dimensions
+                )
+            if self.query_cache is not None:
+                cached = self.query_cache.lookup(query_vector, top_k)
+                if cached is not None:
+                    return cached
+            with self.tracer.span("rag.search", top_k=top_k):
+                search_result = await asyncio.to_thread(
+                    self.qdrant_client.search,
+                    collection_name=self.collection_name,
+                    query_vector=query_vector,
+                    limit=top_k,
+                    with_payload=True
+                )
+            contexts = self._to_contexts(search_result)
+            if self.query_cache is not None:
+                self.query_cache.put(query, query_vector, top_k, contexts)
+            return contexts
+        
+        return await get_single_flight("rag.search").do_async((self.collection_name, query, top_k), fetch)
+    
+    @staticmethod
+    def merge_contexts(results: List[List[Dict]], top_k: int = None) -> List[Dict]:
+        """쿼리별 검색 결과를 중복 제거 후 점수순으로 병합하여 top_k개 선택"""
+        if top_k is None:
+            top_k = RAG_CONFIG["top_k_results"]
+        
         all_contexts = []
         seen_texts = set()
+        for contexts in results:
+            for ctx in contexts:
+                # 중복 제거 (텍스트 앞 100자로 판단)
+                text_key = ctx['text'][:100]
+                if text_key not in seen_texts:
+                    seen_texts.add(text_key)
+                    all_contexts.append(ctx)
+        
+        all_contexts.sort(key=lambda x: x['score'], reverse=True)
+        return all_contexts[:top_k]
+    
+    def search_multiple_queries(self, queries: List[str]) -> List[Dict]:
+        """여러 쿼리로 RAG 검색 후 중복 제거하여 병합"""
+        results = []
         
         for i, query in enumerate(queries, 1):
             print(f"🔍 쿼리 {i}/{len(queries)}: '{query[:40]}...'")
             
-            try:
-                contexts = self._direct_search_rag(query, top_k=3)  # 직접 검색으로 로그 중복 방지
-                
-                for ctx in contexts:
-                    # 중복 제거 (텍스트 앞 100자로 판단)
-                    text_key = ctx['text'][:100]
-                    if text_key not in seen_texts:
-                        seen_texts.add(text_key)
-                        all_contexts.append(ctx)
-                        
-            except Exception as e:
-                continue  # 이미 _direct_search_rag에서 에러 로그 출력
-        
-        # 스코어 순으로 정렬하고 top-5만 선택
-        all_contexts.sort(key=lambda x: x['score'], reverse=True)
-        final_contexts = all_contexts[:RAG_CONFIG["top_k_results"]]
+            # 직접 검색으로 로그 중복 방지 (실패 시 _direct_search_rag에서 에러 로그 출력 후 빈 목록)
+            results.append(self._direct_search_rag(query, top_k=RAG_CONFIG["query_top_k"]))
+        
+        final_contexts = self.merge_contexts(results)
         
         print(f"✅ 총 {len(final_contexts)}개 고유 컨텍스트 병합 완료")
         return final_contexts
     
+    @staticmethod
+    def get_focus_keywords(lecture_info: Dict) -> List[str]:
+        """강의 핵심 키워드 (없으면 description에서 추출)"""
+        focus_keywords = lecture_info.get('focus_keywords', [])
+        if not focus_keywords:
+            # 백워드 호환성: description에서 키워드 추출
+            focus_keywords = lecture_info.get('description', '').split(', ')
+        return focus_keywords
+    
+    @staticmethod
+    def build_search_queries(lecture_info: Dict, focus_keywords: List[str]) -> List[str]:
+        """강의별 RAG 검색 쿼리 목록 (API 호출 없음)"""
+        main_apis = lecture_info.get('main_apis', [])
+        
+        # 여러 검색 쿼리 생성
+        search_queries = []
+        
+        # 1. 제목 + 핵심 키워드
+        search_queries.append(f"{lecture_info['title']} {' '.join(focus_keywords[:3])}")
+        
+        # 2. 각 API별 개별 검색
+        for api in main_apis[:2]:  # 상위 2개 API만
+            search_queries.append(f"{api} usage example documentation")
+        
+        # 3. 키워드 조합 검색
+        if len(focus_keywords) >= 2:
+            search_queries.append(f"{focus_keywords[0]} {focus_keywords[1]} Unity implementation")
+        
+        return search_queries
+    
+    def expand_search_queries(self, lecture_info: Dict, base_queries: List[str]) -> List[str]:
+        """저렴한 모델로 RAG 검색 쿼리 추가 생성 (실패해도 기본 쿼리로 진행)"""
+        count = GENERATION_CONFIG["query_expansion_count"]
+        prompt = self._build_query_expansion_prompt(lecture_info, base_queries)
+        
+        try:
+            with self.tracer.span("lecture.query_expansion", lecture=lecture_info['number'],
+                                  model=get_stage_model("query")):
+                response = self._chat(prompt, GENERATION_CONFIG["query_expansion_max_tokens"], "query")
+        except Exception as e:
+            print(f"⚠️ 검색 쿼리 확장 실패: {e}")
+            return []
+        
+        queries = []
+        for line in response.splitlines():
+            query = line.strip().lstrip("-*0123456789.) ").strip().strip('"')
+            if query and query not in base_queries and query not in queries:
+                queries.append(query)
+        return queries[:count]
+    
+    @staticmethod
+    def _build_query_expansion_prompt(lecture_info: Dict, base_queries: List[str]) -> str:
+        """검색 쿼리 확장 프롬프트 구성"""
+        count = GENERATION_CONFIG["query_expansion_count"]
+        return f"""UniTask 공식 문서와 소스 코드에서 아래 강의에 필요한 자료를 찾기 위한 검색 쿼리를 {count}개 작성하세요.
+
+- 강의 제목: {lecture_info['title']}
+- 강의 설명: {lecture_info.get('description', '')}
+- 주요 API: {', '.join(lecture_info.get('main_apis', []))}
+- 이미 사용하는 쿼리: {'; '.join(base_queries)}
+
+이미 사용하는 쿼리와 겹치지 않는 영어 검색 쿼리만 한 줄에 하나씩 출력하세요 (번호, 설명 없이):"""
+    
     def _build_differentiation_context(self, lecture_info: Dict) -> str:
         """강의 차별화 컨텍스트 생성"""
         lecture_number = lecture_info['number']
@@ -168,10 +379,8 @@ class LectureGenerator:
         main_apis = lecture_info.get('main_apis', [])
         avoid_topics = lecture_info.get('avoid_topics', [])
         
-        # 이전 강의들 분석
-        all_lectures = self.curriculum_manager.get_lecture_series()
-        previous_lectures = [lec for lec in all_lectures if lec['number'] < lecture_number]
-        next_lectures = [lec for lec in all_lectures if lec['number'] > lecture_number]
+        # 이전 강의들 분석 (앞뒤 2개 강의만 조회)
+        previous_lectures, next_lectures = self.curriculum_manager.get_neighbor_lectures(lecture_number)
         
         context = f"""
 ==== 강의 차별화 가이드 ====
@@ -199,14 +408,20 @@ class LectureGenerator:
 """
         return context
     
+    @staticmethod
+    def _format_rag_contexts(rag_contexts: List[Dict]) -> str:
+        """RAG 컨텍스트를 프롬프트용 문자열로 변환 (강의 생성 중이면 출처로 기록)"""
+        record_contexts(rag_contexts)
+        return "\n\n".join([
+            f"=== {ctx['file_path']} (유사도: {ctx['score']:.3f}) ===\n{ctx['text']}"
+            for ctx in rag_contexts
+        ])
+    
     def _build_lecture_prompt(self, lecture_info: Dict, rag_contexts: List[Dict], keywords: List[str]) -> str:
         """강의 생성 프롬프트 구성"""
         
         # RAG 컨텍스트를 문자열로 변환
-        context_text = "\n\n".join([
-            f"=== {ctx['file_path']} (유사도: {ctx['score']:.3f}) ===\n{ctx['text']}"
-            for ctx in rag_contexts
-        ])
+        context_text = self._format_rag_contexts(rag_contexts)
         
         # 차별화 컨텍스트 생성
         differentiation_context = self._build_differentiation_context(lecture_info)
@@ -257,7 +472,7 @@ class LectureGenerator:
         return prompt
     
     def generate_lecture(self, lecture_number: int) -> str:
-        """개별 강의 생성"""
+        """개별 강의 생성 (로컬 검증 후 문제 섹션만 재생성)"""
         print(f"📝 {lecture_number}강 생성 시작...")
         
         # 커리큘럼에서 강의 정보 가져오기
@@ -268,63 +483,353 @@ class LectureGenerator:
         print(f"📚 강의 제목: {lecture_info['title']}")
         
         # RAG 검색 쿼리 개선 - 여러 키워드별 개별 검색
-        focus_keywords = lecture_info.get('focus_keywords', [])
-        main_apis = lecture_info.get('main_apis', [])
-        
-        if not focus_keywords:
-            # 백워드 호환성: description에서 키워드 추출
-            focus_keywords = lecture_info.get('description', '').split(', ')
+        focus_keywords = self.get_focus_keywords(lecture_info)
+        search_queries = self.build_search_queries(lecture_info, focus_keywords)
         
-        # 여러 검색 쿼리 생성
-        search_queries = []
-        
-        # 1. 제목 + 핵심 키워드
-        search_queries.append(f"{lecture_info['title']} {' '.join(focus_keywords[:3])}")
-        
-        # 2. 각 API별 개별 검색
-        for api in main_apis[:2]:  # 상위 2개 API만
-            search_queries.append(f"{api} usage example documentation")
-        
-        # 3. 키워드 조합 검색
-        if len(focus_keywords) >= 2:
-            search_queries.append(f"{focus_keywords[0]} {focus_keywords[1]} Unity implementation")
+        # 4. 저렴한 모델로 검색 쿼리 확장 (선택)
+        if GENERATION_CONFIG["query_expansion"]:
+            search_queries += self.expand_search_queries(lecture_info, search_queries)
         
         # RAG 컨텍스트 검색 - 여러 쿼리로 검색 후 병합
-        rag_contexts = self.search_multiple_queries(search_queries)
+        with self.tracer.span("lecture.rag_context", lecture=lecture_number, queries=len(search_queries)):
+            rag_contexts = self.search_multiple_queries(search_queries)
+        
+        # 섹션 병렬 생성 모드
+        if self.mode == "sections":
+            sections = self.generate_lecture_sections(lecture_info, rag_contexts, focus_keywords)
+            # max_tokens에서 끊긴 섹션은 코드 블록이 닫혀 있어도 보완 대상
+            truncated = [section["key"] for section in sections if section.get("finish_reason") == "length"]
+            return self.repair_lecture(lecture_info, self._stitch_sections(sections), rag_contexts, focus_keywords,
+                                       truncated_sections=truncated)
         
         # 프롬프트 구성
-        prompt = self._build_lecture_prompt(lecture_info, rag_contexts, focus_keywords)
+        with self.tracer.span("lecture.prompt_build", lecture=lecture_number) as span_attrs:
+            prompt = self._build_lecture_prompt(lecture_info, rag_contexts, focus_keywords)
+            span_attrs["prompt_chars"] = len(prompt)
         
-        # GPT-4o API 호출
-        print("🤖 GPT-4o 강의 생성 중...")
+        # 최종 본문 모델 호출
+        model = get_stage_model("lecture")
+        print(f"🤖 {model} 강의 생성 중...")
         try:
-            response = self.openai_client.chat.completions.create(
-                model=GENERATION_CONFIG["model"],
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "당신은 UniTask 전문가이자 고품질 기술 강의 작성자입니다. 주어진 품질 기준을 정확히 따라 깊이 있는 강의를 작성합니다."
-                    },
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                temperature=GENERATION_CONFIG["temperature"],
-                max_tokens=GENERATION_CONFIG["max_tokens"]
-            )
+            with self.tracer.span("lecture.completion", lecture=lecture_number, model=model):
+                response = self.openai_client.chat.completions.create(
+                    model=model,
+                    messages=[
+                        {
+                            "role": "system", 
+                            "content": SYSTEM_PROMPT
+                        },
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                    temperature=GENERATION_CONFIG["temperature"],
+                    max_tokens=GENERATION_CONFIG["max_tokens"]
+                )
+                self.tracer.record_response_usage(model, response.usage)
             
-            lecture_content = response.choices[0].message.content
+            lecture_content = unwrap_markdown_fence(response.choices[0].message.content)
             print("✅ 강의 생성 완료")
             
-            return lecture_content
+            # 로컬 검증 → 누락/잘린 섹션만 재생성
+            return self.repair_lecture(
+                lecture_info, lecture_content, rag_contexts, focus_keywords,
+                finish_reason=response.choices[0].finish_reason
+            )
             
         except Exception as e:
             print(f"❌ 강의 생성 실패: {e}")
             raise
     
-    def save_lecture(self, lecture_number: int, content: str) -> str:
-        """생성된 강의를 파일로 저장"""
+    def _get_template_sections(self) -> Dict[str, str]:
+        """품질 기준 예시를 섹션 키별 예시 텍스트로 분할 (템플릿별로 한 번만 분할해 공유)"""
+        template = load_template(self.template_path)
+        if template["sections"] is not None:
+            return template["sections"]
+        
+        blocks = []
+        for line in template["text"].splitlines():
+            if line.startswith("## ") or not blocks:
+                blocks.append([line])
+            else:
+                blocks[-1].append(line)
+        
+        sections = {spec["key"]: [] for spec in LECTURE_SECTIONS}
+        for block in blocks:
+            heading = block[0]
+            if not heading.startswith("## "):
+                continue  # 제목(#)과 도입부
+            spec = next((spec for spec in LECTURE_SECTIONS if any(word in heading for word in spec["match"])), None)
+            sections[spec["key"] if spec else "solution"].append("\n".join(block).strip())
+        
+        template["sections"] = {key: "\n\n".join(parts) for key, parts in sections.items()}
+        return template["sections"]
+    
+    def _chat(self, prompt: str, max_tokens: int, stage: str = "lecture") -> str:
+        """단일 채팅 완성 호출 (본문만 반환)"""
+        return self._complete(prompt, max_tokens, stage)[0]
+    
+    def _complete(self, prompt: str, max_tokens: int, stage: str = "lecture") -> Tuple[str, Optional[str]]:
+        """단일 채팅 완성 호출 (단계별 모델 라우팅, 사용량 기록 포함), (본문, finish_reason) 반환"""
+        model = get_stage_model(stage)
+        response = self.openai_client.chat.completions.create(
+            model=model,
+            messages=[
+                {
+                    "role": "system",
+                    "content": SYSTEM_PROMPT
+                },
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ],
+            temperature=GENERATION_CONFIG["temperature"],
+            max_tokens=max_tokens
+        )
+        self.tracer.record_response_usage(model, response.usage)
+        return response.choices[0].message.content, response.choices[0].finish_reason
+    
+    def _build_outline_prompt(self, lecture_info: Dict, context_text: str, keywords: List[str]) -> str:
+        """강의 개요 프롬프트 구성 (섹션 병렬 생성의 공통 뼈대)"""
+        section_list = "\n".join(f"- {spec['title']} (약 {spec['words']}단어)" for spec in LECTURE_SECTIONS)
+        
+        return f"""{self._build_differentiation_context(lecture_info)}
+
+==== RAG 컨텍스트 (UniTask 공식 자료) ====
+{context_text}
+===============================================
+
+==== 강의 정보 ====
+- 강의 번호: {lecture_info['number']}강
+- 강의 제목: {lecture_info['title']}
+- 강의 설명: {lecture_info['description']}
+- 주요 키워드: {', '.join(keywords)}
+===============================================
+
+위 강의의 상세 개요를 작성하세요. 이 개요를 바탕으로 여러 작성자가 섹션을 동시에 나누어 작성합니다.
+
+1. 강의 전체에서 공통으로 사용할 게임 개발 시나리오(예제 프로젝트, 클래스/변수 이름)를 먼저 정의하세요
+2. 아래 각 섹션마다 `### 섹션명` 제목 아래 다룰 내용과 코드 예제를 3-6개 항목으로 정리하세요
+{section_list}
+3. 섹션 간에 내용이 중복되지 않도록 범위를 명확히 나누세요
+
+개요만 마크다운으로 작성하세요 (본문 작성 금지):"""
+    
+    def _build_section_prompt(self, spec: Dict, lecture_info: Dict, context_text: str,
+                              outline: str, keywords: List[str], part: int = 1,
+                              parts: Optional[int] = None) -> str:
+        """섹션별 본문 프롬프트 구성 (parts > 1이면 해당 부분만)"""
+        example = self._get_template_sections().get(spec["key"]) or "(해당 섹션 예시 없음)"
+        other_sections = ", ".join(other["title"] for other in LECTURE_SECTIONS if other["key"] != spec["key"])
+        parts = parts or spec.get("parts", 1)
+        words = spec["words"] // parts
+        if parts == 1:
+            scope = f"- `## {spec['title']}` 제목으로 시작하고 이 섹션 본문만 작성하세요"
+        elif part == 1:
+            scope = (f"- `## {spec['title']}` 제목으로 시작하고, 개요의 이 섹션 항목 중 앞쪽 "
+                     f"1/{parts} 부분만 `###` 소제목으로 작성하세요 (나머지는 다른 작성자가 이어서 작성)")
+        else:
+            scope = (f"- 이 섹션의 {part}/{parts} 부분입니다. `##` 제목 없이 `###` 소제목으로 시작하고, "
+                     f"개요의 이 섹션 항목 중 {part}번째 1/{parts} 부분만 작성하세요 (앞부분과 중복 금지)")
+        
+        return f"""{self._build_differentiation_context(lecture_info)}
+
+==== 강의 개요 (모든 섹션 공통) ====
+{outline}
+===============================================
+
+==== 품질 기준 예시: 해당 섹션 (이 수준과 스타일을 유지하세요) ====
+{example}
+===============================================
+
+==== RAG 컨텍스트 (UniTask 공식 자료) ====
+{context_text}
+===============================================
+
+==== 강의 정보 ====
+- 강의 번호: {lecture_info['number']}강
+- 강의 제목: {lecture_info['title']}
+- 주요 키워드: {', '.join(keywords)}
+===============================================
+
+**작성할 섹션: {spec['title']}**
+{scope}
+- 약 {words}단어 분량, 개요의 해당 섹션 항목과 공통 시나리오를 그대로 따르세요
+- 다른 섹션({other_sections})의 내용은 작성하지 마세요
+- 코드 예제는 완전하고 실행 가능해야 하며 RAG 컨텍스트의 공식 API를 정확히 사용하세요
+- 마크다운 형식으로 작성하세요
+
+섹션을 작성해주세요:"""
+    
+    def _generate_section(self, spec: Dict, lecture_info: Dict, context_text: str,
+                          outline: str, keywords: List[str], part: int = 1) -> Dict:
+        """섹션 하나(또는 섹션의 한 부분) 생성"""
+        with self.tracer.span("lecture.section", lecture=lecture_info['number'], section=spec["key"], part=part,
+                              model=get_stage_model("section")):
+            prompt = self._build_section_prompt(spec, lecture_info, context_text, outline, keywords, part)
+            content, finish_reason = self._complete(
+                prompt, spec.get("max_tokens", GENERATION_CONFIG["section_max_tokens"]), "section"
+            )
+        return {"key": spec["key"], "title": spec["title"], "part": part, "content": content,
+                "finish_reason": finish_reason}
+    
+    def generate_lecture_sections(self, lecture_info: Dict, rag_contexts: List[Dict],
+                                  keywords: List[str]) -> List[Dict]:
+        """개요 생성 후 섹션별 동시 생성 (강의 지연 ≈ 개요 + 가장 긴 섹션)"""
+        lecture_number = lecture_info['number']
+        context_text = self._format_rag_contexts(rag_contexts)
+        
+        print("🧭 강의 개요 생성 중...")
+        with self.tracer.span("lecture.outline", lecture=lecture_number, model=get_stage_model("outline")):
+            outline = self._chat(
+                self._build_outline_prompt(lecture_info, context_text, keywords),
+                GENERATION_CONFIG["outline_max_tokens"],
+                "outline"
+            )
+        
+        jobs = self.section_jobs()
+        workers = max(1, min(GENERATION_CONFIG["section_concurrency"], len(jobs)))
+        print(f"🤖 {len(jobs)}개 섹션 동시 생성 중 (동시 {workers}개)...")
+        with self.tracer.span("lecture.sections", lecture=lecture_number, sections=len(jobs)):
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section") as executor:
+                # 작업별 컨텍스트 복사로 섹션 span이 현재 강의 span 아래에 기록되도록 함
+                futures = [
+                    executor.submit(contextvars.copy_context().run, self._generate_section,
+                                    spec, lecture_info, context_text, outline, keywords, part)
+                    for spec, part in jobs
+                ]
+                sections = [future.result() for future in futures]
+        
+        print("✅ 섹션 생성 완료")
+        return sections
+    
+    @staticmethod
+    def section_jobs() -> List[tuple]:
+        """섹션 병렬 생성 작업 목록 ((섹션 설정, 부분 번호), 긴 섹션은 parts개로 분할)"""
+        return [(spec, part) for spec in LECTURE_SECTIONS for part in range(1, spec.get("parts", 1) + 1)]
+    
+    @staticmethod
+    def _stitch_sections(sections: List[Dict]) -> str:
+        """섹션 목록을 하나의 강의 본문으로 연결"""
+        parts = []
+        for section in sections:
+            # 모델이 전체를 ```markdown 블록으로 감싼 경우 제거
+            body = unwrap_markdown_fence(section["content"]).strip()
+            if section.get("part", 1) > 1:
+                # 이어지는 부분은 앞부분의 ## 제목 아래에 붙임
+                if body.startswith("## "):
+                    body = body.split("\n", 1)[1].strip() if "\n" in body else ""
+            elif not body.startswith("## "):
+                body = f"## {section['title']}\n\n{body}"
+            parts.append(body)
+        return "\n\n".join(parts) + "\n"
+    
+    def _build_examples_prompt(self, lecture_info: Dict, context_text: str, outline: str, count: int) -> str:
+        """부족한 코드 예제 보충 프롬프트 구성"""
+        return f"""==== 현재 강의 구성 ====
+{outline}
+===============================================
+
+==== RAG 컨텍스트 (UniTask 공식 자료) ====
+{context_text}
+===============================================
+
+{lecture_info['number']}강 '{lecture_info['title']}' 강의에 코드 예제가 부족합니다.
+- `### 추가 예제` 소제목으로 시작하는 보충 내용만 작성하세요
+- 이 강의 주제에 맞는 완전하고 실행 가능한 코드 예제 {count}개를 각각 짧은 설명과 함께 작성하세요
+- 현재 강의 구성에 이미 있는 내용과 중복되지 않게 하고 RAG 컨텍스트의 공식 API를 정확히 사용하세요
+
+보충 내용을 작성해주세요:"""
+    
+    def _repair_section(self, key: str, lecture_info: Dict, context_text: str,
+                        outline: str, keywords: List[str]) -> Tuple[str, Optional[str]]:
+        """섹션 하나를 통째로 다시 생성 ((본문, finish_reason) 반환)"""
+        spec = next(spec for spec in LECTURE_SECTIONS if spec["key"] == key)
+        with self.tracer.span("lecture.repair_section", lecture=lecture_info['number'], section=key,
+                              model=get_stage_model("repair")):
+            prompt = self._build_section_prompt(spec, lecture_info, context_text, outline, keywords, parts=1)
+            max_tokens = spec.get("max_tokens", GENERATION_CONFIG["section_max_tokens"]) * spec.get("parts", 1)
+            return self._complete(prompt, max_tokens, "repair")
+    
+    def repair_lecture(self, lecture_info: Dict, content: str, rag_contexts: List[Dict],
+                       keywords: List[str], finish_reason: Optional[str] = None,
+                       truncated_sections: Optional[List[str]] = None) -> str:
+        """로컬 검증 실패 시 문제 섹션만 작은 호출로 재생성 (전체 재생성 대신)
+        
+        truncated_sections: finish_reason이 length였던 섹션 키 (섹션 병렬 생성/보완 응답)
+        """
+        lecture_number = lecture_info['number']
+        context_text = self._format_rag_contexts(rag_contexts)
+        truncated = list(truncated_sections or [])
+        
+        for round_number in range(VALIDATION_CONFIG["max_repair_rounds"] + 1):
+            with self.tracer.span("lecture.validate", lecture=lecture_number):
+                result = validate_lecture(content, finish_reason if round_number == 0 else None)
+            for key in truncated:
+                result["ok"] = False
+                result["errors"].append(f"응답 잘림: '{self._section_title(key)}' 섹션이 max_tokens에서 끊김")
+                if key not in result["repair"]:
+                    result["repair"].append(key)
+            
+            if result["ok"]:
+                print(f"✅ 강의 검증 통과 ({result['stats']['words']}단어, 코드 {result['stats']['code_blocks']}개)")
+                for message in result["warnings"]:
+                    print(f"   ⚠️  {message}")
+                return content
+            
+            print("⚠️  강의 검증 실패:")
+            for message in result["errors"]:
+                print(f"   - {message}")
+            if round_number == VALIDATION_CONFIG["max_repair_rounds"]:
+                break
+            
+            # 현재 강의의 섹션 구성과 검증 결과를 개요로 제공
+            outline = "\n".join(f"## {heading}" for heading in result["stats"]["sections"])
+            outline += "\n\n검증에서 발견된 문제:\n" + "\n".join(f"- {message}" for message in result["errors"])
+            
+            targets = list(result["repair"])
+            print(f"🔧 섹션 보완 {round_number + 1}회차: {', '.join(targets + (['추가 예제'] if result['add_examples'] else []))}")
+            with self.tracer.span("lecture.repair", lecture=lecture_number, round=round_number + 1,
+                                  sections=len(targets) + bool(result["add_examples"])):
+                with ThreadPoolExecutor(max_workers=max(1, len(targets) + 1), thread_name_prefix="repair") as executor:
+                    section_futures = {
+                        key: executor.submit(contextvars.copy_context().run, self._repair_section,
+                                             key, lecture_info, context_text, outline, keywords)
+                        for key in targets
+                    }
+                    examples_future = None
+                    if result["add_examples"]:
+                        examples_future = executor.submit(
+                            contextvars.copy_context().run, self._chat,
+                            self._build_examples_prompt(lecture_info, context_text, outline, result["add_examples"]),
+                            GENERATION_CONFIG["section_max_tokens"],
+                            "repair"
+                        )
+                    
+                    truncated = []
+                    for key, future in section_futures.items():
+                        section_content, section_finish_reason = future.result()
+                        if section_finish_reason == "length":
+                            truncated.append(key)
+                        section = self._stitch_sections([{"key": key, "title": self._section_title(key),
+                                                          "content": section_content}])
+                        content = replace_section(content, key, section)
+                    if examples_future is not None:
+                        content = append_to_section(content, "solution", examples_future.result())
+        
+        print("⚠️  보완 후에도 검증 오류가 남아 있습니다")
+        return content
+    
+    @staticmethod
+    def _section_title(key: str) -> str:
+        return next(spec["title"] for spec in LECTURE_SECTIONS if spec["key"] == key)
+    
+    def save_lecture(self, lecture_number: int, content: Union[str, List[Dict]]) -> str:
+        """생성된 강의를 파일로 저장 (섹션 목록이면 하나로 연결)"""
+        if isinstance(content, list):
+            content = self._stitch_sections(content)
         
         # 출력 디렉토리 확인/생성
         os.makedirs(self.paths["generated_dir"], exist_ok=True)
@@ -347,11 +852,17 @@ class LectureGenerator:
 
 """
         
-        # 파일 저장
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(header + content)
+        # 파일 저장 (원자적 교체: 여러 워커가 같은 강의를 써도 잘린 파일이 남지 않음)
+        with self.tracer.span("lecture.save", lecture=lecture_number):
+            write_atomic(filepath, (header + content).encode('utf-8'))
         
         print(f"💾 강의 저장 완료: {filename}")
+        
+        # 프런트엔드 강의 목록(courses.json)에서 이 강의 항목만 갱신 (실패해도 강의 저장은 유지)
+        try:
+            update_manifest(self.subject, lecture_number, self.curriculum_manager)
+        except Exception as e:
+            print(f"⚠️  강의 목록 갱신 실패: {e}")
         return filepath
     
     def generate_and_save_lecture(self, lecture_number: int) -> str:
@@ -361,11 +872,13 @@ class LectureGenerator:
         print("=" * 60)
         
         try:
-            # 강의 생성
-            content = self.generate_lecture(lecture_number)
-            
-            # 강의 저장
-            filepath = self.save_lecture(lecture_number, content)
+            with self.tracer.span("lecture", lecture=lecture_number), collect_sources() as sources:
+                # 강의 생성
+                content = self.generate_lecture(lecture_number)
+                
+                # 강의 저장 + 사용한 RAG 청크/원본 파일 기록 (--watch의 재생성 대상 판단)
+                filepath = self.save_lecture(lecture_number, content)
+                SourceIndex(self.subject).record(lecture_number, sources)
             
             print("=" * 60)
             print(f"🎉 {lecture_number}강 생성 및 저장 완료!")
@@ -380,6 +893,26 @@ class LectureGenerator:
             print("=" * 60)
             raise
 
+def apply_model_routes(routes: Optional[List[str]]):
+    """CLI의 STAGE=MODEL 지정으로 단계별 모델 라우팅 변경"""
+    for route in routes or []:
+        stage, separator, model = route.partition("=")
+        if not separator or stage not in MODEL_ROUTING or not model:
+            raise ValueError(f"잘못된 모델 라우팅 지정입니다: {route} (단계: {', '.join(MODEL_ROUTING)})")
+        MODEL_ROUTING[stage] = model
+
+def add_model_route_arguments(parser):
+    """CLI 공통 모델 라우팅 옵션 추가"""
+    parser.add_argument("--route", action="append", metavar="STAGE=MODEL",
+                        help=f"단계별 모델 지정 (단계: {', '.join(MODEL_ROUTING)}, 예: outline=gpt-4o-mini)")
+    parser.add_argument("--expand-queries", action="store_true", help="저렴한 모델로 RAG 검색 쿼리 확장")
+
+def apply_model_route_arguments(args):
+    """CLI 모델 라우팅 옵션 적용"""
+    apply_model_routes(args.route)
+    if args.expand_queries:
+        GENERATION_CONFIG["query_expansion"] = True
+
 def main():
     """테스트용 메인 함수"""
     import argparse
@@ -387,14 +920,25 @@ def main():
     parser = argparse.ArgumentParser(description="개별 강의 생성 테스트")
     parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
     parser.add_argument("--lecture", type=int, required=True, help="강의 번호 (1-12)")
+    parser.add_argument("--mode", choices=["single", "sections"],
+                        help="생성 방식: single(단일 호출) | sections(개요 후 섹션 병렬 생성) (기본: 설정값)")
+    add_model_route_arguments(parser)
+    add_tracing_arguments(parser)
     
     args = parser.parse_args()
+    apply_model_route_arguments(args)
+    configure_tracing(args, args.subject, f"lecture_{args.lecture:02d}")
     
     # 강의 생성기 초기화
-    generator = LectureGenerator(args.subject)
+    generator = LectureGenerator(args.subject, mode=args.mode)
     
     # 개별 강의 생성 및 저장
-    generator.generate_and_save_lecture(args.lecture)
+    try:
+        generator.generate_and_save_lecture(args.lecture)
+        for line in generator.tracer.format_summary():
+            print(line)
+    finally:
+        finish_tracing(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+강의 출처(의존성) 추적 모듈
+
+강의를 생성할 때 프롬프트에 들어간 RAG 청크 id와 원본 파일(file_path, source_files)을 강의별 JSON으로 기록하고
+원본 파일 → 강의 역색인을 제공해 data/ 파일이 바뀌었을 때 영향을 받는 강의만 다시 생성할 수 있도록 함
+강의별 파일로 저장하므로 여러 워커(작업 큐)가 서로 다른 강의를 동시에 기록해도 충돌하지 않음
+"""
+
+import os
+import sys
+import glob
+import json
+import argparse
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from atomic_write import write_atomic
+from config import get_subject_paths
+
+# 현재 생성 중인 강의의 출처 수집기 (섹션 병렬 생성 스레드에는 copy_context로 전달됨)
+_collector: ContextVar[Optional[Dict]] = ContextVar("lecture_sources", default=None)
+
+
+@contextmanager
+def collect_sources() -> Iterator[Dict]:
+    """블록 안에서 프롬프트에 사용된 RAG 컨텍스트의 청크 id/파일 수집"""
+    sources = {"chunks": set(), "files": set()}
+    token = _collector.set(sources)
+    try:
+        yield sources
+    finally:
+        _collector.reset(token)
+
+
+def record_contexts(contexts: Iterable[Dict]):
+    """프롬프트에 들어간 컨텍스트 기록 (수집 중이 아니면 무시)"""
+    sources = _collector.get()
+    if sources is None:
+        return
+    for ctx in contexts:
+        if ctx.get("chunk_id"):
+            sources["chunks"].add(ctx["chunk_id"])
+        sources["files"].add(ctx["file_path"])
+        # 근중복 제거로 합쳐진 청크는 대표하는 모든 파일에 의존
+        sources["files"].update(ctx.get("source_files", []))
+
+
+class SourceIndex:
+    """강의별 출처 기록 + 원본 파일 → 강의 역색인 클래스"""
+
+    def __init__(self, subject: str):
+        self.subject = subject
+        self.sources_dir = get_subject_paths(subject)["sources_dir"]
+
+    def _path(self, lecture_number: int) -> str:
+        return os.path.join(self.sources_dir, f"lecture_{lecture_number:02d}.json")
+
+    def record(self, lecture_number: int, sources: Dict) -> str:
+        """강의 생성에 사용된 출처 저장 (재생성 시 덮어씀)"""
+        os.makedirs(self.sources_dir, exist_ok=True)
+        entry = {
+            "lecture": lecture_number,
+            "files": sorted(sources["files"]),
+            "chunks": sorted(sources["chunks"]),
+            "generated_at": datetime.now().isoformat(timespec="seconds")
+        }
+        path = self._path(lecture_number)
+        write_atomic(path, json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8"))
+        return path
+
+    def load(self) -> Dict[int, Dict]:
+        """강의 번호 → 출처 기록"""
+        entries = {}
+        for path in sorted(glob.glob(os.path.join(self.sources_dir, "lecture_*.json"))):
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    entry = json.load(f)
+                entries[entry["lecture"]] = entry
+            except (OSError, ValueError, KeyError) as e:
+                print(f"⚠️  출처 기록을 읽지 못했습니다: {os.path.basename(path)} - {e}")
+        return entries
+
+    def reverse_index(self) -> Dict[str, List[int]]:
+        """원본 파일(data/ 기준 상대 경로) → 그 파일을 사용한 강의 번호 목록"""
+        index: Dict[str, List[int]] = {}
+        for lecture_number, entry in sorted(self.load().items()):
+            for file_path in entry["files"]:
+                index.setdefault(file_path, []).append(lecture_number)
+        return index
+
+    def lectures_for_files(self, file_paths: Iterable[str]) -> List[int]:
+        """파일 중 하나라도 사용한 강의 번호 (오름차순)"""
+        index = self.reverse_index()
+        return sorted({number for file_path in file_paths for number in index.get(file_path, [])})
+
+    def untracked_lectures(self, lecture_numbers: Iterable[int]) -> List[int]:
+        """출처 기록이 없는 강의 (이 기능 이전에 생성됨)"""
+        tracked = self.load()
+        return [number for number in lecture_numbers if number not in tracked]
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="강의 출처(원본 파일 → 강의) 조회")
+    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    parser.add_argument("files", nargs="*", help="영향받는 강의를 조회할 파일 (data/ 기준 상대 경로, 생략 시 전체 역색인)")
+
+    args = parser.parse_args()
+
+    index = SourceIndex(args.subject)
+    if args.files:
+        lectures = index.lectures_for_files(args.files)
+        print(f"🎯 영향받는 강의: {', '.join(f'{number}강' for number in lectures) if lectures else '없음'}")
+        sys.exit(0)
+
+    reverse = index.reverse_index()
+    if not reverse:
+        print("📭 출처 기록이 없습니다 (강의를 생성하면 기록됩니다)")
+        return
+    for file_path, lectures in sorted(reverse.items(), key=lambda item: (-len(item[1]), item[0])):
+        print(f"   {file_path}: {', '.join(str(number) for number in lectures)}강")
+    print(f"📊 {len(reverse)}개 파일 → {len(index.load())}개 강의")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+강의 로컬 검증 모듈
+
+생성된 강의 마크다운을 파싱하여 필수 섹션, 분량, 코드 예제 수, 잘림 여부를 검사
+API 호출 없이 수 밀리초 안에 실행되며, 실패 항목은 섹션 단위 재생성 대상으로 반환
+"""
+
+import os
+import sys
+import glob
+import argparse
+from typing import Dict, List, Optional
+
+from config import LECTURE_SECTIONS, VALIDATION_CONFIG, get_subject_paths
+
+SECTION_KEYS = [spec["key"] for spec in LECTURE_SECTIONS]
+
+
+def match_section_key(heading: str) -> Optional[str]:
+    """## 제목에 해당하는 섹션 키 (해당 없으면 None)"""
+    for spec in LECTURE_SECTIONS:
+        if (any(word in heading for word in spec["match"])
+                and not any(word in heading for word in spec.get("exclude", []))):
+            return spec["key"]
+    return None
+
+
+def unwrap_markdown_fence(markdown: str) -> str:
+    """응답 전체를 감싼 ```markdown 코드 블록 제거 (렌더링 시 본문이 코드로 보이는 문제)"""
+    lines = markdown.splitlines()
+    # 저장된 파일은 헤더 뒤에 감싸진 본문이 오므로 첫 ``` 줄 기준으로 판단
+    opening = next((i for i, line in enumerate(lines) if line.lstrip().startswith("```")), None)
+    if opening is None or lines[opening].strip().lower() not in ("```markdown", "```md"):
+        return markdown
+
+    closing = max((i for i, line in enumerate(lines) if line.strip()), default=opening)
+    if closing > opening and lines[closing].strip() == "```":
+        del lines[closing]
+    del lines[opening]
+    return "\n".join(lines) + ("\n" if markdown.endswith("\n") else "")
+
+
+def parse_sections(markdown: str) -> List[Dict]:
+    """## 제목 기준 블록 분할 (코드 블록 내부의 ##는 무시)
+
+    블록: {"key": 섹션 키 | "preamble" | None(본문 섹션), "heading": 제목, "text": 블록 전체,
+           "words": 코드 포함 단어 수, "code_blocks": 닫힌 코드 블록 수, "subsections": ### 개수}
+    """
+    blocks = [{"key": "preamble", "heading": "", "lines": [], "words": 0, "code_blocks": 0, "subsections": 0}]
+    in_code = False
+    unclosed_block = None
+
+    for line in markdown.splitlines():
+        stripped = line.lstrip()
+        if stripped.startswith("```"):
+            block = blocks[-1]
+            block["lines"].append(line)
+            block["words"] += len(stripped[3:].split())
+            if in_code:
+                block["code_blocks"] += 1
+                unclosed_block = None
+            else:
+                unclosed_block = block
+            in_code = not in_code
+            continue
+
+        if not in_code and line.startswith("## "):
+            heading = line[3:].strip()
+            blocks.append({"key": match_section_key(heading), "heading": heading, "lines": [line],
+                           "words": 0, "code_blocks": 0, "subsections": 0})
+            continue
+
+        block = blocks[-1]
+        block["lines"].append(line)
+        block["words"] += len(line.split())
+        if not in_code and line.startswith("### "):
+            block["subsections"] += 1
+
+    for block in blocks:
+        block["text"] = "\n".join(block.pop("lines"))
+        block["unclosed_code"] = block is unclosed_block
+    return blocks
+
+
+def validate_lecture(markdown: str, finish_reason: Optional[str] = None) -> Dict:
+    """강의 마크다운 검증
+
+    반환: {"ok": 오류 없음 여부, "errors": [...], "warnings": [...],
+           "repair": 재생성할 섹션 키 목록, "add_examples": 부족한 코드 예제 수, "stats": {...}}
+    """
+    if unwrap_markdown_fence(markdown) != markdown:
+        return {
+            "ok": False,
+            "errors": ["응답 전체가 ```markdown 코드 블록으로 감싸져 있음 (--fix로 API 호출 없이 수정 가능)"],
+            "warnings": [],
+            "repair": [],
+            "add_examples": 0,
+            "stats": {"words": len(markdown.split()), "code_blocks": 0, "practice_tasks": 0, "sections": []}
+        }
+
+    blocks = parse_sections(markdown)
+    errors: List[str] = []
+    warnings: List[str] = []
+    repair: List[str] = []
+
+    def mark(key: str, message: str):
+        errors.append(message)
+        if key not in repair:
+            repair.append(key)
+
+    by_key: Dict[str, List[Dict]] = {}
+    for block in blocks:
+        key = block["key"]
+        # 필수 섹션 외의 본문 섹션은 단계별 해결 과정의 일부로 간주
+        by_key.setdefault(key if key is not None else "solution", []).append(block)
+
+    # 1. 필수 섹션 존재 / 최소 분량
+    for spec in LECTURE_SECTIONS:
+        section_blocks = by_key.get(spec["key"])
+        if not section_blocks:
+            mark(spec["key"], f"필수 섹션 누락: {spec['title']}")
+            continue
+        words = sum(block["words"] for block in section_blocks)
+        if words < VALIDATION_CONFIG["min_section_words"]:
+            mark(spec["key"], f"섹션 내용 부족: {spec['title']} ({words}단어)")
+
+    # 2. 잘림: 닫히지 않은 코드 블록 또는 max_tokens 도달
+    truncated_block = next((block for block in blocks if block["unclosed_code"]), None)
+    if truncated_block is None and finish_reason == "length":
+        truncated_block = blocks[-1]
+    if truncated_block is not None:
+        key = truncated_block["key"] if truncated_block["key"] not in (None, "preamble") else "solution"
+        mark(key, f"응답 잘림: '{truncated_block['heading'] or '도입부'}' 섹션에서 끊김")
+
+    # 3. 실습 과제 개수
+    practice_tasks = sum(block["subsections"] for block in by_key.get("practice", []))
+    if by_key.get("practice") and practice_tasks < VALIDATION_CONFIG["min_practice_tasks"]:
+        mark("practice", f"실습 과제 부족: {practice_tasks}개 (최소 {VALIDATION_CONFIG['min_practice_tasks']}개)")
+
+    # 4. 코드 예제 수 (부족분은 해결 과정에 예제 추가로 보완)
+    code_blocks = sum(block["code_blocks"] for block in blocks)
+    add_examples = 0
+    if code_blocks < VALIDATION_CONFIG["min_code_blocks"] and "solution" not in repair:
+        add_examples = VALIDATION_CONFIG["min_code_blocks"] - code_blocks
+        errors.append(f"코드 예제 부족: {code_blocks}개 (최소 {VALIDATION_CONFIG['min_code_blocks']}개)")
+
+    # 5. 전체 분량 (경고만: 전체 재작성 비용이 크므로 섹션 보완 대상 아님)
+    total_words = sum(block["words"] for block in blocks)
+    if total_words < VALIDATION_CONFIG["min_words"]:
+        warnings.append(f"분량 부족: {total_words}단어 (권장 {VALIDATION_CONFIG['min_words']}단어 이상)")
+
+    return {
+        "ok": not errors,
+        "errors": errors,
+        "warnings": warnings,
+        "repair": sorted(repair, key=SECTION_KEYS.index),
+        "add_examples": add_examples,
+        "stats": {
+            "words": total_words,
+            "code_blocks": code_blocks,
+            "practice_tasks": practice_tasks,
+            "sections": [block["heading"] for block in blocks if block["key"] != "preamble"]
+        }
+    }
+
+
+def replace_section(markdown: str, key: str, section_text: str) -> str:
+    """섹션 키에 해당하는 블록을 교체 (없으면 섹션 순서에 맞는 위치에 삽입)"""
+    blocks = parse_sections(markdown)
+    section_text = section_text.strip()
+    order = SECTION_KEYS.index(key)
+
+    result = []
+    inserted = False
+    for block in blocks:
+        # 필수 섹션 외의 본문 섹션은 단계별 해결 과정과 함께 교체
+        block_key = block["key"] if block["key"] is not None else "solution"
+        if block_key == key:
+            if not inserted:
+                result.append(section_text)
+                inserted = True
+            continue  # 같은 키의 나머지 블록은 새 섹션으로 대체
+        if (not inserted and block_key in SECTION_KEYS
+                and SECTION_KEYS.index(block_key) > order):
+            result.append(section_text)
+            inserted = True
+        result.append(block["text"].strip())
+    if not inserted:
+        result.append(section_text)
+
+    return "\n\n".join(part for part in result if part) + "\n"
+
+
+def append_to_section(markdown: str, key: str, extra_text: str) -> str:
+    """섹션 키(본문 섹션 포함)의 마지막 블록 뒤에 내용 추가"""
+    blocks = parse_sections(markdown)
+    targets = [i for i, block in enumerate(blocks)
+               if block["key"] == key or (key == "solution" and block["key"] is None)]
+    position = targets[-1] if targets else len(blocks) - 1
+
+    parts = [block["text"].strip() for block in blocks]
+    parts[position] = parts[position] + "\n\n" + extra_text.strip()
+    return "\n\n".join(part for part in parts if part) + "\n"
+
+
+def validate_lecture_file(filepath: str) -> Dict:
+    """저장된 강의 파일 검증"""
+    with open(filepath, 'r', encoding='utf-8') as f:
+        return validate_lecture(f.read())
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="생성된 강의 로컬 검증 (API 호출 없음)")
+    parser.add_argument("files", nargs="*", help="검증할 강의 파일")
+    parser.add_argument("--subject", help="주제명 (지정 시 generated/courses/의 모든 강의 검증)")
+    parser.add_argument("--fix", action="store_true", help="API 호출 없이 고칠 수 있는 문제(감싼 코드 블록) 수정 후 저장")
+
+    args = parser.parse_args()
+
+    files = list(args.files)
+    if args.subject:
+        files += sorted(glob.glob(os.path.join(get_subject_paths(args.subject)["generated_dir"], "*.md")))
+    if not args.files and not args.subject:
+        parser.error("검증할 파일 또는 --subject를 지정하세요")
+    if not files:
+        print("📭 검증할 강의 파일이 없습니다")
+        return
+
+    failed = 0
+    for filepath in files:
+        if args.fix:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                original = f.read()
+            fixed = unwrap_markdown_fence(original)
+            if fixed != original:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(fixed)
+                print(f"🔧 {os.path.basename(filepath)}: 감싼 코드 블록 제거")
+        result = validate_lecture_file(filepath)
+        stats = result["stats"]
+        status = "✅" if result["ok"] else "❌"
+        print(f"{status} {os.path.basename(filepath)}: {stats['words']}단어, 코드 {stats['code_blocks']}개, "
+              f"실습 {stats['practice_tasks']}개")
+        for message in result["errors"]:
+            print(f"   - {message}")
+        for message in result["warnings"]:
+            print(f"   ⚠️  {message}")
+        if not result["ok"]:
+            failed += 1
+
+    print(f"📊 검증 완료: {len(files) - failed}/{len(files)}개 통과")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
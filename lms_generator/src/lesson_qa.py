@@ -0,0 +1,150 @@
+"""
+강의 질의응답 모듈
+
+강의 화면의 채팅 질문에 대해 LectureGenerator의 RAG 검색 경로(임베딩 single-flight, 검색 캐시, 공유 클라이언트)를
+재사용해 컨텍스트를 찾고 답변을 스트리밍
+- 주제 필터로 검색하고 현재 강의의 주요 API/키워드를 언급하는 청크의 점수를 올려 재정렬
+- 토큰 예산 안에서 컨텍스트를 채운 뒤 경량 모델로 답변 토큰을 즉시 전달
+- 이벤트 형식은 프런트엔드 chatApi.streamMessage의 SSE 형식과 동일 (token / done / error)
+"""
+
+import time
+from typing import Dict, Iterator, List, Optional
+
+from config import QA_CONFIG, get_stage_model
+from lecture_generator import LectureGenerator
+from single_flight import get_single_flight
+from token_counter import get_token_counter
+from tracing import get_tracer
+
+
+class LessonQA:
+    """강의 질의응답 검색/답변 클래스"""
+
+    def __init__(self, generator: LectureGenerator):
+        self.generator = generator
+        self.tracer = get_tracer()
+        self.counter = get_token_counter()
+
+    def _lecture_terms(self, lecture_info: Optional[Dict]) -> List[str]:
+        """현재 강의 가중치 대상 용어 (주요 API + 핵심 키워드)"""
+        if not lecture_info:
+            return []
+        terms = lecture_info.get('main_apis', []) + self.generator.get_focus_keywords(lecture_info)
+        return sorted({term.lower() for term in terms if len(term) >= 3})
+
+    def retrieve(self, question: str, lecture_number: Optional[int] = None) -> Dict:
+        """주제 필터 검색 → 현재 강의 가중치 재정렬 → 토큰 예산만큼 컨텍스트 선택"""
+        started = time.perf_counter()
+        generator = self.generator
+        candidates = QA_CONFIG["candidates"]
+        lecture_info = generator.curriculum_manager.get_lecture_info(lecture_number) if lecture_number else None
+
+        with self.tracer.span("qa.retrieve", lecture=lecture_number):
+            contexts = get_single_flight("rag.search").do(
+                (generator.collection_name, question, candidates),
+                lambda: generator._search_contexts(question, candidates, subject_only=True)
+            )
+
+            # 캐시된 목록을 공유하므로 복사본에 점수 반영
+            terms = self._lecture_terms(lecture_info)
+            ranked = []
+            for ctx in contexts:
+                text = ctx["text"].lower()
+                boosted = bool(terms) and any(term in text for term in terms)
+                ranked.append({**ctx, "score": ctx["score"] + (QA_CONFIG["lecture_boost"] if boosted else 0.0),
+                               "lecture_match": boosted})
+            ranked.sort(key=lambda ctx: ctx["score"], reverse=True)
+
+            # 토큰 예산 채우기 (넘치는 청크는 건너뛰고, 첫 청크가 예산보다 크면 잘라서 사용)
+            model = get_stage_model("qa")
+            budget = QA_CONFIG["context_token_budget"]
+            selected, used = [], 0
+            for ctx in ranked:
+                tokens = self.counter.count(ctx["text"], model)
+                if used + tokens > budget:
+                    if selected:
+                        continue
+                    ctx = {**ctx, "text": ctx["text"][:len(ctx["text"]) * budget // tokens]}
+                    tokens = budget
+                selected.append(ctx)
+                used += tokens
+
+        return {
+            "contexts": selected,
+            "context_tokens": used,
+            "candidates": len(contexts),
+            "lecture": lecture_info,
+            "retrieval_ms": round((time.perf_counter() - started) * 1000, 1)
+        }
+
+    def build_messages(self, question: str, retrieval: Dict, history: Optional[List[Dict]] = None) -> List[Dict]:
+        """답변 프롬프트 (시스템 지침 + 최근 대화 + 컨텍스트를 포함한 질문)"""
+        subject_name = self.generator.curriculum_manager.get_subject_info().get("name", self.generator.subject)
+        lecture_info = retrieval["lecture"]
+        context_text = self.generator._format_rag_contexts(retrieval["contexts"])
+        lecture_line = f"- 현재 강의: {lecture_info['number']}강 {lecture_info['title']}\n" if lecture_info else ""
+
+        messages = [{
+            "role": "system",
+            "content": (f"당신은 {subject_name} 강의의 질의응답 도우미입니다. 참고 자료를 근거로 한국어로 간결하게 답하고, "
+                        "필요하면 짧은 코드 예제를 포함하세요. 자료로 답할 수 없는 내용은 추측하지 말고 모른다고 답하세요.")
+        }]
+        for message in (history or [])[-QA_CONFIG["history_turns"] * 2:]:
+            if message.get("role") in ("user", "assistant") and message.get("content"):
+                messages.append({"role": message["role"], "content": message["content"]})
+        messages.append({
+            "role": "user",
+            "content": f"""{lecture_line}
+==== 참고 자료 ====
+{context_text}
+==================
+
+질문: {question}"""
+        })
+        return messages
+
+    def _stream_contents(self, stream, model: str) -> Iterator[str]:
+        for chunk in stream:
+            if getattr(chunk, "usage", None):
+                self.tracer.record_response_usage(model, chunk.usage, stage="qa.completion")
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+    def stream_answer(self, question: str, lecture_number: Optional[int] = None,
+                      history: Optional[List[Dict]] = None) -> Iterator[Dict]:
+        """답변 이벤트 스트림: {"type": "token"} ... {"type": "done"} 또는 {"type": "error"}"""
+        started = time.perf_counter()
+        model = get_stage_model("qa")
+        try:
+            # 질문 수신 → 첫 토큰까지 (검색 + 모델 첫 토큰)
+            with self.tracer.span("qa.first_token", lecture=lecture_number):
+                retrieval = self.retrieve(question, lecture_number)
+                stream = self.generator.openai_client.chat.completions.create(
+                    model=model,
+                    messages=self.build_messages(question, retrieval, history),
+                    temperature=QA_CONFIG["temperature"],
+                    max_tokens=QA_CONFIG["max_tokens"],
+                    stream=True,
+                    stream_options={"include_usage": True}
+                )
+                contents = self._stream_contents(stream, model)
+                first = next(contents, None)
+            first_token_ms = round((time.perf_counter() - started) * 1000, 1)
+
+            if first is not None:
+                yield {"type": "token", "content": first}
+            for content in contents:
+                yield {"type": "token", "content": content}
+
+            sources = list(dict.fromkeys(ctx["file_path"] for ctx in retrieval["contexts"]))
+            yield {
+                "type": "done",
+                "sources": sources,
+                "retrieval_ms": retrieval["retrieval_ms"],
+                "first_token_ms": first_token_ms,
+                "context_tokens": retrieval["context_tokens"]
+            }
+        except Exception as e:
+            print(f"❌ 질의응답 실패: {e}")
+            yield {"type": "error", "detail": "답변을 생성하지 못했습니다. 잠시 후 다시 시도해주세요."}
@@ -12,22 +12,83 @@ import sys
 from datetime import datetime
 from typing import List, Dict, Optional
 
-from config import ensure_subject_directories, validate_config
+from config import ensure_subject_directories, validate_config, apply_rate_limit_overrides
+from course_bundle import export_bundle, find_lecture_file
 from curriculum_manager import CurriculumManager
-from lecture_generator import LectureGenerator
+from lecture_generator import LectureGenerator, add_model_route_arguments, apply_model_route_arguments
+from lecture_validator import validate_lecture_file
+from tracing import get_tracer, add_tracing_arguments, configure_tracing, finish_tracing
 
 class LMSBatchGenerator:
     """LMS 강의 시리즈 배치 생성 클래스"""
     
-    def __init__(self, subject: str):
+    def __init__(self, subject: str, mode: Optional[str] = None):
         self.subject = subject
+        self.mode = mode
         self.curriculum_manager = CurriculumManager(subject)
-        self.lecture_generator = LectureGenerator(subject)
+        self._lecture_generator = None
         
         # 배치 설정
         self.rate_limit_delay = 10  # API 호출 사이 대기시간 (초)
         self.max_retries = 3       # 실패 시 최대 재시도 횟수
         
+        # 단계별 추적
+        self.tracer = get_tracer()
+        
+    @property
+    def lecture_generator(self) -> LectureGenerator:
+        """강의 생성기 (생성 작업 시에만 초기화, 커리큘럼 매니저 공유)"""
+        if self._lecture_generator is None:
+            self._lecture_generator = LectureGenerator(
+                self.subject,
+                curriculum_manager=self.curriculum_manager,
+                mode=self.mode
+            )
+        return self._lecture_generator
+    
+    @lecture_generator.setter
+    def lecture_generator(self, generator: LectureGenerator):
+        self._lecture_generator = generator
+    
+    def validate_curriculum_only(self) -> bool:
+        """커리큘럼만 검증 (API 키/클라이언트 불필요)"""
+        issues = self.curriculum_manager.validate_curriculum()
+        if issues:
+            print("❌ 커리큘럼 검증 실패:")
+            for issue in issues:
+                print(f"   - {issue}")
+            return False
+        
+        print(f"✅ 커리큘럼 검증 완료: {self.curriculum_manager.get_total_lectures()}개 강의")
+        return True
+    
+    def find_existing_lecture(self, lecture_info: Dict) -> Optional[str]:
+        """강의별 기존 생성 파일 경로 (건너뛰기 판단 기준, 없으면 None)
+        
+        저장 파일명(lecture_NN_<제목>.md)과 커리큘럼 filename 모두 확인
+        """
+        return find_lecture_file(self.curriculum_manager.paths["generated_dir"], lecture_info)
+    
+    def print_status(self, start_lecture: int = 1, end_lecture: Optional[int] = None):
+        """강의별 생성 현황 출력"""
+        if end_lecture is None:
+            end_lecture = self.curriculum_manager.get_total_lectures()
+        
+        print(f"📋 {self.subject.upper()} 생성 현황")
+        done = 0
+        for lecture_info in self.curriculum_manager.iter_lectures(start_lecture, end_lecture):
+            filepath = self.find_existing_lecture(lecture_info)
+            if filepath is not None:
+                done += 1
+                validation = validate_lecture_file(filepath)
+                mark = "✅" if validation["ok"] else "⚠️ "
+                issues = f" - {'; '.join(validation['errors'])}" if validation["errors"] else ""
+                print(f"   {mark} {lecture_info['number']:>3}강 {lecture_info['title']} "
+                      f"({os.path.getsize(filepath):,} bytes){issues}")
+            else:
+                print(f"   ⬜ {lecture_info['number']:>3}강 {lecture_info['title']}")
+        print(f"📊 생성 완료: {done}개")
+    
     def validate_prerequisites(self) -> bool:
         """생성 전 필수 조건 검증"""
         print("🔍 시스템 요구사항 검증 중...")
@@ -56,21 +117,96 @@ class LMSBatchGenerator:
     
     def get_generation_plan(self, start_lecture: int = 1, end_lecture: Optional[int] = None) -> List[Dict]:
         """생성 계획 수립"""
-        all_lectures = self.curriculum_manager.get_lecture_series()
-        
         if end_lecture is None:
-            end_lecture = len(all_lectures)
+            end_lecture = self.curriculum_manager.get_total_lectures()
         
-        # 생성할 강의 필터링
-        target_lectures = [
-            lec for lec in all_lectures 
-            if start_lecture <= lec['number'] <= end_lecture
-        ]
+        # 생성할 강의 필터링 (대형 커리큘럼은 범위 안의 강의만 읽음)
+        target_lectures = list(self.curriculum_manager.iter_lectures(start_lecture, end_lecture))
         
         print(f"📋 생성 계획: {len(target_lectures)}개 강의 ({start_lecture}강~{end_lecture}강)")
         
         return target_lectures
     
+    def plan_lecture_series(self, start_lecture: int = 1, end_lecture: Optional[int] = None,
+                            skip_existing: bool = True) -> Dict:
+        """API 호출 없이 토큰/비용/소요 시간 예측 (--plan)"""
+        from batch_planner import BatchPlanner, print_plan
+        
+        target_lectures = [
+            lec for lec in self.get_generation_plan(start_lecture, end_lecture)
+            if not (skip_existing and self.find_existing_lecture(lec))
+        ]
+        planner = BatchPlanner(self.lecture_generator, rate_limit_delay=self.rate_limit_delay)
+        plan = planner.plan(target_lectures)
+        print_plan(planner, plan)
+        return plan
+    
+    def watch_sources(self, interval: float = 5.0, once: bool = False):
+        """data/ 변경 감시: 바뀐 파일만 재색인하고 그 파일을 사용한 강의만 재생성 (--watch)"""
+        from vector_builder import VectorBuilder
+        from lecture_sources import SourceIndex
+        
+        builder = VectorBuilder(self.subject)
+        builder.openai_client = self.lecture_generator.openai_client
+        builder.qdrant_client = self.lecture_generator.qdrant_client
+        index = SourceIndex(self.subject)
+        
+        if builder.load_file_state() is None:
+            # 이 기능 이전에 구축된 컬렉션: 현재 파일을 기준으로 삼고 이후 변경부터 감지
+            builder.save_file_state()
+            print("📌 색인 상태 기록이 없어 현재 data/ 파일을 기준으로 기록했습니다")
+        generated = [lec['number'] for lec in self.curriculum_manager.iter_lectures()
+                     if self.find_existing_lecture(lec)]
+        untracked = index.untracked_lectures(generated)
+        if untracked:
+            print(f"⚠️  출처 기록이 없는 강의 {len(untracked)}개는 변경 감지에서 제외됩니다 "
+                  f"(한 번 재생성하면 기록됨): {untracked}")
+        
+        print(f"👀 {builder.data_path} 감시 중 ({interval:g}초 간격, Ctrl+C 종료)")
+        while True:
+            changed, removed, state = builder.scan_changes()
+            if changed or removed:
+                print(f"\n📝 변경 감지: 수정/추가 {len(changed)}개, 삭제 {len(removed)}개")
+                for path in changed[:10] + removed[:10]:
+                    print(f"   - {path}")
+                with self.tracer.span("watch.reindex", files=len(changed) + len(removed)):
+                    builder.reindex_files(changed, removed, state)
+                
+                affected = index.lectures_for_files(changed + removed)
+                if affected:
+                    print(f"🎯 영향받는 강의 {len(affected)}개: {affected}")
+                else:
+                    print("✅ 영향받는 강의 없음 (재색인만 수행)")
+                for i, lecture_number in enumerate(affected):
+                    if i:
+                        time.sleep(self.rate_limit_delay)
+                    with self.tracer.span("batch.lecture", lecture=lecture_number):
+                        self.generate_single_lecture(lecture_number)
+            if once:
+                return
+            time.sleep(interval)
+    
+    def enqueue_lecture_series(self, start_lecture: int = 1, end_lecture: Optional[int] = None,
+                               skip_existing: bool = True, job_db: Optional[str] = None) -> List[Dict]:
+        """강의별 작업을 공유 작업 큐에 제출 (--enqueue, 처리는 generation_service 워커가 담당)"""
+        from job_queue import JobQueue
+        
+        target_lectures = [
+            lec for lec in self.get_generation_plan(start_lecture, end_lecture)
+            if not (skip_existing and self.find_existing_lecture(lec))
+        ]
+        queue = JobQueue(job_db)
+        try:
+            jobs = [
+                queue.submit("lecture", self.subject, {"lecture": lec['number'], "mode": self.mode},
+                             dedupe_key=f"lecture:{self.subject}:{lec['number']}")
+                for lec in target_lectures
+            ]
+            print(f"📬 작업 {len(jobs)}개 제출: {queue.db_path} (대기 중인 전체 작업 {queue.counts()['queued']}개)")
+        finally:
+            queue.close()
+        return jobs
+    
     def generate_single_lecture(self, lecture_number: int, retry_count: int = 0) -> bool:
         """개별 강의 생성 (재시도 로직 포함)"""
         try:
@@ -79,12 +215,15 @@ class LMSBatchGenerator:
             # 강의 생성
             filepath = self.lecture_generator.generate_and_save_lecture(lecture_number)
             
-            # 생성 결과 검증
-            if os.path.exists(filepath) and os.path.getsize(filepath) > 1000:  # 1KB 이상
-                print(f"✅ {lecture_number}강 생성 성공: {os.path.basename(filepath)}")
-                return True
-            else:
-                raise Exception(f"생성된 파일이 비어있거나 너무 작습니다: {filepath}")
+            # 생성 결과 검증 (섹션 보완은 생성 중에 끝났으므로 남은 오류는 경고로 보고하고 강의 유지)
+            if not os.path.exists(filepath):
+                raise Exception(f"생성된 파일이 없습니다: {filepath}")
+            validation = validate_lecture_file(filepath)
+            if not validation["ok"]:
+                print(f"⚠️  {lecture_number}강 섹션 보완 후에도 검증 오류가 남아 있습니다 (강의 유지, "
+                      f"--status로 확인): {'; '.join(validation['errors'])}")
+            print(f"✅ {lecture_number}강 생성 성공: {os.path.basename(filepath)}")
+            return True
                 
         except Exception as e:
             print(f"❌ {lecture_number}강 생성 실패 (시도 {retry_count + 1}): {e}")
@@ -92,7 +231,8 @@ class LMSBatchGenerator:
             if retry_count < self.max_retries - 1:
                 wait_time = (retry_count + 1) * 5  # 재시도마다 대기시간 증가
                 print(f"⏱️  {wait_time}초 후 재시도...")
-                time.sleep(wait_time)
+                with self.tracer.span("batch.retry_wait", lecture=lecture_number):
+                    time.sleep(wait_time)
                 return self.generate_single_lecture(lecture_number, retry_count + 1)
             else:
                 print(f"💥 {lecture_number}강 생성 최종 실패 (최대 재시도 횟수 초과)")
@@ -129,19 +269,16 @@ class LMSBatchGenerator:
             print(f"\n{progress} 📝 {lecture_number}강: {lecture_info['title']}")
             
             # 기존 파일 존재 여부 확인
-            expected_filename = lecture_info.get('filename', f"lecture_{lecture_number:02d}.md")
-            filepath = os.path.join(
-                self.curriculum_manager.paths["generated_dir"], 
-                expected_filename.replace('.md', '') + '.md'
-            )
+            filepath = self.find_existing_lecture(lecture_info)
             
-            if skip_existing and os.path.exists(filepath):
+            if skip_existing and filepath is not None:
                 print(f"⏭️  기존 파일 존재, 건너뜀: {os.path.basename(filepath)}")
                 results["skipped"].append(lecture_number)
                 continue
             
             # 강의 생성
-            success = self.generate_single_lecture(lecture_number)
+            with self.tracer.span("batch.lecture", lecture=lecture_number):
+                success = self.generate_single_lecture(lecture_number)
             
             if success:
                 results["success"].append(lecture_number)
@@ -158,7 +295,8 @@ class LMSBatchGenerator:
             # Rate Limit 대기 (마지막 강의가 아닌 경우)
             if i < len(target_lectures):
                 print(f"⏱️  API Rate Limit 대기: {self.rate_limit_delay}초...")
-                time.sleep(self.rate_limit_delay)
+                with self.tracer.span("batch.rate_limit_wait"):
+                    time.sleep(self.rate_limit_delay)
         
         # 최종 결과 리포트
         self.print_final_report(results, target_lectures)
@@ -186,6 +324,15 @@ class LMSBatchGenerator:
             success_rate = (success_count / (total - skipped_count)) * 100
             print(f"🎯 성공률: {success_rate:.1f}%")
         
+        # 단계별 소요 시간 및 토큰/비용 요약
+        if self.tracer.stage_stats:
+            totals = self.tracer.usage_totals()
+            print("-" * 70)
+            print(f"🧮 토큰: 입력 {totals['prompt_tokens']:,} / 출력 {totals['completion_tokens']:,} "
+                  f"(API 호출 {totals['calls']}회, 예상 비용 ${totals['cost_usd']:.4f})")
+            for line in self.tracer.format_summary():
+                print(f"   {line}")
+        
         # 권장사항
         if failed_count > 0:
             print(f"\n💡 실패한 강의들은 개별적으로 재생성해보세요:")
@@ -202,14 +349,61 @@ def main():
     parser.add_argument("--end", type=int, help="마지막 강의 번호 (기본: 전체)")
     parser.add_argument("--overwrite", action="store_true", help="기존 파일 덮어쓰기 (기본: 건너뜀)")
     parser.add_argument("--delay", type=int, default=10, help="API 호출 사이 대기시간(초) (기본: 10)")
+    parser.add_argument("--mode", choices=["single", "sections"],
+                        help="생성 방식: single(단일 호출) | sections(개요 후 섹션 병렬 생성) (기본: 설정값)")
+    parser.add_argument("--validate", action="store_true", help="커리큘럼만 검증하고 종료")
+    parser.add_argument("--status", action="store_true", help="강의별 생성 현황만 출력하고 종료")
+    parser.add_argument("--plan", action="store_true",
+                        help="API 호출 없이 강의별 토큰/비용/소요 시간 예측 후 종료")
+    parser.add_argument("--rate-limits", metavar="MODEL=RPM:TPM,...",
+                        help="예측에 사용할 모델별 API 한도 (기본: OPENAI_RATE_LIMITS 또는 설정값)")
+    parser.add_argument("--watch", action="store_true",
+                        help="data/ 변경을 감시해 바뀐 파일만 재색인하고 영향받는 강의만 재생성")
+    parser.add_argument("--watch-interval", type=float, default=5.0, help="--watch 확인 간격(초) (기본: 5)")
+    parser.add_argument("--once", action="store_true", help="--watch에서 변경을 한 번만 확인하고 종료 (cron용)")
+    parser.add_argument("--enqueue", action="store_true",
+                        help="직접 생성하지 않고 공유 작업 큐에 강의별 작업 제출 후 종료")
+    parser.add_argument("--job-db", help="--enqueue에 사용할 작업 큐 SQLite 파일 (기본: LMS_JOB_DB 또는 설정값)")
+    parser.add_argument("--export-bundle", action="store_true",
+                        help="생성 후 프런트엔드용 HTML 번들(미리 렌더링 + .gz/.br) 내보내기")
+    add_model_route_arguments(parser)
+    add_tracing_arguments(parser)
     
     args = parser.parse_args()
     
+    # 가벼운 명령: SDK 로드/API 호출 없이 처리
+    if args.validate or args.status:
+        generator = LMSBatchGenerator(args.subject)
+        ok = generator.validate_curriculum_only()
+        if ok and args.status:
+            generator.print_status(args.start, args.end)
+        sys.exit(0 if ok else 1)
+    
+    apply_model_route_arguments(args)
+    
+    if args.enqueue:
+        generator = LMSBatchGenerator(args.subject, mode=args.mode)
+        generator.enqueue_lecture_series(args.start, args.end, skip_existing=not args.overwrite, job_db=args.job_db)
+        sys.exit(0)
+    
+    if args.plan:
+        apply_rate_limit_overrides(args.rate_limits)
+        generator = LMSBatchGenerator(args.subject, mode=args.mode)
+        generator.rate_limit_delay = args.delay
+        generator.plan_lecture_series(args.start, args.end, skip_existing=not args.overwrite)
+        sys.exit(0)
+    
+    configure_tracing(args, args.subject, "generate")
+    
     try:
         # 배치 생성기 초기화
-        generator = LMSBatchGenerator(args.subject)
+        generator = LMSBatchGenerator(args.subject, mode=args.mode)
         generator.rate_limit_delay = args.delay
         
+        if args.watch:
+            generator.watch_sources(args.watch_interval, once=args.once)
+            sys.exit(0)
+        
         # 배치 생성 실행
         results = generator.generate_lecture_series(
             start_lecture=args.start,
@@ -217,6 +411,9 @@ def main():
             skip_existing=not args.overwrite
         )
         
+        if args.export_bundle and results["failed"] != [-1]:
+            export_bundle(args.subject)
+        
         # 종료 코드 설정
         if results["failed"]:
             sys.exit(1)  # 실패한 강의가 있으면 에러 코드
@@ -229,6 +426,8 @@ def main():
     except Exception as e:
         print(f"\n💥 예상치 못한 오류: {e}")
         sys.exit(1)
+    finally:
+        finish_tracing(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
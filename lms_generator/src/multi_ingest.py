@@ -0,0 +1,229 @@
+"""
+여러 주제 동시 벡터 DB 구축 모듈
+
+SUBJECTS_DIR 아래 data/ 폴더가 있는 주제들을 한 프로세스에서 동시에 구축
+- 모든 주제가 하나의 임베딩 요청 스레드 풀과 공유 클라이언트(OpenAI/Qdrant 연결 풀)를 사용
+- 임베딩 모델의 RPM/TPM 한도(MODEL_LIMITS, OPENAI_RATE_LIMITS)를 하나의 토큰 버킷으로 나눠 쓰므로
+  전체 갱신 시간이 주제 수가 아니라 총 임베딩 양 / 할당량에 비례
+- 주제별 진행률과 처리량(chunks/s, tokens/s)을 주기적으로 출력하고, 주제 로그 줄에는 [주제]를 붙임
+"""
+
+import sys
+import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from config import RAG_CONFIG, get_model_limits
+from clients import get_openai_client
+from embeddings import embed_texts
+from token_counter import get_token_counter
+from tracing import get_tracer
+
+
+class RateBudget:
+    """분당 요청 수/토큰 수 토큰 버킷 (여러 스레드가 공유, 한도를 넘으면 채워질 때까지 대기)"""
+
+    def __init__(self, rpm: int, tpm: int):
+        self.rpm = rpm
+        self.tpm = tpm
+        self._requests = float(rpm)
+        self._tokens = float(tpm)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+        self.waited_s = 0.0
+
+    def _refill(self):
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._updated = now
+        self._requests = min(self.rpm, self._requests + elapsed * self.rpm / 60)
+        self._tokens = min(self.tpm, self._tokens + elapsed * self.tpm / 60)
+
+    def acquire(self, tokens: int) -> float:
+        """요청 1건 + tokens만큼 예약 (대기한 시간 반환, 한 요청이 TPM보다 크면 TPM만큼만 예약)"""
+        tokens = min(tokens, self.tpm)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._requests >= 1 and self._tokens >= tokens:
+                    self._requests -= 1
+                    self._tokens -= tokens
+                    self.waited_s += waited
+                    return waited
+                delay = max((1 - self._requests) * 60 / self.rpm, (tokens - self._tokens) * 60 / self.tpm)
+            time.sleep(delay)
+            waited += delay
+
+
+class IngestPool:
+    """주제들이 공유하는 임베딩 요청 풀 (동시 요청 수 + 분당 한도 + 주제별 진행 통계)"""
+
+    def __init__(self, workers: int = 8, model: Optional[str] = None):
+        self.workers = max(1, workers)
+        self.model = model or RAG_CONFIG["embedding_model"]
+        limits = get_model_limits(self.model)
+        self.budget = RateBudget(limits["rpm"], limits["tpm"])
+        self.counter = get_token_counter()
+        self.tracer = get_tracer()
+        self.stats: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed")
+        self.started = time.perf_counter()
+
+    def begin(self, subject: str, total_chunks: int, restored_chunks: int = 0):
+        """주제의 임베딩 단계 시작 (체크포인트에서 복원된 청크는 완료로 계산)"""
+        with self._lock:
+            self.stats[subject] = {
+                "total": total_chunks,
+                "done": restored_chunks,
+                "tokens": 0,
+                "started": time.perf_counter(),
+                "finished": None
+            }
+
+    def finish(self, subject: str):
+        with self._lock:
+            if subject in self.stats:
+                self.stats[subject]["finished"] = time.perf_counter()
+
+    def _embed(self, subject: str, texts: List[str], dimensions: Optional[int]):
+        tokens = sum(self.counter.count(text, self.model) for text in texts)
+        self.budget.acquire(tokens)
+        with self.tracer.span("ingest.embed_batch", subject=subject, size=len(texts)):
+            vectors = embed_texts(get_openai_client(), texts, model=self.model, dimensions=dimensions)
+        with self._lock:
+            stats = self.stats[subject]
+            stats["done"] += len(texts)
+            stats["tokens"] += tokens
+        return vectors
+
+    def submit(self, subject: str, texts: List[str], dimensions: Optional[int] = None) -> Future:
+        """임베딩 배치 요청 예약 (한도 대기는 풀 스레드에서 처리)"""
+        return self._executor.submit(self._embed, subject, texts, dimensions)
+
+    def format_progress(self) -> str:
+        """주제별 진행률/처리량 한 줄 요약"""
+        parts = []
+        with self._lock:
+            for subject, stats in sorted(self.stats.items()):
+                elapsed = max((stats["finished"] or time.perf_counter()) - stats["started"], 1e-9)
+                percent = stats["done"] / stats["total"] * 100 if stats["total"] else 100.0
+                parts.append(f"[{subject}] {stats['done']:,}/{stats['total']:,} ({percent:.0f}%) "
+                             f"{stats['done'] / elapsed:.0f} chunks/s {stats['tokens'] / elapsed:,.0f} tok/s")
+        return " | ".join(parts)
+
+    @contextmanager
+    def reporting(self, stream, interval: float = 10.0) -> Iterator[None]:
+        """interval초마다 진행률 출력 (임베딩 단계가 시작된 주제만)"""
+        stop = threading.Event()
+
+        def report():
+            while not stop.wait(interval):
+                line = self.format_progress()
+                if line:
+                    stream.write(f"📈 {line}\n")
+                    stream.flush()
+
+        thread = threading.Thread(target=report, name="ingest-progress", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+class _PrefixedOutput:
+    """주제 스레드가 출력한 줄 앞에 [주제] 표시 (여러 주제의 로그가 섞여도 구분)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.local = threading.local()
+
+    def write(self, text: str) -> int:
+        prefix = getattr(self.local, "prefix", None)
+        if prefix is None:
+            return self.stream.write(text)
+        *lines, rest = (getattr(self.local, "buffer", "") + text).split("\n")
+        for line in lines:
+            self.stream.write(f"{prefix}{line}\n")
+        self.local.buffer = rest
+        return len(text)
+
+    def end_subject(self):
+        """현재 스레드의 남은 출력 내보내고 접두어 해제"""
+        rest = getattr(self.local, "buffer", "")
+        if rest:
+            self.stream.write(f"{self.local.prefix}{rest}\n")
+        self.local.buffer = ""
+        self.local.prefix = None
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+def ingest_subjects(subjects: List[str], parallel: Optional[int] = None, embed_workers: int = 8,
+                    report_interval: float = 10.0, **builder_options) -> Dict[str, Dict]:
+    """주제들을 동시에 구축 (임베딩 요청 풀/한도 공유), 주제별 결과 반환"""
+    from vector_builder import VectorBuilder
+
+    pool = IngestPool(embed_workers)
+    output = _PrefixedOutput(sys.stdout)
+    results: Dict[str, Dict] = {}
+    limits = get_model_limits(pool.model)
+    print(f"🚀 {len(subjects)}개 주제 동시 구축: {', '.join(subjects)}")
+    print(f"⚙️  임베딩 동시 요청 {pool.workers}개, 공유 한도 {limits['rpm']:,} RPM / {limits['tpm']:,} TPM ({pool.model})")
+
+    def build(subject: str) -> Dict:
+        output.local.prefix = f"[{subject}] "
+        started = time.perf_counter()
+        try:
+            builder = VectorBuilder(subject, **builder_options)
+            builder.pool = pool
+            builder.build_vector_db()
+            return {"status": "done", "seconds": time.perf_counter() - started}
+        except Exception as e:
+            return {"status": "failed", "seconds": time.perf_counter() - started, "error": str(e)}
+        finally:
+            pool.finish(subject)
+            output.end_subject()
+
+    sys.stdout = output
+    try:
+        with pool.reporting(output.stream, report_interval), \
+                ThreadPoolExecutor(max_workers=parallel or len(subjects), thread_name_prefix="ingest") as executor:
+            for subject, result in zip(subjects, executor.map(build, subjects)):
+                results[subject] = result
+    finally:
+        sys.stdout = output.stream
+        pool.close()
+
+    wall = time.perf_counter() - pool.started
+    print("=" * 70)
+    print(f"📊 주제별 결과 (전체 {wall:.1f}초)")
+    total_chunks = total_tokens = 0
+    for subject in subjects:
+        result = results[subject]
+        stats = pool.stats.get(subject, {"done": 0, "tokens": 0})
+        result.update(chunks=stats["done"], tokens=stats["tokens"])
+        total_chunks += stats["done"]
+        total_tokens += stats["tokens"]
+        mark = "✅" if result["status"] == "done" else "❌"
+        line = (f"  {mark} {subject:<20} {stats['done']:>9,}청크 {stats['tokens']:>12,}토큰 "
+                f"{result['seconds']:>8.1f}초 {stats['tokens'] / max(result['seconds'], 1e-9):>10,.0f} tok/s")
+        print(line + (f"  {result['error']}" if result["status"] == "failed" else ""))
+    print(f"  합계 {total_chunks:,}청크 {total_tokens:,}토큰, 처리량 {total_tokens / max(wall, 1e-9):,.0f} tok/s "
+          f"(한도 {limits['tpm'] / 60:,.0f} tok/s), 한도 대기 {pool.budget.waited_s:.1f}초 (요청 스레드 합계)")
+    print("-" * 70)
+    for line in get_tracer().format_summary():
+        print(line)
+    return results
@@ -0,0 +1,248 @@
+"""
+RAG 검색 결과 캐시 모듈
+
+쿼리 임베딩을 키로 검색 결과(top-k 컨텍스트)를 메모리(LRU)와 디스크(.npz)에 보관
+동일 쿼리 또는 코사인 유사도가 기준 이상인 쿼리는 Qdrant 검색 없이 캐시 결과 반환
+VectorBuilder가 기록하는 컬렉션 버전이 바뀌면 캐시 전체 무효화
+디스크 저장은 새 항목 SAVE_EVERY개마다, 그리고 프로세스 종료 시 한 번 (원자적 교체)
+"""
+
+import io
+import os
+import json
+import atexit
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from atomic_write import write_atomic
+from config import RAG_CONFIG, get_subject_paths, get_qdrant_collection_name
+from tracing import get_tracer
+
+CACHE_FORMAT_VERSION = 1
+# 디스크에 저장하지 않은 새 항목이 이만큼 쌓이면 저장 (나머지는 flush/프로세스 종료 시)
+SAVE_EVERY = 32
+
+
+def write_collection_version(subject: str, points: int, dimension: int) -> Dict:
+    """컬렉션 구축/복원 완료 시 새 버전 기록 (검색 캐시 무효화 기준)"""
+    path = get_subject_paths(subject)["collection_version_file"]
+    stamp = {
+        "version": os.urandom(8).hex(),
+        "collection": get_qdrant_collection_name(subject),
+        "embedding_model": RAG_CONFIG["embedding_model"],
+        "dimension": int(dimension),
+        "points": int(points),
+        "built_at": datetime.now().isoformat(timespec="seconds")
+    }
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    write_atomic(path, json.dumps(stamp, ensure_ascii=False, indent=2).encode("utf-8"))
+    return stamp
+
+
+def read_collection_version(subject: str) -> Optional[str]:
+    """현재 컬렉션 버전 (기록이 없으면 None)"""
+    path = get_subject_paths(subject)["collection_version_file"]
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f).get("version")
+    except (OSError, ValueError):
+        return None
+
+
+class QueryCache:
+    """쿼리 임베딩 기반 검색 결과 캐시 클래스"""
+
+    def __init__(self, subject: str, threshold: Optional[float] = None, max_entries: Optional[int] = None):
+        self.subject = subject
+        self.collection_name = get_qdrant_collection_name(subject)
+        self.threshold = RAG_CONFIG["query_cache_threshold"] if threshold is None else threshold
+        self.max_entries = RAG_CONFIG["query_cache_size"] if max_entries is None else max_entries
+
+        paths = get_subject_paths(subject)
+        self.version_path = paths["collection_version_file"]
+        self.cache_path = os.path.join(paths["query_cache_dir"], f"{self.collection_name}.npz")
+
+        self._lock = threading.Lock()
+        # (query, top_k) → {"vector": np.ndarray, "contexts": [...]}, 오래 안 쓴 항목이 앞쪽
+        self._entries: "OrderedDict[Tuple[str, int], Dict]" = OrderedDict()
+        self._matrix = None
+        self._matrix_keys: List[Tuple[str, int]] = []
+        self._version: Optional[str] = None
+        self._version_mtime: Optional[float] = None
+        self._loaded = False
+        self._unsaved = 0
+        atexit.register(self.flush)
+
+    # ------------------------------------------------------------------
+    # 버전 / 영속화
+    # ------------------------------------------------------------------
+
+    def _check_version(self):
+        """컬렉션 버전 파일이 바뀌었으면 캐시 비우기 (잠금 보유 상태에서 호출)"""
+        try:
+            mtime = os.path.getmtime(self.version_path)
+        except OSError:
+            mtime = None
+        if self._loaded and mtime == self._version_mtime:
+            return
+
+        version = read_collection_version(self.subject)
+        first_load = not self._loaded
+        self._loaded = True
+        self._version_mtime = mtime
+        if version != self._version or first_load:
+            self._version = version
+            self._entries.clear()
+            self._matrix = None
+            self._unsaved = 0
+            if first_load:
+                self._load_from_disk()
+
+    def _load_from_disk(self):
+        if self._version is None or not os.path.exists(self.cache_path):
+            return
+        import numpy as np
+
+        try:
+            with np.load(self.cache_path) as data:
+                meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+                vectors = data["vectors"]
+        except (OSError, ValueError, KeyError):
+            return
+        if meta.get("format_version") != CACHE_FORMAT_VERSION or meta.get("collection_version") != self._version:
+            return  # 이전 컬렉션으로 만든 캐시
+
+        for entry, vector in zip(meta["entries"], vectors):
+            self._entries[(entry["query"], entry["top_k"])] = {
+                "vector": vector,
+                "contexts": entry["contexts"]
+            }
+
+    def _serialize(self) -> Optional[bytes]:
+        """저장할 .npz 내용 (잠금 보유 상태에서 호출, 컬렉션 버전이 없거나 새 항목이 없으면 None)"""
+        if self._version is None or not self._unsaved:
+            return None
+        import numpy as np
+
+        keys = list(self._entries.keys())
+        meta = {
+            "format_version": CACHE_FORMAT_VERSION,
+            "collection_version": self._version,
+            "entries": [{"query": query, "top_k": top_k, "contexts": self._entries[(query, top_k)]["contexts"]}
+                        for query, top_k in keys]
+        }
+        vectors = (np.vstack([self._entries[key]["vector"] for key in keys])
+                   if keys else np.empty((0, 0), dtype=np.float32))
+
+        buffer = io.BytesIO()
+        np.savez(buffer, vectors=vectors, meta=np.frombuffer(json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+                                                            dtype=np.uint8))
+        self._unsaved = 0
+        return buffer.getvalue()
+
+    def _write(self, data: Optional[bytes]):
+        """캐시 파일 교체 (임시 파일명이 달라 같은 주제를 쓰는 여러 워커 프로세스가 동시에 저장해도 안전)"""
+        if data is None:
+            return
+
+        os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+        write_atomic(self.cache_path, data)
+
+    def flush(self):
+        """저장하지 않은 항목을 디스크에 저장 (프로세스 종료 시 자동 호출)"""
+        with self._lock:
+            if not self._unsaved:
+                return
+            self._check_version()
+            data = self._serialize()
+        try:
+            self._write(data)
+        except OSError as e:
+            print(f"⚠️  검색 캐시 저장 실패: {e}")
+
+    # ------------------------------------------------------------------
+    # 조회 / 저장
+    # ------------------------------------------------------------------
+
+    def get_exact(self, query: str, top_k: int) -> Optional[List[Dict]]:
+        """동일 쿼리 문자열 캐시 조회 (임베딩 호출도 생략 가능)"""
+        with self._lock:
+            self._check_version()
+            entry = self._entries.get((query, top_k))
+            if entry is None:
+                return None
+            self._entries.move_to_end((query, top_k))
+        get_tracer().increment("rag.cache.exact_hit")
+        return entry["contexts"]
+
+    def lookup(self, query_vector: Sequence[float], top_k: int) -> Optional[List[Dict]]:
+        """코사인 유사도가 기준 이상인 캐시 항목의 top-k 결과 조회"""
+        import numpy as np
+
+        with self._lock:
+            self._check_version()
+            if not self._entries:
+                get_tracer().increment("rag.cache.miss")
+                return None
+
+            if self._matrix is None:
+                self._matrix_keys = list(self._entries.keys())
+                matrix = np.vstack([self._entries[key]["vector"] for key in self._matrix_keys])
+                self._matrix = matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+            query = np.asarray(query_vector, dtype=np.float32)
+            if query.shape[0] != self._matrix.shape[1]:
+                get_tracer().increment("rag.cache.miss")
+                return None
+            scores = self._matrix @ (query / max(float(np.linalg.norm(query)), 1e-12))
+
+            # 요청보다 적은 top_k로 저장된 항목은 결과가 부족하므로 제외
+            for index in np.argsort(-scores):
+                if scores[index] < self.threshold:
+                    break
+                key = self._matrix_keys[index]
+                if key[1] >= top_k and key in self._entries:
+                    self._entries.move_to_end(key)
+                    get_tracer().increment("rag.cache.semantic_hit")
+                    return self._entries[key]["contexts"][:top_k]
+
+        get_tracer().increment("rag.cache.miss")
+        return None
+
+    def put(self, query: str, query_vector: Sequence[float], top_k: int, contexts: List[Dict]):
+        """검색 결과 저장 (최대 개수를 넘으면 가장 오래 안 쓴 항목 제거)"""
+        import numpy as np
+
+        with self._lock:
+            self._check_version()
+            self._entries[(query, top_k)] = {
+                "vector": np.asarray(query_vector, dtype=np.float32),
+                "contexts": contexts
+            }
+            self._entries.move_to_end((query, top_k))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._matrix = None
+            self._unsaved += 1
+            data = self._serialize() if self._unsaved >= SAVE_EVERY else None
+        try:
+            self._write(data)
+        except OSError as e:
+            # 캐시 저장 실패가 검색 결과를 잃게 하지 않도록 경고만 출력
+            print(f"⚠️  검색 캐시 저장 실패: {e}")
+
+    def clear(self):
+        """메모리/디스크 캐시 삭제"""
+        with self._lock:
+            self._entries.clear()
+            self._matrix = None
+            self._unsaved = 0
+            if os.path.exists(self.cache_path):
+                os.remove(self.cache_path)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._check_version()
+            return len(self._entries)
@@ -0,0 +1,349 @@
+"""
+검색 파라미터 스윕 모듈
+
+청크 크기/겹침(RAG_CONFIG chunk_size, chunk_overlap)과 쿼리별/최종 검색 수(query_top_k, top_k_results)를
+전체 재구축이나 강의 재생성 없이 오프라인으로 비교
+- 정답 라벨: 강의별 검색 쿼리(강의 생성과 동일) → 커리큘럼의 main_apis(없으면 focus_keywords)를 언급하는 data/ 파일
+  (--export-labels로 저장해 손본 뒤 --labels로 다시 사용 가능)
+- 청킹 설정마다 별도 컬렉션(기본: 인프로세스 Qdrant)을 만들고 강의 생성과 같은 방식으로 검색/병합
+- 설정별 recall@k, MRR, 검색 지연, 프롬프트 컨텍스트 토큰, 색인 임베딩 토큰을 비교하고
+  품질 기준(--min-recall, --min-mrr)을 만족하는 가장 저렴한 설정을 추천
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from config import RAG_CONFIG, get_curriculum_file, get_qdrant_collection_name, get_stage_model
+from curriculum_manager import CurriculumManager
+from embeddings import embed_texts
+from lecture_generator import LectureGenerator
+from token_counter import estimate_tokens, get_token_counter
+from tracing import estimate_cost
+from vector_builder import VectorBuilder, create_text_splitter, split_file_content
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+def _parse_grid(value: str) -> List[int]:
+    """"800,1500,2500" → [800, 1500, 2500]"""
+    return sorted({int(item) for item in value.split(",") if item.strip()})
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def build_labels(curriculum_manager: CurriculumManager, files_content: List[Tuple[str, str]]) -> List[Dict]:
+    """강의별 검색 쿼리와 관련 파일 라벨 (main_apis를 언급하는 파일, main_apis가 없으면 focus_keywords)"""
+    lowered = {}
+    labels = []
+    for lecture_info in curriculum_manager.iter_lectures():
+        focus_keywords = LectureGenerator.get_focus_keywords(lecture_info)
+        apis = [api for api in lecture_info.get("main_apis", []) if api]
+        if apis:
+            # API 이름은 대소문자 구분 (UniTask.Delay ≠ delay)
+            relevant = [path for path, content in files_content if any(api in content for api in apis)]
+        else:
+            terms = [keyword.lower() for keyword in focus_keywords if len(keyword.strip()) >= 3]
+            relevant = []
+            for path, content in files_content:
+                if path not in lowered:
+                    lowered[path] = content.lower()
+                if any(term in lowered[path] for term in terms):
+                    relevant.append(path)
+        labels.append({
+            "lecture": lecture_info["number"],
+            "queries": LectureGenerator.build_search_queries(lecture_info, focus_keywords),
+            "relevant": relevant
+        })
+    return labels
+
+
+def recommend(rows: List[Dict], min_recall: float, min_mrr: float = 0.0) -> Optional[Dict]:
+    """품질 기준을 만족하는 설정 중 컨텍스트 토큰(→ 색인 토큰 → 검색 지연)이 가장 적은 설정"""
+    eligible = [row for row in rows if row["recall"] >= min_recall and row["mrr"] >= min_mrr]
+    if not eligible:
+        return None
+    return min(eligible, key=lambda row: (row["context_tokens"], row["index_tokens"], row["search_p95_ms"]))
+
+
+class RetrievalSweep:
+    """청킹/검색 수 조합별 검색 품질과 비용 비교 클래스"""
+
+    def __init__(self, subject: str, use_server: bool = False, dedup: bool = True,
+                 dimensions: Optional[int] = None):
+        self.subject = subject
+        self.builder = VectorBuilder(subject, dimensions=dimensions, dedup=dedup)
+        self.use_server = use_server
+        self.counter = get_token_counter()
+        self.lecture_model = get_stage_model("lecture")
+        self.embedding_model = RAG_CONFIG["embedding_model"]
+
+        # 청크 내용 해시 → 임베딩 (설정이 달라도 같은 청크는 한 번만 임베딩)
+        self._vectors: Dict[str, "np.ndarray"] = {}
+        self.embedded_tokens = 0
+        self._qdrant_client = None
+
+    @property
+    def qdrant_client(self):
+        """스윕용 Qdrant (기본: 인프로세스 메모리, --server이면 공유 서버에 임시 컬렉션)"""
+        if self._qdrant_client is None:
+            if self.use_server:
+                self._qdrant_client = self.builder.qdrant_client
+            else:
+                from qdrant_client import QdrantClient
+                self._qdrant_client = QdrantClient(location=":memory:")
+        return self._qdrant_client
+
+    def chunk_corpus(self, files_content: List[Tuple[str, str]], chunk_size: int, chunk_overlap: int) -> List[Dict]:
+        """지정한 크기/겹침으로 청킹 (구축과 같은 근중복 제거 적용)"""
+        text_splitter = create_text_splitter(chunk_size, chunk_overlap)
+        chunks = []
+        for file_path, content in files_content:
+            chunks.extend(split_file_content(text_splitter, self.subject, file_path, content))
+        if self.builder.dedup:
+            from dedup import NearDuplicateFilter
+            chunks = NearDuplicateFilter(threshold=RAG_CONFIG["dedup_threshold"]).filter(chunks)
+        return chunks
+
+    def embed_chunks(self, chunks: List[Dict]) -> "np.ndarray":
+        """청크 임베딩 (이전 설정에서 임베딩한 동일 청크 재사용)"""
+        import numpy as np
+
+        texts = {}
+        for chunk in chunks:
+            content_hash = chunk["metadata"]["content_hash"]
+            if content_hash not in self._vectors:
+                texts.setdefault(content_hash, chunk["text"])
+        missing = list(texts)
+        batch_size = self.builder.batch_size
+        for i in range(0, len(missing), batch_size):
+            batch = missing[i:i + batch_size]
+            vectors = embed_texts(self.builder.openai_client, [texts[content_hash] for content_hash in batch],
+                                  dimensions=self.builder.dimensions)
+            for content_hash, vector in zip(batch, vectors):
+                self._vectors[content_hash] = vector
+            self.embedded_tokens += sum(self.counter.count(texts[content_hash], self.embedding_model)
+                                        for content_hash in batch)
+        return np.stack([self._vectors[chunk["metadata"]["content_hash"]] for chunk in chunks])
+
+    def build_index(self, collection_name: str, chunks: List[Dict], vectors: "np.ndarray"):
+        """설정별 컬렉션 생성 + 업서트"""
+        from qdrant_client.models import Distance, VectorParams
+
+        try:
+            self.qdrant_client.delete_collection(collection_name)
+        except Exception:
+            pass
+        self.qdrant_client.create_collection(
+            collection_name=collection_name,
+            vectors_config=VectorParams(size=self.builder.vector_dimension, distance=Distance.COSINE)
+        )
+        batch_size = self.builder.batch_size
+        for i in range(0, len(chunks), batch_size):
+            self.qdrant_client.upsert(
+                collection_name=collection_name,
+                points=self.builder._build_points(chunks[i:i + batch_size], vectors[i:i + batch_size], i)
+            )
+
+    def evaluate(self, collection_name: str, labels: List[Dict], query_vectors: Dict[str, "np.ndarray"],
+                 query_ks: List[int], top_ks: List[int]) -> List[Dict]:
+        """쿼리별 검색 수 × 최종 컨텍스트 수 조합별 recall@k, MRR, 검색 지연, 컨텍스트 토큰
+
+        recall@k: 병합된 최종 컨텍스트에 포함된 관련 파일 수 / min(관련 파일 수, k) (강의 평균)
+        MRR: 쿼리별 검색 결과에서 첫 관련 청크 순위의 역수 (쿼리 평균)
+        """
+        rows = []
+        for query_k in query_ks:
+            latencies, reciprocal_ranks, lecture_results = [], [], []
+            for label in labels:
+                relevant = set(label["relevant"])
+                results = []
+                for query in label["queries"]:
+                    started = time.perf_counter()
+                    search_result = self.qdrant_client.search(
+                        collection_name=collection_name,
+                        query_vector=query_vectors[query].tolist(),
+                        limit=query_k,
+                        with_payload=True
+                    )
+                    latencies.append(time.perf_counter() - started)
+                    contexts = LectureGenerator._to_contexts(search_result)
+                    reciprocal_ranks.append(next(
+                        (1 / rank for rank, ctx in enumerate(contexts, 1) if relevant.intersection(ctx["source_files"])),
+                        0.0
+                    ))
+                    results.append(contexts)
+                lecture_results.append((relevant, results))
+
+            for top_k in top_ks:
+                recalls, context_tokens = [], []
+                for relevant, results in lecture_results:
+                    final_contexts = LectureGenerator.merge_contexts(results, top_k)
+                    found = {path for ctx in final_contexts for path in ctx["source_files"]} & relevant
+                    recalls.append(len(found) / min(len(relevant), top_k))
+                    context_tokens.append(self.counter.count(
+                        LectureGenerator._format_rag_contexts(final_contexts), self.lecture_model
+                    ))
+                rows.append({
+                    "query_top_k": query_k,
+                    "top_k": top_k,
+                    "recall": round(sum(recalls) / len(recalls), 4),
+                    "mrr": round(sum(reciprocal_ranks) / len(reciprocal_ranks), 4),
+                    "search_p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+                    "search_p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+                    "context_tokens": round(sum(context_tokens) / len(context_tokens))
+                })
+        return rows
+
+    def run(self, files_content: List[Tuple[str, str]], labels: List[Dict], chunk_sizes: List[int],
+            overlaps: List[int], query_ks: List[int], top_ks: List[int]) -> List[Dict]:
+        """그리드 전체 실행 (청킹 설정마다 색인 1개, 검색 수 조합은 같은 색인에서 평가)"""
+        queries = list(dict.fromkeys(query for label in labels for query in label["queries"]))
+        print(f"🔄 검색 쿼리 {len(queries)}개 임베딩 중...")
+        query_vectors = dict(zip(queries, embed_texts(self.builder.openai_client, queries,
+                                                      dimensions=self.builder.dimensions)))
+
+        rows = []
+        base_name = get_qdrant_collection_name(self.subject)
+        for chunk_size in chunk_sizes:
+            for chunk_overlap in overlaps:
+                if chunk_overlap >= chunk_size:
+                    print(f"⏭️  chunk_size={chunk_size}, overlap={chunk_overlap}: 겹침이 청크 크기 이상이라 건너뜀")
+                    continue
+                started = time.perf_counter()
+                chunks = self.chunk_corpus(files_content, chunk_size, chunk_overlap)
+                vectors = self.embed_chunks(chunks)
+                index_tokens = sum(self.counter.count(chunk["text"], self.embedding_model) for chunk in chunks)
+
+                collection_name = f"{base_name}_sweep_{chunk_size}_{chunk_overlap}"
+                self.build_index(collection_name, chunks, vectors)
+                try:
+                    for row in self.evaluate(collection_name, labels, query_vectors, query_ks, top_ks):
+                        rows.append({
+                            "chunk_size": chunk_size,
+                            "chunk_overlap": chunk_overlap,
+                            "chunks": len(chunks),
+                            "index_tokens": index_tokens,
+                            "index_cost": round(estimate_cost(self.embedding_model, index_tokens, 0), 4),
+                            **row
+                        })
+                finally:
+                    # 공유 서버에는 임시 컬렉션을 남기지 않음
+                    self.qdrant_client.delete_collection(collection_name)
+                print(f"✅ chunk_size={chunk_size}, overlap={chunk_overlap}: {len(chunks)}개 청크 "
+                      f"({time.perf_counter() - started:.1f}초)")
+        return rows
+
+
+def print_report(rows: List[Dict], recommended: Optional[Dict], min_recall: float, min_mrr: float):
+    """설정별 결과 표 (* 현재 설정, ▶ 추천 설정)"""
+    current = (RAG_CONFIG["chunk_size"], RAG_CONFIG["chunk_overlap"], RAG_CONFIG["query_top_k"],
+               RAG_CONFIG["top_k_results"])
+    print("\n" + "=" * 100)
+    print(f"  {'chunk':>6} {'overlap':>7} {'q_k':>4} {'top_k':>5} {'청크':>7} {'색인 토큰':>11} "
+          f"{'recall@k':>9} {'MRR':>6} {'검색 p50':>9} {'p95':>8} {'컨텍스트':>9}")
+    for row in rows:
+        key = (row["chunk_size"], row["chunk_overlap"], row["query_top_k"], row["top_k"])
+        marker = "▶" if row is recommended else ("*" if key == current else " ")
+        print(f"{marker} {row['chunk_size']:>6} {row['chunk_overlap']:>7} {row['query_top_k']:>4} {row['top_k']:>5} "
+              f"{row['chunks']:>7,} {row['index_tokens']:>11,} {row['recall']:>9.3f} {row['mrr']:>6.3f} "
+              f"{row['search_p50_ms']:>7.2f}ms {row['search_p95_ms']:>6.2f}ms {row['context_tokens']:>9,}")
+    print("=" * 100)
+    if recommended is None:
+        print(f"❌ recall@k ≥ {min_recall}, MRR ≥ {min_mrr}를 만족하는 설정이 없습니다")
+        return
+    print(f"🎯 추천 (recall@k ≥ {min_recall}, MRR ≥ {min_mrr} 중 컨텍스트 토큰 최소): "
+          f"chunk_size={recommended['chunk_size']}, chunk_overlap={recommended['chunk_overlap']}, "
+          f"query_top_k={recommended['query_top_k']}, top_k_results={recommended['top_k']}")
+    print(f"   강의당 컨텍스트 {recommended['context_tokens']:,}토큰, 색인 {recommended['index_tokens']:,}토큰 "
+          f"(${recommended['index_cost']:.4f})")
+
+
+def main():
+    """메인 실행 함수"""
+    parser = argparse.ArgumentParser(description="검색 파라미터 스윕 (recall@k / MRR / 검색 지연 / 토큰 비교)")
+    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    parser.add_argument("--chunk-sizes", default="800,1500,2500", help="청크 크기 목록 (기본: 800,1500,2500)")
+    parser.add_argument("--overlaps", default="100,200", help="청크 겹침 목록 (기본: 100,200)")
+    parser.add_argument("--query-k", default="2,3,5", help="쿼리별 검색 수 목록 (기본: 2,3,5)")
+    parser.add_argument("--top-k", default="3,5,8", help="병합 후 최종 컨텍스트 수 목록 (기본: 3,5,8)")
+    parser.add_argument("--min-recall", type=float, default=0.6, help="추천 기준 recall@k (기본: 0.6)")
+    parser.add_argument("--min-mrr", type=float, default=0.0, help="추천 기준 MRR (기본: 0)")
+    parser.add_argument("--labels", help="라벨 JSON 파일 (기본: 커리큘럼 main_apis/focus_keywords로 자동 생성)")
+    parser.add_argument("--export-labels", help="자동 생성한 라벨을 JSON으로 저장하고 종료 (손으로 고쳐 --labels로 사용)")
+    parser.add_argument("--server", action="store_true", help="인프로세스 Qdrant 대신 공유 서버에 임시 컬렉션 생성")
+    parser.add_argument("--dimensions", type=int, help="임베딩 차원 (기본: 설정값)")
+    parser.add_argument("--no-dedup", action="store_true", help="근중복 청크 제거 생략")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+
+    args = parser.parse_args()
+
+    if not os.path.exists(get_curriculum_file(args.subject)):
+        print(f"❌ 커리큘럼이 없는 주제입니다: {args.subject}")
+        sys.exit(1)
+
+    sweep = RetrievalSweep(args.subject, use_server=args.server, dedup=not args.no_dedup,
+                           dimensions=args.dimensions)
+    files_content = sweep.builder.collect_source_files()
+
+    if args.labels:
+        with open(args.labels, 'r', encoding='utf-8') as f:
+            labels = json.load(f)
+    else:
+        labels = build_labels(CurriculumManager(args.subject), files_content)
+    if args.export_labels:
+        with open(args.export_labels, 'w', encoding='utf-8') as f:
+            json.dump(labels, f, ensure_ascii=False, indent=2)
+        print(f"💾 라벨 저장: {args.export_labels} ({len(labels)}개 강의)")
+        return
+
+    unlabeled = [label["lecture"] for label in labels if not label["relevant"]]
+    if unlabeled:
+        print(f"⚠️  관련 파일이 없는 강의 {len(unlabeled)}개는 평가에서 제외: {unlabeled}")
+    labels = [label for label in labels if label["relevant"]]
+    if not labels:
+        print("❌ 평가할 라벨이 없습니다")
+        sys.exit(1)
+
+    chunk_sizes, overlaps = _parse_grid(args.chunk_sizes), _parse_grid(args.overlaps)
+    query_ks, top_ks = _parse_grid(args.query_k), _parse_grid(args.top_k)
+
+    # 동일 청크 재사용 전 기준의 대략적인 임베딩 비용 (청크 겹침만큼 늘어남)
+    corpus_tokens = sum(estimate_tokens(content) for _, content in files_content)
+    estimated = sum(corpus_tokens * (1 + overlap / size) for size in chunk_sizes for overlap in overlaps if overlap < size)
+    print(f"📊 강의 {len(labels)}개, 관련 파일 평균 {sum(len(label['relevant']) for label in labels) / len(labels):.1f}개, "
+          f"설정 {len(chunk_sizes) * len(overlaps)}×{len(query_ks) * len(top_ks)}개")
+    print(f"💰 예상 임베딩 최대 ~{estimated:,.0f}토큰 "
+          f"(${estimate_cost(sweep.embedding_model, int(estimated), 0):.4f}, 동일 청크는 재사용)")
+
+    rows = sweep.run(files_content, labels, chunk_sizes, overlaps, query_ks, top_ks)
+    recommended = recommend(rows, args.min_recall, args.min_mrr)
+    print_report(rows, recommended, args.min_recall, args.min_mrr)
+    print(f"💸 실제 임베딩 {sweep.embedded_tokens:,}토큰 "
+          f"(${estimate_cost(sweep.embedding_model, sweep.embedded_tokens, 0):.4f})")
+
+    if args.output:
+        report = {
+            "subject": args.subject,
+            "grid": {"chunk_size": chunk_sizes, "chunk_overlap": overlaps, "query_top_k": query_ks, "top_k": top_ks},
+            "lectures": len(labels),
+            "results": rows,
+            "recommended": recommended,
+            "embedded_tokens": sweep.embedded_tokens
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
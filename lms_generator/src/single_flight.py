@@ -0,0 +1,114 @@
+"""
+단일 실행(single-flight) 모듈
+
+동시에 들어온 동일 키 요청을 하나의 실제 호출로 합쳐 결과를 공유
+(캐시가 아니므로 실행이 끝나면 다음 요청은 새로 호출)
+스레드 호출자와 asyncio 호출자를 모두 지원하고 공유 횟수를 Tracer 카운터로 기록
+"""
+
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+from tracing import get_tracer
+
+
+class _Call:
+    """진행 중인 스레드 호출 하나"""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """동일 키 동시 요청 병합 클래스"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._async_calls: Dict[Tuple[int, Hashable], Any] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def _count(self, shared: bool):
+        with self._lock:
+            if shared:
+                self.shared += 1
+            else:
+                self.executed += 1
+        get_tracer().increment(f"{self.name}.{'shared' if shared else 'executed'}")
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """스레드 호출자용: 같은 키가 실행 중이면 그 결과를 기다려 공유"""
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            self._count(shared=True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        self._count(shared=False)
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """asyncio 호출자용: 같은 이벤트 루프에서 실행 중인 동일 키 작업을 공유"""
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        loop_key = (id(loop), key)
+        with self._lock:
+            task = self._async_calls.get(loop_key)
+            leader = task is None
+            if leader:
+                task = loop.create_task(fn())
+                self._async_calls[loop_key] = task
+                task.add_done_callback(lambda _: self._async_calls.pop(loop_key, None))
+
+        self._count(shared=not leader)
+        # 대기자 하나가 취소되어도 공유 작업은 계속 진행
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        """실제 실행 / 공유 횟수"""
+        with self._lock:
+            return {"executed": self.executed, "shared": self.shared}
+
+
+_flights: Dict[str, SingleFlight] = {}
+_flights_lock = threading.Lock()
+
+
+def get_single_flight(name: str) -> SingleFlight:
+    """이름별 프로세스 공용 SingleFlight 반환"""
+    with _flights_lock:
+        flight = _flights.get(name)
+        if flight is None:
+            flight = SingleFlight(name)
+            _flights[name] = flight
+        return flight
+
+
+def single_flight_stats() -> Dict[str, Dict[str, int]]:
+    """전체 SingleFlight 실행 / 공유 횟수"""
+    with _flights_lock:
+        return {name: flight.stats() for name, flight in sorted(_flights.items())}
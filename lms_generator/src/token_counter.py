@@ -0,0 +1,61 @@
+"""
+토큰 수 계산 모듈
+
+모델별 tiktoken 인코딩으로 토큰 수를 계산하고, 인코딩을 불러올 수 없으면(미설치/오프라인) 문자 수로 추정
+배치 실행 계획(--plan)과 질의응답 컨텍스트 예산 계산에서 공유
+"""
+
+import threading
+from typing import Dict, List
+
+# chat 메시지 하나당 형식 토큰 (역할/구분자)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """토크나이저 없이 대략적인 토큰 수 (ASCII 4자 ≈ 1토큰, 한글 등 비ASCII 3자 ≈ 2토큰)"""
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    return (len(text) - non_ascii + 3) // 4 + (non_ascii * 2 + 2) // 3
+
+
+class TokenCounter:
+    """모델별 tiktoken 토큰 수 계산 (인코딩을 불러올 수 없으면 문자 수 기반 추정)"""
+
+    def __init__(self):
+        self._encodings: Dict[str, object] = {}
+        self._lock = threading.Lock()
+        self.estimated_models = set()
+
+    def _get_encoding(self, model: str):
+        with self._lock:
+            if model not in self._encodings:
+                try:
+                    import tiktoken
+                    try:
+                        encoding = tiktoken.encoding_for_model(model)
+                    except KeyError:
+                        encoding = tiktoken.get_encoding("o200k_base")
+                except Exception:
+                    # 미설치 또는 인코딩 파일 다운로드 실패 (오프라인)
+                    encoding = None
+                self._encodings[model] = encoding
+            return self._encodings[model]
+
+    def count(self, text: str, model: str) -> int:
+        encoding = self._get_encoding(model)
+        if encoding is None:
+            self.estimated_models.add(model)
+            return estimate_tokens(text)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def count_messages(self, contents: List[str], model: str) -> int:
+        """chat 메시지 목록의 입력 토큰 (메시지 형식 토큰 포함)"""
+        return sum(self.count(content, model) + MESSAGE_OVERHEAD_TOKENS for content in contents) + 3
+
+
+_counter = TokenCounter()
+
+
+def get_token_counter() -> TokenCounter:
+    """프로세스 공용 TokenCounter (인코딩 로드는 모델별 1회)"""
+    return _counter
@@ -0,0 +1,260 @@
+"""
+실행 추적 및 메트릭 모듈
+
+강의 생성/벡터 DB 구축 단계별 span 소요 시간과 API 호출별 토큰·비용을 집계하고
+JSONL 트레이스 파일과 Prometheus textfile 형식으로 내보냄
+"""
+
+import os
+import json
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config import MODEL_PRICING, SUBJECTS_DIR, get_subject_paths
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """모델 단가표 기준 예상 비용 (USD)"""
+    pricing = MODEL_PRICING.get(model)
+    if pricing is None:
+        # 날짜 접미사가 붙은 모델명 (예: gpt-4o-2024-08-06)
+        pricing = next((price for name, price in MODEL_PRICING.items() if model.startswith(name + "-")), None)
+    if pricing is None:
+        return 0.0
+    return (prompt_tokens * pricing["input"] + completion_tokens * pricing["output"]) / 1_000_000
+
+
+class Tracer:
+    """단계별 span과 토큰 사용량 수집 클래스"""
+
+    def __init__(self):
+        self.run_id = os.urandom(6).hex()
+        self.trace_path: Optional[str] = None
+        self._lock = threading.Lock()
+        # 스레드와 asyncio 작업마다 독립된 span 스택
+        self._span_stack = contextvars.ContextVar("lms_span_stack", default=())
+        self._trace_file = None
+        self.stage_stats: Dict[str, Dict] = {}
+        self.usage_stats: Dict[tuple, Dict] = {}
+        self.counters: Dict[str, int] = {}
+
+    def configure(self, trace_path: Optional[str] = None):
+        """JSONL 트레이스 파일 지정 (None이면 메모리 집계만)"""
+        with self._lock:
+            if self._trace_file is not None:
+                self._trace_file.close()
+                self._trace_file = None
+            self.trace_path = trace_path
+            if trace_path:
+                os.makedirs(os.path.dirname(os.path.abspath(trace_path)), exist_ok=True)
+                self._trace_file = open(trace_path, 'a', encoding='utf-8')
+
+    def _write(self, record: Dict):
+        if self._trace_file is None:
+            return
+        self._trace_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._trace_file.flush()
+
+    def current_span(self) -> Optional[str]:
+        """현재 스레드/작업의 가장 안쪽 span 이름"""
+        stack = self._span_stack.get()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def span(self, name: str, **attrs):
+        """단계 소요 시간 측정 컨텍스트"""
+        stack = self._span_stack.get()
+        parent = stack[-1] if stack else None
+        token = self._span_stack.set(stack + (name,))
+        started_at = time.time()
+        started = time.perf_counter()
+        status = "ok"
+        try:
+            yield attrs
+        except BaseException:
+            status = "error"
+            raise
+        finally:
+            duration = time.perf_counter() - started
+            self._span_stack.reset(token)
+            with self._lock:
+                stats = self.stage_stats.setdefault(name, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+                stats["count"] += 1
+                stats["total_s"] += duration
+                stats["max_s"] = max(stats["max_s"], duration)
+                if status == "error":
+                    stats["errors"] += 1
+                self._write({
+                    "type": "span",
+                    "run_id": self.run_id,
+                    "name": name,
+                    "parent": parent,
+                    "start": round(started_at, 6),
+                    "duration_ms": round(duration * 1000, 3),
+                    "status": status,
+                    "thread": threading.current_thread().name,
+                    "attrs": attrs
+                })
+
+    def record_usage(self, model: str, prompt_tokens: int, completion_tokens: int = 0,
+                     stage: Optional[str] = None):
+        """API 호출 토큰 사용량 기록 (stage 미지정 시 현재 span)"""
+        stage = stage or self.current_span() or "unscoped"
+        cost = estimate_cost(model, prompt_tokens, completion_tokens)
+        with self._lock:
+            stats = self.usage_stats.setdefault((stage, model), {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost_usd": 0.0
+            })
+            stats["calls"] += 1
+            stats["prompt_tokens"] += prompt_tokens
+            stats["completion_tokens"] += completion_tokens
+            stats["cost_usd"] += cost
+            self._write({
+                "type": "usage",
+                "run_id": self.run_id,
+                "stage": stage,
+                "model": model,
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "cost_usd": round(cost, 6),
+                "time": round(time.time(), 6)
+            })
+
+    def record_response_usage(self, model: str, usage, stage: Optional[str] = None):
+        """OpenAI 응답의 usage 객체 기록"""
+        if usage is None:
+            return
+        self.record_usage(
+            model,
+            getattr(usage, "prompt_tokens", 0) or 0,
+            getattr(usage, "completion_tokens", 0) or 0,
+            stage=stage
+        )
+
+    def increment(self, name: str, amount: int = 1):
+        """이벤트 카운터 증가 (예: 병합된 요청 수)"""
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def usage_totals(self) -> Dict:
+        """전체 토큰/비용 합계"""
+        with self._lock:
+            return {
+                "calls": sum(stats["calls"] for stats in self.usage_stats.values()),
+                "prompt_tokens": sum(stats["prompt_tokens"] for stats in self.usage_stats.values()),
+                "completion_tokens": sum(stats["completion_tokens"] for stats in self.usage_stats.values()),
+                "cost_usd": round(sum(stats["cost_usd"] for stats in self.usage_stats.values()), 6)
+            }
+
+    def format_summary(self) -> List[str]:
+        """단계별 소요 시간 / 토큰 요약 표"""
+        lines = [f"{'단계':<28} {'횟수':>6} {'합계(s)':>10} {'평균(ms)':>10} {'최대(ms)':>10}"]
+        with self._lock:
+            for name, stats in sorted(self.stage_stats.items(), key=lambda item: -item[1]["total_s"]):
+                average_ms = stats["total_s"] / stats["count"] * 1000
+                lines.append(f"{name:<28} {stats['count']:>6} {stats['total_s']:>10.2f} "
+                             f"{average_ms:>10.1f} {stats['max_s'] * 1000:>10.1f}")
+            if self.usage_stats:
+                lines.append("")
+                lines.append(f"{'단계 / 모델':<40} {'호출':>6} {'입력 토큰':>12} {'출력 토큰':>12} {'비용($)':>10}")
+                for (stage, model), stats in sorted(self.usage_stats.items()):
+                    lines.append(f"{stage + ' / ' + model:<40} {stats['calls']:>6} {stats['prompt_tokens']:>12,} "
+                                 f"{stats['completion_tokens']:>12,} {stats['cost_usd']:>10.4f}")
+            if self.counters:
+                lines.append("")
+                lines.append(f"{'이벤트':<40} {'횟수':>6}")
+                for name, count in sorted(self.counters.items()):
+                    lines.append(f"{name:<40} {count:>6}")
+        return lines
+
+    def format_prometheus(self) -> str:
+        """Prometheus 텍스트 노출 형식 메트릭"""
+        lines = [
+            "# HELP lms_stage_duration_seconds_total Total time spent per stage.",
+            "# TYPE lms_stage_duration_seconds_total counter",
+        ]
+        with self._lock:
+            for name, stats in sorted(self.stage_stats.items()):
+                lines.append(f'lms_stage_duration_seconds_total{{stage="{name}"}} {stats["total_s"]:.6f}')
+            lines += ["# HELP lms_stage_calls_total Number of completed spans per stage.",
+                      "# TYPE lms_stage_calls_total counter"]
+            for name, stats in sorted(self.stage_stats.items()):
+                lines.append(f'lms_stage_calls_total{{stage="{name}"}} {stats["count"]}')
+            lines += ["# HELP lms_stage_errors_total Number of failed spans per stage.",
+                      "# TYPE lms_stage_errors_total counter"]
+            for name, stats in sorted(self.stage_stats.items()):
+                lines.append(f'lms_stage_errors_total{{stage="{name}"}} {stats["errors"]}')
+            lines += ["# HELP lms_tokens_total Tokens used per stage, model and direction.",
+                      "# TYPE lms_tokens_total counter"]
+            for (stage, model), stats in sorted(self.usage_stats.items()):
+                lines.append(f'lms_tokens_total{{stage="{stage}",model="{model}",direction="prompt"}} {stats["prompt_tokens"]}')
+                lines.append(f'lms_tokens_total{{stage="{stage}",model="{model}",direction="completion"}} {stats["completion_tokens"]}')
+            lines += ["# HELP lms_cost_usd_total Estimated API cost per stage and model.",
+                      "# TYPE lms_cost_usd_total counter"]
+            for (stage, model), stats in sorted(self.usage_stats.items()):
+                lines.append(f'lms_cost_usd_total{{stage="{stage}",model="{model}"}} {stats["cost_usd"]:.6f}')
+            lines += ["# HELP lms_events_total Event counters (e.g. coalesced requests).",
+                      "# TYPE lms_events_total counter"]
+            for name, count in sorted(self.counters.items()):
+                lines.append(f'lms_events_total{{event="{name}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        """Prometheus node_exporter textfile 형식으로 메트릭 저장"""
+        # textfile collector가 쓰기 도중 파일을 읽지 않도록 원자적 교체
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.format_prometheus())
+        os.replace(tmp_path, path)
+
+    def reset(self):
+        """집계 초기화 (새 실행 ID 발급)"""
+        with self._lock:
+            self.run_id = os.urandom(6).hex()
+            self.stage_stats.clear()
+            self.usage_stats.clear()
+            self.counters.clear()
+
+
+_tracer = Tracer()
+
+
+def get_tracer() -> Tracer:
+    """프로세스 공용 Tracer 반환"""
+    return _tracer
+
+
+def add_tracing_arguments(parser):
+    """CLI 공통 추적 옵션 추가"""
+    parser.add_argument("--trace", help="JSONL 트레이스 파일 경로 (기본: subjects/<주제>/traces/<작업>_<시각>.jsonl)")
+    parser.add_argument("--no-trace", action="store_true", help="트레이스 파일 기록 비활성화")
+    parser.add_argument("--metrics", help="Prometheus textfile 메트릭 출력 경로")
+
+
+def configure_tracing(args, subject: Optional[str], kind: str) -> Optional[str]:
+    """CLI 옵션에 따라 공용 Tracer의 트레이스 파일 설정 (여러 주제 작업이면 subject=None → subjects/.traces)"""
+    trace_path = None
+    if not args.no_trace:
+        trace_dir = get_subject_paths(subject)["trace_dir"] if subject else os.path.join(SUBJECTS_DIR, ".traces")
+        trace_path = args.trace or os.path.join(
+            trace_dir,
+            f"{kind}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+        )
+    get_tracer().configure(trace_path)
+    return trace_path
+
+
+def finish_tracing(args):
+    """실행 종료 시 메트릭 내보내기"""
+    tracer = get_tracer()
+    if args.metrics:
+        tracer.write_prometheus(args.metrics)
+        print(f"📈 메트릭 저장: {args.metrics}")
+    if tracer.trace_path:
+        print(f"🧭 트레이스 저장: {tracer.trace_path}")
+    tracer.configure(None)
@@ -6,94 +6,210 @@ UniTask 공식 Repository와 문서를 분석하여 Qdrant 벡터 DB에 저장
 """
 
 import os
+import sys
 import glob
+import json
+import time
+import hashlib
 import argparse
-from typing import List, Dict, Tuple
-from pathlib import Path
-
-import openai
-from qdrant_client import QdrantClient
-from qdrant_client.models import Distance, VectorParams, PointStruct
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from dotenv import load_dotenv
+from typing import TYPE_CHECKING, List, Dict, Tuple, Optional, Sequence
 
+from atomic_write import write_atomic
 from config import (
     get_subject_paths, 
     get_qdrant_collection_name,
-    RAG_CONFIG, 
-    GENERATION_CONFIG,
-    BASE_DIR
+    get_vector_dimension,
+    discover_subjects,
+    apply_rate_limit_overrides,
+    RAG_CONFIG,
+    SUBJECTS_DIR
 )
+from clients import get_openai_client, get_qdrant_client
+from embeddings import embed_texts
+from build_checkpoint import BuildCheckpoint
+from query_cache import write_collection_version
+from tracing import get_tracer, add_tracing_arguments, configure_tracing, finish_tracing
+
+# numpy/openai/qdrant_client/langchain은 실제 사용 시점에 import (CLI 시작 시간 단축)
+if TYPE_CHECKING:
+    import numpy as np
+    from qdrant_client.models import PointStruct
+
+# 지원하는 파일 확장자
+FILE_PATTERNS = [
+    "**/*.cs",      # C# 소스 코드
+    "**/*.md",      # 마크다운 문서
+    "**/*.txt",     # 텍스트 파일
+    "**/*.json"     # JSON 설정 파일
+]
+
+# 제외할 파일들 (바이너리, 메타파일 등)
+EXCLUDE_PATTERNS = ['.meta', '.dll', '.exe', '.bin', 'packages-lock.json']
+
+# 빈 파일이나 너무 작은 파일 기준 (문자 수)
+MIN_CONTENT_LENGTH = 50
+
+# 워커 프로세스별 텍스트 분할기
+_worker_splitter = None
+
+
+def create_text_splitter(chunk_size: Optional[int] = None, chunk_overlap: Optional[int] = None):
+    """RAG 설정 기반 텍스트 분할기 생성 (크기/겹침을 지정하면 설정 대신 사용)"""
+    try:
+        from langchain_text_splitters import RecursiveCharacterTextSplitter
+    except ImportError:  # langchain-text-splitters 분리 이전 버전
+        from langchain.text_splitter import RecursiveCharacterTextSplitter
+    
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size or RAG_CONFIG["chunk_size"],
+        chunk_overlap=RAG_CONFIG["chunk_overlap"] if chunk_overlap is None else chunk_overlap,
+        length_function=len,
+        separators=["\n\n", "\n", " ", ""]
+    )
+
+
+def split_file_content(text_splitter, subject: str, file_path: str, content: str) -> List[Dict]:
+    """파일 내용을 청크 딕셔너리 목록으로 분할"""
+    file_chunks = []
+    for i, chunk in enumerate(text_splitter.split_text(content)):
+        file_chunks.append({
+            "id": f"{file_path}_{i}",
+            "text": chunk,
+            "metadata": {
+                "file_path": file_path,
+                "chunk_index": i,
+                "subject": subject,
+                "file_type": os.path.splitext(file_path)[1],
+                "content_hash": hashlib.sha1(chunk.encode("utf-8")).hexdigest()
+            }
+        })
+    return file_chunks
+
 
-# 환경 변수 로드
-load_dotenv(os.path.join(BASE_DIR, '..', '.env'))
+def _init_chunk_worker():
+    """워커 프로세스 초기화 (분할기 1회 생성)"""
+    global _worker_splitter
+    _worker_splitter = create_text_splitter()
+
+
+def _chunk_file_worker(task: Tuple[str, str, str]) -> Tuple[List[Dict], Optional[str]]:
+    """워커: 파일 읽기 + 분할 + 해시/메타데이터 추출 (읽기 실패 시 오류 메시지를 부모 프로세스에 전달)"""
+    data_path, relative_path, subject = task
+    try:
+        with open(os.path.join(data_path, relative_path), 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+    except Exception as e:
+        return [], str(e)
+    
+    if len(content.strip()) < MIN_CONTENT_LENGTH:
+        return [], None
+    return split_file_content(_worker_splitter, subject, relative_path, content), None
 
 class VectorBuilder:
     """벡터 데이터베이스 구축 클래스"""
     
-    def __init__(self, subject: str):
+    def __init__(self, subject: str, dimensions: Optional[int] = None, resume: bool = False,
+                 dedup: bool = True, jobs: int = 1):
         self.subject = subject
         self.collection_name = get_qdrant_collection_name(subject)
         self.paths = get_subject_paths(subject)
         self.data_path = self.paths["data_dir"]
         
-        # OpenAI 클라이언트 초기화
-        self.openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+        # 임베딩 차원 (None이면 모델 기본 차원)
+        self.dimensions = dimensions if dimensions is not None else RAG_CONFIG["embedding_dimensions"]
+        self.vector_dimension = get_vector_dimension(self.dimensions)
         
-        # Qdrant 클라이언트 초기화
-        qdrant_url = os.getenv("QDRANT_URL", "http://localhost:6333")
-        self.qdrant_client = QdrantClient(url=qdrant_url)
+        # 배치 크기 (임베딩/업서트 공통, 체크포인트 배치 번호 기준)
+        self.batch_size = 100
         
-        # 텍스트 분할기 초기화
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=RAG_CONFIG["chunk_size"],
-            chunk_overlap=RAG_CONFIG["chunk_overlap"],
-            length_function=len,
-            separators=["\n\n", "\n", " ", ""]
-        )
+        # 빌드 체크포인트 (--resume 시 완료된 배치 건너뜀)
+        self.resume = resume
+        self.checkpoint = BuildCheckpoint(self.paths["build_checkpoint_dir"])
         
-    def collect_source_files(self) -> List[Tuple[str, str]]:
-        """소스 파일들을 수집합니다"""
-        print(f"📁 데이터 경로에서 파일 수집 중: {self.data_path}")
+        # 근중복 청크 필터
+        self.dedup = dedup
         
-        if not os.path.exists(self.data_path):
-            raise FileNotFoundError(f"데이터 경로가 존재하지 않습니다: {self.data_path}")
+        # 청킹 병렬 프로세스 수 (1이면 현재 프로세스에서 처리)
+        self.jobs = max(1, jobs)
         
-        # 지원하는 파일 확장자
-        file_patterns = [
-            "**/*.cs",      # C# 소스 코드
-            "**/*.md",      # 마크다운 문서
-            "**/*.txt",     # 텍스트 파일
-            "**/*.json"     # JSON 설정 파일
-        ]
+        # 단계별 추적
+        self.tracer = get_tracer()
         
-        files_content = []
+        # 여러 주제 동시 구축 시 공유 임베딩 요청 풀 (multi_ingest.IngestPool, None이면 직렬 요청)
+        self.pool = None
+        
+        # API 클라이언트와 텍스트 분할기 (최초 사용 시 생성)
+        self._openai_client = None
+        self._qdrant_client = None
+        self._text_splitter = None
+    
+    @property
+    def openai_client(self):
+        """OpenAI 클라이언트 (최초 접근 시 프로세스 공유 클라이언트 사용)"""
+        if self._openai_client is None:
+            self._openai_client = get_openai_client()
+        return self._openai_client
+    
+    @openai_client.setter
+    def openai_client(self, client):
+        self._openai_client = client
+    
+    @property
+    def qdrant_client(self):
+        """Qdrant 클라이언트 (최초 접근 시 프로세스 공유 클라이언트 사용)"""
+        if self._qdrant_client is None:
+            self._qdrant_client = get_qdrant_client()
+        return self._qdrant_client
+    
+    @qdrant_client.setter
+    def qdrant_client(self, client):
+        self._qdrant_client = client
+    
+    @property
+    def text_splitter(self):
+        """텍스트 분할기 (최초 접근 시 생성)"""
+        if self._text_splitter is None:
+            self._text_splitter = create_text_splitter()
+        return self._text_splitter
+        
+    def discover_source_files(self) -> List[str]:
+        """수집 대상 파일의 상대 경로 목록을 반환합니다 (결정적 순서)"""
+        if not os.path.exists(self.data_path):
+            raise FileNotFoundError(f"데이터 경로가 존재하지 않습니다: {self.data_path}")
         
-        for pattern in file_patterns:
-            file_paths = glob.glob(os.path.join(self.data_path, pattern), recursive=True)
+        relative_paths = []
+        for pattern in FILE_PATTERNS:
+            file_paths = sorted(glob.glob(os.path.join(self.data_path, pattern), recursive=True))
             
             for file_path in file_paths:
-                # 제외할 파일들 (바이너리, 메타파일 등)
-                if any(exclude in file_path.lower() for exclude in [
-                    '.meta', '.dll', '.exe', '.bin', 'packages-lock.json'
-                ]):
+                if any(exclude in file_path.lower() for exclude in EXCLUDE_PATTERNS):
                     continue
+                # 상대 경로로 변환
+                relative_paths.append(os.path.relpath(file_path, self.data_path))
+        
+        return relative_paths
+    
+    def collect_source_files(self) -> List[Tuple[str, str]]:
+        """소스 파일들을 수집합니다"""
+        print(f"📁 데이터 경로에서 파일 수집 중: {self.data_path}")
+        
+        files_content = []
+        
+        for relative_path in self.discover_source_files():
+            file_path = os.path.join(self.data_path, relative_path)
+            try:
+                with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                    content = f.read()
                     
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        
-                    # 빈 파일이나 너무 작은 파일 제외
-                    if len(content.strip()) < 50:
-                        continue
-                        
-                    # 상대 경로로 변환
-                    relative_path = os.path.relpath(file_path, self.data_path)
-                    files_content.append((relative_path, content))
-                    
-                except Exception as e:
-                    print(f"⚠️  파일 읽기 실패: {file_path} - {e}")
+                # 빈 파일이나 너무 작은 파일 제외
+                if len(content.strip()) < MIN_CONTENT_LENGTH:
                     continue
+                    
+                files_content.append((relative_path, content))
+                
+            except Exception as e:
+                print(f"⚠️  파일 읽기 실패: {file_path} - {e}")
+                continue
         
         print(f"✅ 총 {len(files_content)}개 파일 수집 완료")
         return files_content
@@ -101,55 +217,112 @@ class VectorBuilder:
     def create_chunks(self, files_content: List[Tuple[str, str]]) -> List[Dict]:
         """파일 내용을 청크로 분할합니다"""
         print("🔄 텍스트 청킹 작업 중...")
+        started = time.perf_counter()
         
         all_chunks = []
         
         for file_path, content in files_content:
-            # 텍스트 분할
-            chunks = self.text_splitter.split_text(content)
-            
-            for i, chunk in enumerate(chunks):
-                chunk_data = {
-                    "id": f"{file_path}_{i}",
-                    "text": chunk,
-                    "metadata": {
-                        "file_path": file_path,
-                        "chunk_index": i,
-                        "subject": self.subject,
-                        "file_type": os.path.splitext(file_path)[1]
-                    }
-                }
-                all_chunks.append(chunk_data)
+            all_chunks.extend(split_file_content(self.text_splitter, self.subject, file_path, content))
         
-        print(f"✅ 총 {len(all_chunks)}개 청크 생성 완료")
+        self._print_chunk_rate(len(all_chunks), started)
         return all_chunks
     
-    def generate_embeddings(self, chunks: List[Dict]) -> List[Dict]:
-        """텍스트 청크들을 임베딩으로 변환합니다"""
-        print("🔄 임베딩 생성 중...")
+    def create_chunks_parallel(self, relative_paths: List[str]) -> List[Dict]:
+        """프로세스 풀에서 파일 읽기/분할/해시를 수행합니다
+        
+        결과는 파일 순서대로 스트리밍되므로 청크 id와 순서가 직렬 처리와 동일합니다.
+        """
+        from concurrent.futures import ProcessPoolExecutor
+        
+        print(f"🔄 텍스트 청킹 작업 중... ({self.jobs}개 프로세스, {len(relative_paths)}개 파일)")
+        started = time.perf_counter()
+        
+        tasks = [(self.data_path, relative_path, self.subject) for relative_path in relative_paths]
+        chunksize = max(1, len(tasks) // (self.jobs * 8))
+        all_chunks = []
+        
+        with ProcessPoolExecutor(max_workers=self.jobs, initializer=_init_chunk_worker) as executor:
+            results = executor.map(_chunk_file_worker, tasks, chunksize=chunksize)
+            for done, (task, (file_chunks, error)) in enumerate(zip(tasks, results), 1):
+                if error is not None:
+                    print(f"⚠️  파일 읽기 실패: {os.path.join(self.data_path, task[1])} - {error}")
+                all_chunks.extend(file_chunks)
+                if done % 500 == 0:
+                    elapsed = time.perf_counter() - started
+                    print(f"   ... {done}/{len(tasks)} 파일, {len(all_chunks)}개 청크 "
+                          f"({len(all_chunks) / elapsed:.0f} chunks/s)")
+        
+        self._print_chunk_rate(len(all_chunks), started)
+        return all_chunks
+    
+    def _print_chunk_rate(self, chunk_count: int, started: float):
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        print(f"✅ 총 {chunk_count}개 청크 생성 완료 ({elapsed:.2f}초, {chunk_count / elapsed:.0f} chunks/s)")
+    
+    def load_chunks(self) -> List[Dict]:
+        """소스 파일 수집 + 청킹 (--jobs에 따라 직렬/병렬 선택)"""
+        if self.jobs > 1:
+            print(f"📁 데이터 경로에서 파일 수집 중: {self.data_path}")
+            return self.create_chunks_parallel(self.discover_source_files())
+        
+        files_content = self.collect_source_files()
+        return self.create_chunks(files_content)
+    
+    def remove_near_duplicates(self, chunks: List[Dict]) -> List[Dict]:
+        """근중복 청크를 임베딩 전에 제거합니다"""
+        print("🔄 근중복 청크 제거 중...")
+        
+        from dedup import NearDuplicateFilter
+        
+        duplicate_filter = NearDuplicateFilter(threshold=RAG_CONFIG["dedup_threshold"])
+        kept_chunks = duplicate_filter.filter(chunks)
+        
+        removed = len(chunks) - len(kept_chunks)
+        merged = sum(1 for chunk in kept_chunks if len(chunk["metadata"]["source_files"]) > 1)
+        print(f"✅ {removed}개 중복 청크 제거 ({len(chunks)} → {len(kept_chunks)}), "
+              f"여러 파일을 대표하는 청크 {merged}개")
+        return kept_chunks
+    
+    def generate_embeddings(self, chunks: List[Dict]) -> "np.ndarray":
+        """텍스트 청크들을 임베딩으로 변환합니다
+        
+        청크 순서와 동일한 행 순서의 (청크 수, 차원) float32 배열을 반환합니다.
+        """
+        import numpy as np
+        
+        print(f"🔄 임베딩 생성 중... (차원: {self.vector_dimension})")
         
         # 배치 단위로 처리 (API 한계 고려)
-        batch_size = 100
-        embedded_chunks = []
+        batch_size = self.batch_size
+        vectors = np.empty((len(chunks), self.vector_dimension), dtype=np.float32)
+        
+        if self.pool is not None:
+            self._generate_embeddings_pooled(chunks, vectors)
+            print(f"✅ 총 {len(vectors)}개 임베딩 생성 완료 ({vectors.nbytes / 1024 / 1024:.1f} MB)")
+            return vectors
         
         for i in range(0, len(chunks), batch_size):
             batch = chunks[i:i + batch_size]
+            batch_index = i // batch_size
+            
+            # 체크포인트에 저장된 배치는 재사용
+            saved = self.checkpoint.load_embeddings(batch_index)
+            if saved is not None:
+                vectors[i:i + len(batch)] = saved
+                print(f"⏭️  배치 {batch_index + 1}/{(len(chunks)-1)//batch_size + 1} 체크포인트에서 복원")
+                continue
+            
             texts = [chunk["text"] for chunk in batch]
             
             try:
-                # OpenAI Embedding API 호출
-                response = self.openai_client.embeddings.create(
-                    model=RAG_CONFIG["embedding_model"],
-                    input=texts
-                )
-                
-                # 응답에서 임베딩 추출
-                embeddings = [data.embedding for data in response.data]
-                
-                # 청크에 임베딩 추가
-                for j, chunk in enumerate(batch):
-                    chunk["vector"] = embeddings[j]
-                    embedded_chunks.append(chunk)
+                # OpenAI Embedding API 호출 (base64 응답 → float32)
+                with self.tracer.span("ingest.embed_batch", batch=batch_index, size=len(batch)):
+                    vectors[i:i + len(batch)] = embed_texts(
+                        self.openai_client,
+                        texts,
+                        dimensions=self.dimensions
+                    )
+                self.checkpoint.save_embeddings(batch_index, vectors[i:i + len(batch)])
                 
                 print(f"✅ 배치 {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1} 완료")
                 
@@ -157,13 +330,63 @@ class VectorBuilder:
                 print(f"❌ 임베딩 생성 실패 (배치 {i//batch_size + 1}): {e}")
                 raise
         
-        print(f"✅ 총 {len(embedded_chunks)}개 임베딩 생성 완료")
-        return embedded_chunks
+        print(f"✅ 총 {len(vectors)}개 임베딩 생성 완료 ({vectors.nbytes / 1024 / 1024:.1f} MB)")
+        return vectors
+    
+    def _generate_embeddings_pooled(self, chunks: List[Dict], vectors: "np.ndarray"):
+        """공유 풀로 배치를 동시에 요청 (주제당 요청 중인 배치는 풀 크기까지, 완료 순서대로 체크포인트 저장)"""
+        from concurrent.futures import FIRST_COMPLETED, wait
+        
+        batch_size = self.batch_size
+        remaining = []
+        restored = 0
+        for i in range(0, len(chunks), batch_size):
+            saved = self.checkpoint.load_embeddings(i // batch_size)
+            if saved is not None:
+                vectors[i:i + len(saved)] = saved
+                restored += len(saved)
+            else:
+                remaining.append(i)
+        if restored:
+            print(f"⏭️  {restored}개 청크 임베딩을 체크포인트에서 복원")
+        self.pool.begin(self.subject, len(chunks), restored)
+        
+        pending = {}
+        
+        def collect(done):
+            for future in done:
+                i = pending.pop(future)
+                vectors[i:i + batch_size] = future.result()
+                self.checkpoint.save_embeddings(i // batch_size, vectors[i:i + batch_size])
+        
+        try:
+            for i in remaining:
+                if len(pending) >= self.pool.workers:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                texts = [chunk["text"] for chunk in chunks[i:i + batch_size]]
+                pending[self.pool.submit(self.subject, texts, self.dimensions)] = i
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED).done)
+        except Exception as e:
+            for future in pending:
+                future.cancel()
+            print(f"❌ 임베딩 생성 실패: {e}")
+            raise
     
     def setup_qdrant_collection(self):
         """Qdrant 컬렉션을 설정합니다"""
         print(f"🔄 Qdrant 컬렉션 설정 중: {self.collection_name}")
         
+        # 이어서 구축하는 경우 업서트된 배치가 있으면 기존 컬렉션 유지
+        if self.checkpoint.upserted_batches:
+            try:
+                self.qdrant_client.get_collection(self.collection_name)
+                print(f"♻️  기존 컬렉션 유지 (이어서 저장): {self.collection_name}")
+                return
+            except Exception:
+                # 컬렉션이 사라졌으면 업서트 기록을 무효화하고 새로 생성
+                self.checkpoint.upserted_batches.clear()
+        
         # 기존 컬렉션이 있으면 삭제
         try:
             self.qdrant_client.delete_collection(self.collection_name)
@@ -172,53 +395,219 @@ class VectorBuilder:
             pass
         
         # 새 컬렉션 생성
+        from qdrant_client.models import Distance, VectorParams
+        
         self.qdrant_client.create_collection(
             collection_name=self.collection_name,
             vectors_config=VectorParams(
-                size=RAG_CONFIG["vector_dimension"],
+                size=self.vector_dimension,
                 distance=Distance.COSINE
             )
         )
         
         print(f"✅ 컬렉션 생성 완료: {self.collection_name}")
     
-    def store_vectors(self, embedded_chunks: List[Dict]):
-        """벡터들을 Qdrant에 저장합니다"""
-        print("🔄 벡터 저장 중...")
+    def _build_points(self, chunks: List[Dict], vectors: "np.ndarray", start: int,
+                      ids: Optional[Sequence[int]] = None) -> List["PointStruct"]:
+        """청크와 벡터 배열로 Qdrant 포인트 생성 (배치 단위로만 리스트 변환)"""
+        from qdrant_client.models import PointStruct
         
-        # 포인트 구조 생성
         points = []
-        for i, chunk in enumerate(embedded_chunks):
+        for offset, chunk in enumerate(chunks):
             point = PointStruct(
-                id=i,
-                vector=chunk["vector"],
+                id=ids[offset] if ids is not None else start + offset,
+                vector=vectors[offset].tolist(),
                 payload={
                     "text": chunk["text"],
                     "file_path": chunk["metadata"]["file_path"],
                     "chunk_index": chunk["metadata"]["chunk_index"],
                     "subject": chunk["metadata"]["subject"],
-                    "file_type": chunk["metadata"]["file_type"]
+                    "file_type": chunk["metadata"]["file_type"],
+                    "source_files": chunk["metadata"].get("source_files", [chunk["metadata"]["file_path"]])
                 }
             )
             points.append(point)
+        return points
+    
+    def store_vectors(self, chunks: List[Dict], vectors: "np.ndarray"):
+        """벡터들을 Qdrant에 저장합니다"""
+        print("🔄 벡터 저장 중...")
         
-        # 배치 단위로 저장
-        batch_size = 100
-        for i in range(0, len(points), batch_size):
-            batch = points[i:i + batch_size]
+        # 배치 단위로 포인트 생성 및 저장
+        batch_size = self.batch_size
+        for i in range(0, len(chunks), batch_size):
+            batch_index = i // batch_size
+            if batch_index in self.checkpoint.upserted_batches:
+                continue
+            
+            batch = self._build_points(
+                chunks[i:i + batch_size],
+                vectors[i:i + batch_size],
+                start=i
+            )
             
             try:
-                self.qdrant_client.upsert(
-                    collection_name=self.collection_name,
-                    points=batch
-                )
-                print(f"✅ 배치 {i//batch_size + 1}/{(len(points)-1)//batch_size + 1} 저장 완료")
+                with self.tracer.span("ingest.upsert_batch", batch=batch_index, size=len(batch)):
+                    self.qdrant_client.upsert(
+                        collection_name=self.collection_name,
+                        points=batch
+                    )
+                self.checkpoint.mark_upserted(batch_index)
+                print(f"✅ 배치 {i//batch_size + 1}/{(len(chunks)-1)//batch_size + 1} 저장 완료")
                 
             except Exception as e:
                 print(f"❌ 벡터 저장 실패 (배치 {i//batch_size + 1}): {e}")
                 raise
         
-        print(f"✅ 총 {len(points)}개 벡터 저장 완료")
+        print(f"✅ 총 {len(chunks)}개 벡터 저장 완료")
+    
+    # ------------------------------------------------------------------
+    # 파일 단위 증분 갱신 (--watch)
+    # ------------------------------------------------------------------
+    
+    def load_file_state(self) -> Optional[Dict[str, Dict]]:
+        """마지막으로 색인한 파일별 상태 {경로: {sha1, mtime, size}} (기록이 없으면 None)"""
+        try:
+            with open(self.paths["indexed_files"], 'r', encoding='utf-8') as f:
+                return json.load(f)["files"]
+        except (OSError, ValueError, KeyError):
+            return None
+    
+    def _file_state(self, relative_path: str, previous: Optional[Dict] = None) -> Dict:
+        """파일 상태 (수정 시각/크기가 같으면 이전 해시 재사용)"""
+        stat = os.stat(os.path.join(self.data_path, relative_path))
+        if previous and previous["mtime"] == stat.st_mtime and previous["size"] == stat.st_size:
+            return previous
+        with open(os.path.join(self.data_path, relative_path), 'rb') as f:
+            digest = hashlib.sha1(f.read()).hexdigest()
+        return {"sha1": digest, "mtime": stat.st_mtime, "size": stat.st_size}
+    
+    def save_file_state(self, state: Optional[Dict[str, Dict]] = None):
+        """색인된 파일 상태 기록 (전체 구축 후에는 현재 data/ 전체)"""
+        if state is None:
+            previous = self.load_file_state() or {}
+            state = {path: self._file_state(path, previous.get(path)) for path in self.discover_source_files()}
+        payload = {"collection": self.collection_name, "files": state}
+        write_atomic(self.paths["indexed_files"], json.dumps(payload, ensure_ascii=False, indent=1).encode("utf-8"))
+    
+    def scan_changes(self) -> Tuple[List[str], List[str], Dict[str, Dict]]:
+        """마지막 색인 이후 바뀐(추가 포함) 파일과 삭제된 파일, 현재 파일 상태
+        
+        내용 해시로 비교하므로 저장만 다시 한(내용이 같은) 파일은 변경으로 보지 않음
+        """
+        previous = self.load_file_state() or {}
+        current = {path: self._file_state(path, previous.get(path)) for path in self.discover_source_files()}
+        changed = [path for path, state in current.items()
+                   if path not in previous or previous[path]["sha1"] != state["sha1"]]
+        removed = [path for path in previous if path not in current]
+        return changed, removed, current
+    
+    @staticmethod
+    def incremental_point_id(chunk_id: str) -> int:
+        """증분 갱신 포인트 id (청크 id 해시 60비트, 전체 구축의 순번 id와 겹치지 않음)"""
+        return int(hashlib.sha1(chunk_id.encode("utf-8")).hexdigest()[:15], 16)
+    
+    def _dependent_files(self, targets: List[str]) -> List[str]:
+        """삭제될 포인트가 근중복 대표로 대신 담고 있던 다른 파일 (함께 재색인하지 않으면 그 내용이 색인에서 빠짐)
+        
+        다시 청킹하는 파일의 포인트도 지워지므로 대표 관계를 끝까지 따라감
+        """
+        from qdrant_client.models import FieldCondition, Filter, MatchAny
+        
+        known = set(targets)
+        pending = list(targets)
+        dependents = []
+        while pending:
+            found = set()
+            offset = None
+            while True:
+                points, offset = self.qdrant_client.scroll(
+                    collection_name=self.collection_name,
+                    scroll_filter=Filter(must=[FieldCondition(key="file_path", match=MatchAny(any=pending))]),
+                    limit=256,
+                    offset=offset,
+                    with_payload=["source_files"],
+                    with_vectors=False
+                )
+                for point in points:
+                    found.update((point.payload or {}).get("source_files", []))
+                if offset is None:
+                    break
+            # 이미 삭제된 파일은 제외
+            pending = sorted(path for path in found - known if os.path.exists(os.path.join(self.data_path, path)))
+            known.update(pending)
+            dependents.extend(pending)
+        return dependents
+    
+    def reindex_files(self, changed: List[str], removed: List[str], state: Optional[Dict[str, Dict]] = None) -> int:
+        """바뀐/삭제된 파일의 포인트만 교체 (전체 재임베딩 없이 해당 파일 청크만 임베딩)
+        
+        근중복 제거로 이 파일들의 청크가 대신 담고 있던 다른 파일도 함께 다시 청킹함
+        증분 청크는 파일 간 근중복 제거를 거치지 않음 (다음 전체 구축 때 다시 정리됨)
+        """
+        from qdrant_client.models import FieldCondition, Filter, FilterSelector, MatchAny
+        
+        # 1. 해당 파일(+ 근중복으로 묶인 파일)의 기존 포인트 삭제
+        dependents = self._dependent_files(list(changed) + list(removed))
+        if dependents:
+            print(f"🔗 근중복 청크를 공유하는 파일 {len(dependents)}개 함께 재색인: {', '.join(dependents[:5])}"
+                  + (" ..." if len(dependents) > 5 else ""))
+        changed = list(changed) + dependents
+        targets = changed + list(removed)
+        if targets:
+            with self.tracer.span("ingest.delete_files", files=len(targets)):
+                self.qdrant_client.delete(
+                    collection_name=self.collection_name,
+                    points_selector=FilterSelector(filter=Filter(
+                        must=[FieldCondition(key="file_path", match=MatchAny(any=targets))]
+                    ))
+                )
+        
+        # 2. 바뀐 파일만 다시 청킹/임베딩/저장
+        chunks = []
+        for relative_path in changed:
+            with open(os.path.join(self.data_path, relative_path), 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+            if len(content.strip()) >= MIN_CONTENT_LENGTH:
+                chunks.extend(split_file_content(self.text_splitter, self.subject, relative_path, content))
+        
+        for i in range(0, len(chunks), self.batch_size):
+            batch = chunks[i:i + self.batch_size]
+            with self.tracer.span("ingest.embed_batch", batch=i // self.batch_size, size=len(batch)):
+                vectors = embed_texts(self.openai_client, [chunk["text"] for chunk in batch],
+                                      dimensions=self.dimensions)
+            ids = [self.incremental_point_id(chunk["id"]) for chunk in batch]
+            with self.tracer.span("ingest.upsert_batch", batch=i // self.batch_size, size=len(batch)):
+                self.qdrant_client.upsert(collection_name=self.collection_name,
+                                          points=self._build_points(batch, vectors, 0, ids=ids))
+        
+        # 3. 검색 캐시 무효화 + 색인 상태 갱신
+        points = self.qdrant_client.count(self.collection_name).count
+        write_collection_version(self.subject, points, self.vector_dimension)
+        self.save_file_state(state)
+        print(f"✅ 증분 갱신 완료: 파일 {len(changed)}개 재색인({len(chunks)}개 청크), {len(removed)}개 삭제 "
+              f"(전체 {points}개 포인트)")
+        return len(chunks)
+    
+    def _prepare_checkpoint(self, chunks: List[Dict]):
+        """빌드 체크포인트 로드 또는 새로 시작"""
+        settings = {
+            "collection": self.collection_name,
+            "embedding_model": RAG_CONFIG["embedding_model"],
+            "vector_dimension": self.vector_dimension,
+            "batch_size": self.batch_size
+        }
+        fingerprint = BuildCheckpoint.fingerprint(chunks, settings)
+        
+        if self.resume and self.checkpoint.load(fingerprint):
+            total_batches = (len(chunks) - 1) // self.batch_size + 1 if chunks else 0
+            print(f"♻️  체크포인트에서 재개: 임베딩 {len(self.checkpoint.embedded_batches)}/{total_batches}, "
+                  f"저장 {len(self.checkpoint.upserted_batches)}/{total_batches} 배치 완료")
+            return
+        
+        if self.resume:
+            print("⚠️  일치하는 체크포인트가 없습니다. 처음부터 구축합니다.")
+        self.checkpoint.start(fingerprint, settings)
     
     def build_vector_db(self):
         """전체 벡터 데이터베이스 구축 프로세스"""
@@ -226,40 +615,113 @@ class VectorBuilder:
         print("=" * 50)
         
         try:
-            # 1. 소스 파일 수집
-            files_content = self.collect_source_files()
+            # 1-2. 소스 파일 수집 및 텍스트 청킹
+            with self.tracer.span("ingest.chunk", subject=self.subject, jobs=self.jobs):
+                chunks = self.load_chunks()
+            
+            # 근중복 청크 제거
+            if self.dedup:
+                with self.tracer.span("ingest.dedup", subject=self.subject):
+                    chunks = self.remove_near_duplicates(chunks)
             
-            # 2. 텍스트 청킹
-            chunks = self.create_chunks(files_content)
+            # 체크포인트 준비 (--resume이면 완료된 배치 이어서 진행)
+            self._prepare_checkpoint(chunks)
             
             # 3. 임베딩 생성
-            embedded_chunks = self.generate_embeddings(chunks)
+            with self.tracer.span("ingest.embed", subject=self.subject, chunks=len(chunks)):
+                vectors = self.generate_embeddings(chunks)
             
             # 4. Qdrant 컬렉션 설정
-            self.setup_qdrant_collection()
+            with self.tracer.span("ingest.collection_setup", subject=self.subject):
+                self.setup_qdrant_collection()
             
             # 5. 벡터 저장
-            self.store_vectors(embedded_chunks)
+            with self.tracer.span("ingest.upsert", subject=self.subject, points=len(chunks)):
+                self.store_vectors(chunks, vectors)
+            
+            # 구축 완료 시 체크포인트 정리
+            self.checkpoint.clear()
+            
+            # 새 컬렉션 버전 기록 (이전 검색 캐시 무효화) + 색인한 파일 상태 (--watch 변경 감지 기준)
+            write_collection_version(self.subject, len(vectors), self.vector_dimension)
+            self.save_file_state()
             
             print("=" * 50)
             print(f"🎉 {self.subject} 벡터 DB 구축 완료!")
             print(f"📊 컬렉션: {self.collection_name}")
-            print(f"📊 벡터 개수: {len(embedded_chunks)}")
+            print(f"📊 벡터 개수: {len(vectors)} (차원: {self.vector_dimension})")
+            if self.pool is None:
+                # 여러 주제 동시 구축이면 전체 요약을 마지막에 한 번 출력
+                print("-" * 50)
+                for line in self.tracer.format_summary():
+                    print(line)
             
         except Exception as e:
             print(f"❌ 벡터 DB 구축 실패: {e}")
+            if self.checkpoint.exists():
+                print("💡 완료된 배치는 보존되었습니다. --resume 옵션으로 이어서 구축하세요.")
             raise
 
 def main():
     """메인 실행 함수"""
     parser = argparse.ArgumentParser(description="RAG 벡터 데이터베이스 구축")
-    parser.add_argument("--subject", required=True, help="주제명 (예: unitask)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--subject", help="주제명 (예: unitask)")
+    target.add_argument("--all-subjects", action="store_true",
+                        help="data/ 폴더가 있는 모든 주제를 동시에 구축 (임베딩 요청 풀/한도 공유)")
+    parser.add_argument("--dimensions", type=int, help="임베딩 차원 축소 (text-embedding-3 전용, 예: 512)")
+    parser.add_argument("--resume", action="store_true", help="실패한 구축을 체크포인트에서 이어서 진행")
+    parser.add_argument("--no-dedup", action="store_true", help="근중복 청크 제거 비활성화")
+    parser.add_argument("--jobs", type=int, default=1, help="청킹 병렬 프로세스 수 (기본: 1)")
+    parser.add_argument("--parallel", type=int, help="--all-subjects 동시 구축 주제 수 (기본: 전체)")
+    parser.add_argument("--embed-workers", type=int, default=8,
+                        help="--all-subjects 임베딩 동시 요청 수 (모든 주제 공유, 기본: 8)")
+    parser.add_argument("--rate-limits", metavar="MODEL=RPM:TPM,...",
+                        help="--all-subjects 공유 임베딩 한도 (기본: OPENAI_RATE_LIMITS 또는 설정값)")
+    parser.add_argument("--progress-interval", type=float, default=10.0,
+                        help="--all-subjects 진행률 출력 간격(초) (기본: 10)")
+    add_tracing_arguments(parser)
     
     args = parser.parse_args()
     
+    if args.all_subjects:
+        from multi_ingest import ingest_subjects
+        
+        subjects = discover_subjects()
+        if not subjects:
+            print(f"❌ data/ 폴더가 있는 주제가 없습니다: {SUBJECTS_DIR}")
+            sys.exit(1)
+        apply_rate_limit_overrides(args.rate_limits)
+        configure_tracing(args, None, "ingest")
+        try:
+            results = ingest_subjects(
+                subjects,
+                parallel=args.parallel,
+                embed_workers=args.embed_workers,
+                report_interval=args.progress_interval,
+                dimensions=args.dimensions,
+                resume=args.resume,
+                dedup=not args.no_dedup,
+                jobs=args.jobs
+            )
+        finally:
+            finish_tracing(args)
+        sys.exit(0 if all(result["status"] == "done" for result in results.values()) else 1)
+    
+    configure_tracing(args, args.subject, "ingest")
+    
     # 벡터 빌더 생성 및 실행
-    builder = VectorBuilder(args.subject)
-    builder.build_vector_db()
+    builder = VectorBuilder(
+        args.subject,
+        dimensions=args.dimensions,
+        resume=args.resume,
+        dedup=not args.no_dedup,
+        jobs=args.jobs
+    )
+    try:
+        builder.build_vector_db()
+    finally:
+        finish_tracing(args)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file